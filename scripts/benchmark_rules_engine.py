@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from src.baselines.rules import DEFAULT_PATTERNS, RulesConfig, RulesDetector
+
+VOCAB = [
+    "ignore", "previous", "rules", "reveal", "hidden", "prompt", "override", "safety",
+    "policy", "pretend", "roleplay", "unfiltered", "admin", "mode", "bypass", "filter",
+    "secret", "token", "disable", "guard", "persona", "evil", "unlock", "instructions",
+]
+RULE_SETS = ("literal", "regex")
+BENIGN_SENTENCES = [
+    "Summarize the following internal policy note in one sentence.",
+    "Translate this paragraph into formal English for the quarterly report.",
+    "List three risks mentioned in the attached meeting transcript.",
+    "Write a short haiku about autumn leaves falling in the park.",
+]
+
+
+def make_patterns(
+    count: int, rng: random.Random, kind: str = "literal"
+) -> tuple[list[str], list[str]]:
+    """``count`` rules (the defaults first) plus one example text fragment per rule."""
+    patterns = list(DEFAULT_PATTERNS)
+    examples = ["ignore all instructions", "system prompt", "you are now", "jailbreak"]
+    seen = set(patterns)
+    while len(patterns) < count:
+        a, b, c, d = rng.sample(VOCAB, 4)
+        if kind == "regex":
+            pattern, example = rf"{a}\s+(?:{b}|{c})\s+{d}\w*", f"{a} {c} {d}s"
+        else:
+            pattern, example = f"{a} {b} {d}", f"{a} {b} {d}"
+        if pattern not in seen:
+            seen.add(pattern)
+            patterns.append(pattern)
+            examples.append(example)
+    return patterns[:count], examples[:count]
+
+
+def make_texts(count: int, rng: random.Random, examples: list[str] | None = None) -> list[str]:
+    """Benign texts, or with ``examples`` texts that each fire at least one rule."""
+    texts = []
+    for _ in range(count):
+        first, second = rng.sample(BENIGN_SENTENCES, 2)
+        middle = f" Now {rng.choice(examples)} and " if examples else " "
+        texts.append(first + middle + second)
+    return texts
+
+
+def per_pattern_explain(compiled: list[re.Pattern[str]], text: str) -> list[tuple[int, int, int]]:
+    # What ``RuleMatcher.finditer`` must reproduce: every match of every rule.
+    return [(idx, m.start(), m.end()) for idx, rx in enumerate(compiled) for m in rx.finditer(text)]
+
+
+def time_per_text_us(fn, texts: list[str], repeats: int) -> float:
+    runs = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for text in texts:
+            fn(text)
+        runs.append((time.perf_counter() - start) / len(texts) * 1e6)
+    return float(statistics.median(runs))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description="Per-text rules engine cost vs pattern count, on benign and matching texts."
+    )
+    ap.add_argument("--counts", default="6,50,200,1000", help="Comma-separated pattern counts")
+    ap.add_argument(
+        "--rule_sets",
+        default=",".join(RULE_SETS),
+        help="Comma-separated rule sets: literal phrases and/or regex rules",
+    )
+    ap.add_argument("--texts", type=int, default=2000)
+    ap.add_argument("--repeats", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=13)
+    ap.add_argument("--out", help="Optional JSON output path")
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    rows = []
+    for kind in [k.strip() for k in args.rule_sets.split(",") if k.strip()]:
+        if kind not in RULE_SETS:
+            raise ValueError(f"rule set must be one of {', '.join(RULE_SETS)}")
+        for count in [int(c) for c in args.counts.split(",") if c.strip()]:
+            patterns, examples = make_patterns(count, rng, kind)
+            detector = RulesDetector(RulesConfig(patterns=patterns))
+            compiled = [re.compile(pat, re.IGNORECASE) for pat in patterns]
+            for text_kind, texts in (
+                ("benign", make_texts(args.texts, rng)),
+                ("matching", make_texts(args.texts, rng, examples)),
+            ):
+                rows.append(
+                    {
+                        "rule_set": kind,
+                        "patterns": count,
+                        "texts": text_kind,
+                        "combined_us_per_text": round(
+                            time_per_text_us(detector.explain, texts, args.repeats), 3
+                        ),
+                        "per_pattern_us_per_text": round(
+                            time_per_text_us(
+                                lambda t: per_pattern_explain(compiled, t), texts, args.repeats
+                            ),
+                            3,
+                        ),
+                    }
+                )
+                print(json.dumps(rows[-1]))
+
+    if args.out:
+        payload = {
+            "environment": {
+                "platform": platform.platform(),
+                "python_version": platform.python_version(),
+            },
+            "texts": args.texts,
+            "rule_sets": args.rule_sets,
+            "repeats": args.repeats,
+            "results": rows,
+        }
+        out_path = Path(args.out)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -35,7 +35,7 @@ def summarize(values: list[float]) -> dict[str, float]:
 
 def measure(detector: str, *, run_dir: str | None = None, repeats: int = 40) -> dict[str, object]:
     predictor = Predictor(detector=detector, run_dir=run_dir)
-    threshold = "val" if detector == "lora" else 0.5
+    threshold = "val" if detector in {"lora", "onnx"} else 0.5
 
     for text in TEXTS.values():
         predictor.predict(text, threshold=threshold, normalize_infer=False, drop_mn=False)
@@ -73,6 +73,19 @@ def main() -> None:
     except Exception as exc:
         results["lora"] = {"error": str(exc)}
 
+    try:
+        results["onnx"] = measure("onnx", run_dir=str(RUN_DIR), repeats=20)
+    except Exception as exc:
+        results["onnx"] = {"error": f"{exc} (export with: jbd export --run_dir {RUN_DIR} --format onnx)"}
+    else:
+        if "measurements" in results["lora"]:
+            results["onnx"]["speedup_vs_lora"] = {
+                label: round(
+                    results["lora"]["measurements"][label]["median_ms"] / stats["median_ms"], 3
+                )
+                for label, stats in results["onnx"]["measurements"].items()
+            }
+
     OUT_PATH.write_text(json.dumps(results, indent=2), encoding="utf-8")
 
 
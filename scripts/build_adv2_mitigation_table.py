@@ -2,37 +2,16 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import List
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
 
-def _load_predictions(path: Path) -> Tuple[List[int], List[float]]:
-    y_true: List[int] = []
-    y_score: List[float] = []
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            row = json.loads(line)
-            y_true.append(int(row["label"]))
-            y_score.append(float(row["score"]))
-    return y_true, y_score
-
-
-def _compute_metrics(y_true: List[int], y_score: List[float], threshold: float) -> Dict[str, float]:
-    pos = [y == 1 for y in y_true]
-    neg = [y == 0 for y in y_true]
-    pred_attack = [s >= threshold for s in y_score]
-    tp = sum(p and a for p, a in zip(pred_attack, pos))
-    fp = sum(p and n for p, n in zip(pred_attack, neg))
-    fn = sum((not p) and a for p, a in zip(pred_attack, pos))
-    pos_count = sum(pos)
-    neg_count = sum(neg)
-    tpr = tp / pos_count if pos_count else 0.0
-    fpr = fp / neg_count if neg_count else 0.0
-    asr = fn / pos_count if pos_count else 0.0
-    return {"fpr": fpr, "tpr": tpr, "asr": asr}
+from src.eval.metrics import threshold_metrics
+from src.eval.predictions import load_split_predictions
 
 
 def _load_threshold(path: Path) -> float:
@@ -76,17 +55,20 @@ def main() -> None:
     for split in splits:
         for normalize in (False, True):
             suffix = "_norm" if normalize else ""
-            pred_path = run_dir / f"predictions_{split}{suffix}.jsonl"
-            if not pred_path.exists():
-                print(f"Missing predictions: {pred_path}")
+            try:
+                predictions = load_split_predictions(run_dir, f"{split}{suffix}")
+            except FileNotFoundError as exc:
+                print(exc)
                 continue
-            y_true, y_score = _load_predictions(pred_path)
-            for label, threshold in [
+            operating_points = [
                 ("val", val_threshold),
                 ("adv2_fpr1", thresholds[normalize]["adv2_fpr1"]),
                 ("adv2_fpr5", thresholds[normalize]["adv2_fpr5"]),
-            ]:
-                metrics = _compute_metrics(y_true, y_score, threshold)
+            ]
+            rates = threshold_metrics(
+                predictions.labels, predictions.scores, [threshold for _, threshold in operating_points]
+            )
+            for (label, threshold), metrics in zip(operating_points, rates):
                 rows.append(
                     [
                         split,
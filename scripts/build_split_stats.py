@@ -2,23 +2,20 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 from pathlib import Path
 from typing import List, Tuple
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from src.eval.predictions import find_predictions, load_predictions
+
 
 def _load_predictions(path: Path) -> Tuple[int, int]:
-    total = 0
-    pos = 0
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            row = json.loads(line)
-            total += 1
-            if int(row.get("label", 0)) == 1:
-                pos += 1
-    return total, pos
+    labels = load_predictions(path).labels
+    return len(labels), int((labels == 1).sum())
 
 
 def _load_auprc(path: Path) -> float | None:
@@ -48,10 +45,11 @@ def main() -> None:
     suffix = "_norm" if args.use_norm else ""
     rows: List[List[str]] = []
     for split in splits:
-        pred_path = run_dir / f"predictions_{split}{suffix}.jsonl"
         metrics_path = run_dir / f"final_metrics_{split}{suffix}.json"
-        if not pred_path.exists():
-            print(f"Missing predictions: {pred_path}")
+        try:
+            pred_path = find_predictions(run_dir, f"{split}{suffix}")
+        except FileNotFoundError as exc:
+            print(exc)
             continue
         total, pos = _load_predictions(pred_path)
         pos_rate = pos / total if total else 0.0
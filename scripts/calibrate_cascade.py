@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from src.data.io import load_examples
+from src.eval.predictions import find_predictions, load_predictions
+
+from llm_jailbreak_detector.cascade import calibrate_cascade, write_cascade_config
+from llm_jailbreak_detector.linear_detector import LinearDetector
+from llm_jailbreak_detector.lora_detector import LoraDetector
+from llm_jailbreak_detector.normalize import normalize_text
+from llm_jailbreak_detector.rules_detector import RulesDetector
+
+
+def _load_predictions(path: Path) -> Tuple[Dict[str, Tuple[int, float]], np.dtype]:
+    predictions = load_predictions(path)
+    rows = dict(zip(predictions.ids.tolist(), zip(predictions.labels.tolist(), predictions.scores.tolist())))
+    return rows, predictions.scores.dtype
+
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(
+        description="Calibrate the rules [-> linear] -> LoRA cascade bands on val predictions."
+    )
+    ap.add_argument("--run_dir", required=True, help="Path to run directory (runs/lora_v1_*)")
+    ap.add_argument("--pred_path", help="LoRA val predictions (default: run_dir/predictions_val.npz)")
+    ap.add_argument("--data", help="Val dataset jsonl with texts (default: val_path from config.json)")
+    ap.add_argument("--linear_run_dir", help="Add a linear-model stage after rules (scripts/train_linear.py run)")
+    ap.add_argument("--target_fpr", type=float, default=None, help="Default: config target_fpr or 0.01")
+    ap.add_argument(
+        "--max_tpr_drop",
+        type=float,
+        default=0.0,
+        help="Allowed val TPR loss versus LoRA alone at the val threshold",
+    )
+    ap.add_argument("--normalize", action="store_true", help="Normalize before rules scoring (match jbd --normalize)")
+    ap.add_argument("--drop-mn", action="store_true", help="Drop Mn marks when normalizing")
+    return ap.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    run_dir = Path(args.run_dir)
+    lora = LoraDetector(run_dir)
+    cfg = lora.config
+    pred_path = Path(args.pred_path) if args.pred_path else find_predictions(run_dir, "val")
+    data_path = Path(args.data or cfg.get("val_path") or "")
+    if not pred_path.is_file():
+        raise FileNotFoundError(f"Predictions not found: {pred_path} (pass --pred_path)")
+    if not data_path.is_file():
+        raise FileNotFoundError(f"Dataset not found: {data_path} (pass --data)")
+    target_fpr = float(args.target_fpr if args.target_fpr is not None else cfg.get("target_fpr", 0.01))
+
+    predictions, score_dtype = _load_predictions(pred_path)
+    texts: List[str] = []
+    labels: List[int] = []
+    lora_scores: List[float] = []
+    for ex in load_examples(str(data_path)):
+        if ex.id not in predictions:
+            continue
+        label, score = predictions[ex.id]
+        texts.append(normalize_text(ex.text, drop_mn=args.drop_mn) if args.normalize else ex.text)
+        labels.append(label)
+        lora_scores.append(score)
+    if len(texts) < len(predictions):
+        raise ValueError(f"{len(predictions) - len(texts)} predictions have no text in {data_path}")
+
+    stage_scores = {"rules": RulesDetector().predict_proba_batch(texts)}
+    extra = {}
+    if args.linear_run_dir:
+        linear = LinearDetector(args.linear_run_dir)
+        stage_scores["linear"] = linear.predict_proba_batch(texts)
+        extra = {
+            "linear_run_dir": str(Path(args.linear_run_dir).resolve()),
+            "linear_fingerprint": linear.fingerprint(),
+        }
+    bands, report = calibrate_cascade(
+        labels,
+        # Keep the stored dtype so the val threshold is compared the way eval compared it.
+        np.asarray(lora_scores, dtype=score_dtype),
+        stage_scores,
+        lora.threshold,
+        target_fpr=target_fpr,
+        max_tpr_drop=args.max_tpr_drop,
+    )
+    out_path = write_cascade_config(
+        run_dir,
+        bands,
+        report,
+        source_fingerprint=lora.fingerprint(),
+        extra={
+            **extra,
+            "pred_path": str(pred_path.resolve()),
+            "data_path": str(data_path.resolve()),
+            "normalize_infer": args.normalize,
+            "drop_mn": args.drop_mn,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+        },
+    )
+    for band in bands:
+        print(f"{band.name}: allow<{band.allow_below} block>={band.block_at}")
+    print(
+        f"val rows={report['rows']} lora_avoided={report['lora_avoided_fraction']:.2%} "
+        f"TPR {report['lora']['tpr']:.4f}->{report['cascade']['tpr']:.4f} "
+        f"FPR {report['lora']['fpr']:.4f}->{report['cascade']['fpr']:.4f}"
+    )
+    print(f"Wrote {out_path}")
+
+
+if __name__ == "__main__":
+    main()
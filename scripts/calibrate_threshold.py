@@ -2,44 +2,21 @@ from __future__ import annotations
 
 import argparse
 import json
-import math
+import sys
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
 
-def _load_predictions(path: Path) -> Tuple[List[int], List[float]]:
-    y_true: List[int] = []
-    y_score: List[float] = []
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            row = json.loads(line)
-            y_true.append(int(row["label"]))
-            y_score.append(float(row["score"]))
-    return y_true, y_score
-
-
-def _threshold_for_fpr(neg_scores: List[float], target_fpr: float) -> float:
-    if not neg_scores:
-        raise ValueError("No negative samples to calibrate on.")
-    neg_sorted = sorted(neg_scores)
-    n = len(neg_sorted)
-    target_fpr = min(max(target_fpr, 0.0), 1.0)
-    idx = max(0, min(n - 1, math.ceil((1.0 - target_fpr) * n) - 1))
-    return float(neg_sorted[idx])
-
-
-def _actual_fpr(neg_scores: List[float], threshold: float) -> float:
-    if not neg_scores:
-        return 0.0
-    return float(sum(1 for s in neg_scores if s >= threshold) / len(neg_scores))
+from src.eval.metrics import ScoreCurve
+from src.eval.predictions import load_predictions, split_name
 
 
 def parse_args() -> argparse.Namespace:
     ap = argparse.ArgumentParser(description="Calibrate thresholds to target FPR on negatives.")
-    ap.add_argument("--pred_path", required=True, help="Predictions JSONL with label/score.")
+    ap.add_argument("--pred_path", required=True, help="Predictions .npz (or legacy JSONL) with label/score.")
     ap.add_argument("--targets", default="0.01,0.05", help="Comma-separated target FPRs.")
     ap.add_argument("--out_dir", default="reports/week5/thresholds", help="Output directory.")
     ap.add_argument("--out_prefix", default="threshold_adv2", help="Output filename prefix.")
@@ -52,26 +29,27 @@ def main() -> None:
     out_dir = Path(args.out_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    y_true, y_score = _load_predictions(pred_path)
-    neg_scores = [s for y, s in zip(y_true, y_score) if y == 0]
-    pos_scores = [s for y, s in zip(y_true, y_score) if y == 1]
-    pos_rate = len(pos_scores) / len(y_true) if y_true else 0.0
+    predictions = load_predictions(pred_path)
+    curve = ScoreCurve.from_scores(predictions.labels, predictions.scores)
+    if curve.n_neg == 0:
+        raise ValueError("No negative samples to calibrate on.")
+    pos_rate = curve.n_pos / len(predictions)
 
-    targets = [float(t.strip()) for t in args.targets.split(",") if t.strip()]
-    normalize_infer = pred_path.name.endswith("_norm.jsonl")
+    targets = [min(max(float(t.strip()), 0.0), 1.0) for t in args.targets.split(",") if t.strip()]
+    normalize_infer = (split_name(pred_path) or "").endswith("_norm")
 
-    for target in targets:
-        threshold = _threshold_for_fpr(neg_scores, target)
-        actual_fpr = _actual_fpr(neg_scores, threshold)
-        suffix = f"fpr{int(round(target * 100))}"
+    # One sort serves every target FPR; each gets the highest-TPR threshold within budget.
+    for op in curve.calibration_points(targets):
+        suffix = f"fpr{int(round(op.target_fpr * 100))}"
         out_path = out_dir / f"{args.out_prefix}_{suffix}.json"
         payload: Dict[str, object] = {
             "source_predictions": str(pred_path),
-            "target_fpr": target,
-            "threshold": threshold,
-            "actual_fpr": actual_fpr,
-            "n_neg": len(neg_scores),
-            "n_pos": len(pos_scores),
+            "target_fpr": op.target_fpr,
+            "threshold": op.threshold,
+            "actual_fpr": op.fpr,
+            "actual_tpr": op.tpr,
+            "n_neg": curve.n_neg,
+            "n_pos": curve.n_pos,
             "pos_rate": pos_rate,
             "normalize_infer": normalize_infer,
         }
@@ -2,9 +2,16 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 from pathlib import Path
 from typing import Dict, Iterable, List, Tuple
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from src.eval.predictions import find_predictions, load_predictions
+
 
 def _load_jsonl(path: Path) -> Iterable[Dict]:
     with path.open("r", encoding="utf-8") as f:
@@ -96,9 +103,10 @@ def main() -> None:
     args = parse_args()
     run_dir = Path(args.run_dir)
     split = args.split
-    pred_path = run_dir / f"predictions_{split}.jsonl"
-    if not pred_path.exists():
-        raise SystemExit(f"Missing predictions file: {pred_path}")
+    try:
+        pred_path = find_predictions(run_dir, split)
+    except FileNotFoundError as exc:
+        raise SystemExit(str(exc)) from exc
 
     cfg_path = run_dir / "config.json"
     if not cfg_path.exists():
@@ -111,9 +119,10 @@ def main() -> None:
 
     threshold = _load_threshold(run_dir)
 
-    preds: List[Tuple[str, int, float]] = []
-    for row in _load_jsonl(pred_path):
-        preds.append((row["id"], int(row["label"]), float(row["score"])))
+    predictions = load_predictions(pred_path)
+    preds: List[Tuple[str, int, float]] = list(
+        zip(predictions.ids.tolist(), predictions.labels.tolist(), predictions.scores.tolist())
+    )
 
     fps, fns = _select_errors(preds, threshold)
     needed_ids = {ex_id for ex_id, _, _, _ in fps + fns}
@@ -5,24 +5,44 @@ import json
 import sys
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import partial
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import Any, Dict, List, Sequence, Tuple
 
 import numpy as np
 import torch
 from peft import PeftModel
 from sklearn.metrics import average_precision_score, roc_auc_score
-from torch.utils.data import DataLoader, Dataset
-from transformers import AutoModelForSequenceClassification, AutoTokenizer, DataCollatorWithPadding
+from torch.utils.data import DataLoader
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
+from src.data.batching import BatchPlan, plan_token_batches, restore_order
 from src.data.io import load_examples
+from src.data.token_cache import (
+    EncodedSplit,
+    TokenizedDataset,
+    concat_encoded,
+    load_or_encode,
+    sha256_file,
+)
+from src.eval.grid import (
+    eval_cell_flags,
+    eval_cell_key,
+    evaluation_key,
+    record_evaluations,
+    run_content_sha256,
+)
+from src.eval.metrics import bootstrap_metrics, threshold_metrics
+from src.eval.predictions import predictions_path, write_predictions
 from src.preprocess.normalize import normalize_text as normalize_infer_text
 from src.preprocess.unicode import normalize_text
 
+DEFAULT_TOKEN_CACHE_DIR = REPO_ROOT / ".cache" / "tokenized"
+
 
 @dataclass
 class Record:
@@ -31,27 +51,6 @@ class Record:
     label: int
 
 
-class TextDataset(Dataset):
-    def __init__(self, rows: List[Record], tokenizer, max_length: int):
-        self.rows = rows
-        self.tokenizer = tokenizer
-        self.max_length = max_length
-
-    def __len__(self) -> int:
-        return len(self.rows)
-
-    def __getitem__(self, idx: int) -> Dict:
-        row = self.rows[idx]
-        enc = self.tokenizer(
-            row.text,
-            truncation=True,
-            max_length=self.max_length,
-        )
-        enc["labels"] = row.label
-        enc["id"] = row.id
-        return enc
-
-
 def _apply_score_transform(scores_p1: List[float], score_transform: str) -> List[float]:
     if score_transform == "invert":
         return [1.0 - s for s in scores_p1]
@@ -139,15 +138,9 @@ def _load_records(path: Path, use_unicode: bool, normalize_infer: bool, normaliz
     return rows
 
 
-def _collate_with_extras(features: List[Dict], data_collator) -> Dict:
-    tensor_keys = {"input_ids", "attention_mask", "token_type_ids", "labels", "label"}
-    extras = {}
-    for key in list(features[0].keys()):
-        if key not in tensor_keys:
-            extras[key] = [f.pop(key) for f in features]
-    batch = data_collator(features)
-    batch.update(extras)
-    return batch
+def _collate_to_tensors(indices: List[int], dataset: TokenizedDataset) -> Dict:
+    batch = dataset.collate(indices)
+    return {k: torch.from_numpy(v) if isinstance(v, np.ndarray) else v for k, v in batch.items()}
 
 
 def _compute_metrics_with_threshold(
@@ -164,12 +157,8 @@ def _compute_metrics_with_threshold(
     else:
         auroc = None
         auprc = None
-    pred_attack = y_score_arr >= threshold
-    pos = y_true_arr == 1
-    neg = y_true_arr == 0
-    tpr = float((pred_attack & pos).sum() / pos.sum()) if pos.sum() else 0.0
-    fpr = float((pred_attack & neg).sum() / neg.sum()) if neg.sum() else 0.0
-    asr = float((~pred_attack & pos).sum() / pos.sum()) if pos.sum() else 0.0
+    rates = threshold_metrics(y_true_arr, y_score_arr, [threshold])[0]
+    tpr, fpr, asr = rates["tpr"], rates["fpr"], rates["asr"]
     return {
         "auroc": auroc,
         "auprc": auprc,
@@ -207,122 +196,188 @@ def _compute_metrics_no_threshold(y_true: List[int], y_score: List[float]) -> Di
     }
 
 
-def _write_predictions(path: Path, ids: Iterable[str], y_true: Iterable[int], y_score: Iterable[float]) -> None:
-    with path.open("w", encoding="utf-8") as f:
-        for ex_id, y, s in zip(ids, y_true, y_score):
-            f.write(json.dumps({"id": ex_id, "label": int(y), "score": float(s)}) + "\n")
-
-
-def _load_evaluation_manifest(run_dir: Path) -> Dict:
-    manifest_path = run_dir / "evaluation_manifest.json"
-    if not manifest_path.exists():
-        return {
-            "generated_by": "scripts/eval_lora_from_run.py",
-            "run_dir": str(run_dir.resolve()),
-            "evaluations": {},
-        }
-    with manifest_path.open("r", encoding="utf-8") as handle:
-        manifest = json.load(handle)
-    if not isinstance(manifest.get("evaluations"), dict):
-        manifest["evaluations"] = {}
-    return manifest
-
-
-def _write_evaluation_manifest(run_dir: Path, evaluation_key: str, payload: Dict) -> Path:
-    manifest = _load_evaluation_manifest(run_dir)
-    manifest["evaluations"][evaluation_key] = payload
-    manifest["updated_at"] = datetime.now(timezone.utc).isoformat()
-    manifest_path = run_dir / "evaluation_manifest.json"
-    manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
-    return manifest_path
-
-
-def parse_args() -> argparse.Namespace:
-    ap = argparse.ArgumentParser(description="Evaluate a saved LoRA run on a new dataset split.")
-    ap.add_argument("--run_dir", required=True, help="Path to run directory (runs/lora_v1_*)")
-    ap.add_argument("--data", required=True, help="Path to dataset jsonl")
-    ap.add_argument("--split_name", required=True, help="Split name for outputs (e.g., test_main_unicode)")
-    ap.add_argument("--target_fpr", type=float, default=0.01)
-    ap.add_argument("--batch_size", type=int, default=16)
-    ap.add_argument("--num_workers", type=int, default=0)
-    group = ap.add_mutually_exclusive_group()
-    group.add_argument("--fail_if_inverted", action="store_true", help="Fail if scores appear inverted.")
-    ap.add_argument(
-        "--normalize_infer",
-        action="store_true",
-        help="Apply NFKC + strip Cf (and optionally Mn) at inference time.",
-    )
-    ap.add_argument(
-        "--normalize_drop_mn",
-        action="store_true",
-        help="When --normalize_infer is set, also drop Mn characters.",
-    )
-    ap.set_defaults(fail_if_inverted=False)
-    return ap.parse_args()
+@dataclass(frozen=True)
+class EvalOptions:
+    target_fpr: float = 0.01
+    batch_size: int = 16
+    num_workers: int = 0
+    max_tokens: int | None = None
+    token_cache_dir: Path | None = DEFAULT_TOKEN_CACHE_DIR
+    fail_if_inverted: bool = False
+    normalize_infer: bool = False
+    normalize_drop_mn: bool = False
+    bootstrap: int = 0
+    bootstrap_seed: int = 0
+    export_jsonl: bool = False
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> "EvalOptions":
+        return cls(
+            target_fpr=args.target_fpr,
+            batch_size=args.batch_size,
+            num_workers=args.num_workers,
+            max_tokens=args.max_tokens,
+            token_cache_dir=None if args.no_token_cache else Path(args.token_cache_dir),
+            fail_if_inverted=bool(args.fail_if_inverted),
+            normalize_infer=bool(args.normalize_infer),
+            normalize_drop_mn=bool(args.normalize_drop_mn),
+            bootstrap=args.bootstrap,
+            bootstrap_seed=args.bootstrap_seed,
+            export_jsonl=bool(args.export_jsonl),
+        )
 
+    def cell_flags(self) -> Dict:
+        return eval_cell_flags(
+            target_fpr=self.target_fpr,
+            normalize_infer=self.normalize_infer,
+            normalize_drop_mn=self.normalize_drop_mn,
+            bootstrap=self.bootstrap,
+            bootstrap_seed=self.bootstrap_seed,
+        )
 
-def main() -> None:
-    args = parse_args()
-    run_dir = Path(args.run_dir)
-    data_path = Path(args.data)
-    split_name = args.split_name
 
+@dataclass
+class LoadedRun:
+    """A run's config, tokenizer and adapter model, loaded once and reused across splits."""
+
+    run_dir: Path
+    cfg: Dict
+    tokenizer: Any
+    model: Any
+    device: str
+    score_transform: str
+    val_threshold: float | None
+    max_length: int
+    use_unicode: bool
+    attack_class_index: int
+    adapter_sha256: str
+
+
+def load_run(run_dir: Path) -> LoadedRun:
     cfg = _load_config(run_dir)
     backbone = cfg.get("backbone") or cfg.get("model_name")
     if not backbone:
         raise KeyError("Missing backbone/model_name in run config.json.")
 
-    use_unicode = bool(cfg.get("unicode", False))
-    attack_class_index = int(cfg.get("attack_class_index", 1))
+    score_transform = _require_score_transform(cfg)
     tokenizer = _load_tokenizer(run_dir, backbone)
     model = _load_model(run_dir, backbone)
     device = "cuda" if torch.cuda.is_available() else "cpu"
     model.to(device)
     model.eval()
 
-    score_transform = _require_score_transform(cfg)
     val_threshold = _load_val_threshold(cfg)
-    target_fpr = float(cfg.get("target_fpr", args.target_fpr))
     if val_threshold is None:
         print("Warning: missing val_threshold in config.json; writing AUROC/AUPRC only.")
     print(
         "Using score_transform="
         f"{score_transform} unicode_preprocess={bool(cfg.get('unicode', False))}"
     )
-    max_length = int(cfg.get("max_length", 256))
+    return LoadedRun(
+        run_dir=run_dir,
+        cfg=cfg,
+        tokenizer=tokenizer,
+        model=model,
+        device=device,
+        score_transform=score_transform,
+        val_threshold=val_threshold,
+        max_length=int(cfg.get("max_length", 256)),
+        use_unicode=bool(cfg.get("unicode", False)),
+        attack_class_index=int(cfg.get("attack_class_index", 1)),
+        adapter_sha256=run_content_sha256(run_dir),
+    )
+
 
-    rows = _load_records(
+def _encode_split(run: LoadedRun, data_path: Path, options: EvalOptions) -> Tuple[EncodedSplit, bool]:
+    def _rows() -> Tuple[List[str], List[str], List[int]]:
+        rows = _load_records(
+            data_path,
+            use_unicode=run.use_unicode,
+            normalize_infer=options.normalize_infer,
+            normalize_drop_mn=options.normalize_drop_mn,
+        )
+        return [r.id for r in rows], [r.text for r in rows], [r.label for r in rows]
+
+    # Same preprocess keys as train_lora.encode_split, so both scripts share entries.
+    preprocess = {
+        "unicode": run.use_unicode,
+        "normalize": options.normalize_infer,
+        "normalize_drop_mn": bool(options.normalize_infer and options.normalize_drop_mn),
+        "aug_adv2_prob": 0.0,
+        "aug_rewrite_prob": 0.0,
+        "aug_seed": None,
+    }
+    split, cache_hit = load_or_encode(
         data_path,
-        use_unicode=use_unicode,
-        normalize_infer=bool(args.normalize_infer),
-        normalize_drop_mn=bool(args.normalize_drop_mn),
-    )
-    data_collator = DataCollatorWithPadding(tokenizer=tokenizer, return_tensors="pt")
-    collate_fn = lambda feats: _collate_with_extras(feats, data_collator)  # noqa: E731
-    loader = DataLoader(
-        TextDataset(rows, tokenizer, max_length),
-        batch_size=args.batch_size,
-        shuffle=False,
-        collate_fn=collate_fn,
-        num_workers=args.num_workers,
+        _rows,
+        run.tokenizer,
+        run.max_length,
+        preprocess=preprocess,
+        cache_dir=options.token_cache_dir,
     )
+    if options.token_cache_dir is not None:
+        print(f"Token cache {'hit' if cache_hit else 'miss'} for {data_path.name}")
+    return split, cache_hit
+
+
+def _score_encoded(
+    run: LoadedRun, split: EncodedSplit, options: EvalOptions
+) -> Tuple[List[float], BatchPlan | None]:
+    """Attack probability for every row of ``split``, in row order."""
+    tokenizer = run.tokenizer
+    dataset = TokenizedDataset(split, tokenizer.pad_token_id, padding_side=tokenizer.padding_side)
+    collate_fn = partial(_collate_to_tensors, dataset=dataset)
+    batch_plan = None
+    if options.max_tokens is not None:
+        batch_plan = plan_token_batches(
+            split.lengths.tolist(), options.max_tokens, naive_batch_size=options.batch_size
+        )
+        loader = DataLoader(
+            dataset,
+            batch_sampler=batch_plan.batches,
+            collate_fn=collate_fn,
+            num_workers=options.num_workers,
+        )
+        print(f"Length-bucketed batching: {json.dumps(batch_plan.stats.as_dict())}")
+    else:
+        loader = DataLoader(
+            dataset,
+            batch_size=options.batch_size,
+            shuffle=False,
+            collate_fn=collate_fn,
+            num_workers=options.num_workers,
+        )
 
-    all_ids: List[str] = []
-    all_labels: List[int] = []
-    all_scores_p_attack: List[float] = []
+    scores_p_attack: List[float] = []
     with torch.no_grad():
         for batch in loader:
-            ids = batch.pop("id")
-            labels = batch.pop("labels")
-            inputs = {k: v.to(device) for k, v in batch.items() if torch.is_tensor(v)}
-            logits = model(**inputs).logits
+            batch.pop("id")
+            batch.pop("labels")
+            inputs = {k: v.to(run.device) for k, v in batch.items() if torch.is_tensor(v)}
+            logits = run.model(**inputs).logits
             probs = torch.softmax(logits.float(), dim=-1)
-            score_p_attack = probs[:, attack_class_index]
-            all_ids.extend(ids)
-            all_labels.extend(labels.detach().cpu().tolist())
-            all_scores_p_attack.extend(score_p_attack.detach().cpu().tolist())
-
-    all_scores = _apply_score_transform(all_scores_p_attack, score_transform)
+            scores_p_attack.extend(probs[:, run.attack_class_index].detach().cpu().tolist())
+
+    if batch_plan is not None:
+        scores_p_attack = restore_order(scores_p_attack, batch_plan.batches)
+    return scores_p_attack, batch_plan
+
+
+def _write_split_outputs(
+    run: LoadedRun,
+    data_path: Path,
+    split_name: str,
+    split: EncodedSplit,
+    scores_p_attack: List[float],
+    options: EvalOptions,
+) -> Tuple[str, Dict]:
+    """Compute a split's metrics, write its predictions and metrics, and build its manifest entry."""
+    run_dir = run.run_dir
+    target_fpr = float(run.cfg.get("target_fpr", options.target_fpr))
+    all_ids = list(split.ids)
+    all_labels = np.asarray(split.labels, dtype=int).tolist()
+    val_threshold = run.val_threshold
+    all_scores = _apply_score_transform(scores_p_attack, run.score_transform)
     if val_threshold is None:
         metrics = _compute_metrics_no_threshold(all_labels, all_scores)
     else:
@@ -332,12 +387,20 @@ def main() -> None:
     metrics["split"] = split_name
     metrics["threshold_source"] = "val" if val_threshold is not None else None
     metrics["score_is_attack_prob"] = True
-    metrics["score_transform"] = score_transform
-    metrics["normalize_infer"] = bool(args.normalize_infer)
-    metrics["normalize_drop_mn"] = bool(args.normalize_drop_mn)
+    metrics["score_transform"] = run.score_transform
+    metrics["normalize_infer"] = options.normalize_infer
+    metrics["normalize_drop_mn"] = options.normalize_drop_mn
+    if options.bootstrap > 0 and len(set(all_labels)) > 1:
+        metrics["ci"] = bootstrap_metrics(
+            all_labels,
+            all_scores,
+            target_fpr=target_fpr,
+            n_boot=options.bootstrap,
+            seed=options.bootstrap_seed,
+        )
 
     auc, inv_auc, inverted = _auc_stats(all_labels, all_scores)
-    if inverted and args.fail_if_inverted:
+    if inverted and options.fail_if_inverted:
         raise RuntimeError(
             f"AUROC={auc:.4f} suggests inverted scores (inv_auc={inv_auc:.4f}). "
             "Check score_transform in run config."
@@ -354,33 +417,195 @@ def main() -> None:
                 f"fpr@thr={metrics.get('fpr_actual'):.4f} tpr@thr={metrics.get('tpr_at_fpr'):.4f}"
             )
 
-    suffix = "_norm" if args.normalize_infer else ""
-    evaluation_key = f"{split_name}{suffix}"
-    pred_path = run_dir / f"predictions_{evaluation_key}.jsonl"
-    _write_predictions(pred_path, all_ids, all_labels, all_scores)
+    key = evaluation_key(split_name, options.normalize_infer)
+    pred_path = write_predictions(
+        predictions_path(run_dir, key),
+        all_ids,
+        all_labels,
+        all_scores,
+        split=key,
+        export_jsonl=options.export_jsonl,
+    )
 
-    metrics_path = run_dir / f"final_metrics_{evaluation_key}.json"
+    metrics_path = run_dir / f"final_metrics_{key}.json"
     metrics_path.write_text(json.dumps(metrics, indent=2), encoding="utf-8")
 
+    dataset_sha256 = sha256_file(data_path)
     manifest_payload = {
         "split_name": split_name,
         "data_path": str(data_path.resolve()),
         "predictions_path": str(pred_path.resolve()),
         "metrics_path": str(metrics_path.resolve()),
-        "normalize_infer": bool(args.normalize_infer),
-        "normalize_drop_mn": bool(args.normalize_drop_mn),
-        "score_transform": score_transform,
+        "normalize_infer": options.normalize_infer,
+        "normalize_drop_mn": options.normalize_drop_mn,
+        "score_transform": run.score_transform,
         "score_is_attack_prob": True,
         "threshold_source": metrics.get("threshold_source"),
         "threshold": metrics.get("threshold"),
         "target_fpr": target_fpr,
+        "bootstrap": options.bootstrap or None,
+        "adapter_sha256": run.adapter_sha256,
+        "dataset_sha256": dataset_sha256,
+        "cell_key": eval_cell_key(run.adapter_sha256, dataset_sha256, options.cell_flags()),
         "evaluated_at": datetime.now(timezone.utc).isoformat(),
     }
-    manifest_path = _write_evaluation_manifest(run_dir, evaluation_key, manifest_payload)
+    return key, manifest_payload
+
+
+def evaluate_splits(
+    run: LoadedRun, splits: Sequence[Tuple[str, Path]], options: EvalOptions
+) -> Dict[str, Dict]:
+    """Score ``(split_name, data_path)`` pairs in one batched pass and write each split's outputs.
+
+    All splits are concatenated so batches (and length buckets under
+    ``max_tokens``) span split boundaries. Returns evaluation key -> manifest
+    entry; the caller records them.
+    """
+    names = [name for name, _ in splits]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate split name(s): {', '.join(duplicates)}")
+    encoded = [_encode_split(run, Path(data_path), options) for _, data_path in splits]
+    combined = concat_encoded([split for split, _ in encoded])
+    scores_p_attack, batch_plan = _score_encoded(run, combined, options)
+
+    entries: Dict[str, Dict] = {}
+    start = 0
+    for (split_name, data_path), (split, cache_hit) in zip(splits, encoded):
+        end = start + len(split)
+        key, payload = _write_split_outputs(
+            run, Path(data_path), split_name, split, scores_p_attack[start:end], options
+        )
+        start = end
+        # Batching stats describe the whole pass; splits_in_pass names everything it scored.
+        payload["batching"] = batch_plan.stats.as_dict() if batch_plan is not None else None
+        payload["splits_in_pass"] = names if len(names) > 1 else None
+        payload["token_cache_hit"] = cache_hit
+        entries[key] = payload
+    return entries
+
+
+def evaluate_split(
+    run: LoadedRun, data_path: Path, split_name: str, options: EvalOptions
+) -> Tuple[str, Dict]:
+    """Single-split ``evaluate_splits``; returns ``(evaluation_key, manifest entry)``."""
+    ((key, payload),) = evaluate_splits(run, [(split_name, data_path)], options).items()
+    return key, payload
+
+
+def _parse_split_list(value: str) -> List[Tuple[str, Path]]:
+    splits: List[Tuple[str, Path]] = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, sep, path = item.partition("=")
+        if not sep or not name.strip() or not path.strip():
+            raise ValueError(f"--splits entries must look like name=path, got {item!r}")
+        splits.append((name.strip(), Path(path.strip())))
+    return splits
+
+
+def _load_split_manifest(path: Path) -> List[Tuple[str, Path]]:
+    """A JSON ``{"name": "path"}`` object or a list of ``{"split_name", "data"}`` entries."""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if isinstance(data, dict):
+        return [(str(name), Path(data_path)) for name, data_path in data.items()]
+    if not isinstance(data, list):
+        raise TypeError("Split manifest must be a JSON object or list")
+    splits: List[Tuple[str, Path]] = []
+    for entry in data:
+        if not isinstance(entry, dict) or not entry.get("split_name") or not entry.get("data"):
+            raise ValueError(f"Split manifest entries need split_name and data: {entry!r}")
+        splits.append((str(entry["split_name"]), Path(entry["data"])))
+    return splits
 
-    print(
-        f"Wrote {pred_path.name}, {metrics_path.name}, and {manifest_path.name} in {run_dir}"
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Evaluate a saved LoRA run on one or more dataset splits.")
+    ap.add_argument("--run_dir", required=True, help="Path to run directory (runs/lora_v1_*)")
+    ap.add_argument("--data", help="Path to dataset jsonl (single split)")
+    ap.add_argument("--split_name", help="Split name for outputs (e.g., test_main_unicode)")
+    ap.add_argument(
+        "--splits",
+        default="",
+        help="Comma-separated name=path pairs scored with one model load (e.g., val=data/v1/val.jsonl,...)",
+    )
+    ap.add_argument(
+        "--split_manifest",
+        help='JSON file of splits: {"name": "path"} or [{"split_name": ..., "data": ...}]',
+    )
+    ap.add_argument("--target_fpr", type=float, default=0.01)
+    ap.add_argument("--batch_size", type=int, default=16)
+    ap.add_argument("--num_workers", type=int, default=0)
+    ap.add_argument(
+        "--max_tokens",
+        type=int,
+        default=None,
+        help="Bucket rows by token length into batches under this padded-token budget.",
+    )
+    ap.add_argument(
+        "--token_cache_dir",
+        default=str(DEFAULT_TOKEN_CACHE_DIR),
+        help="Directory for pre-tokenized split caches (default: .cache/tokenized)",
+    )
+    ap.add_argument("--no_token_cache", action="store_true", help="Tokenize in memory without caching")
+    group = ap.add_mutually_exclusive_group()
+    group.add_argument("--fail_if_inverted", action="store_true", help="Fail if scores appear inverted.")
+    ap.add_argument(
+        "--normalize_infer",
+        action="store_true",
+        help="Apply NFKC + strip Cf (and optionally Mn) at inference time.",
+    )
+    ap.add_argument(
+        "--normalize_drop_mn",
+        action="store_true",
+        help="When --normalize_infer is set, also drop Mn characters.",
+    )
+    ap.add_argument(
+        "--bootstrap",
+        type=int,
+        default=0,
+        help="Attach percentile CIs for AUROC/AUPRC/TPR@FPR from N bootstrap replicates (default: off).",
+    )
+    ap.add_argument("--bootstrap_seed", type=int, default=0)
+    ap.add_argument(
+        "--export_jsonl",
+        action="store_true",
+        help="Also write predictions_<split>.jsonl next to the .npz predictions.",
     )
+    ap.set_defaults(fail_if_inverted=False)
+    args = ap.parse_args()
+    modes = sum([bool(args.data or args.split_name), bool(args.splits), bool(args.split_manifest)])
+    if modes != 1:
+        ap.error("use exactly one of --data/--split_name, --splits or --split_manifest")
+    if bool(args.data) != bool(args.split_name):
+        ap.error("--data and --split_name must be given together")
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    run_dir = Path(args.run_dir)
+    if args.split_manifest:
+        splits = _load_split_manifest(Path(args.split_manifest))
+    elif args.splits:
+        splits = _parse_split_list(args.splits)
+    else:
+        splits = [(args.split_name, Path(args.data))]
+    if not splits:
+        raise SystemExit("No splits provided for evaluation")
+    for _, data_path in splits:
+        if not data_path.exists():
+            raise FileNotFoundError(f"Missing dataset: {data_path}")
+
+    run = load_run(run_dir)
+    entries = evaluate_splits(run, splits, EvalOptions.from_args(args))
+    manifest_path = record_evaluations(run_dir, entries)
+
+    for payload in entries.values():
+        print(f"Wrote {Path(payload['predictions_path']).name} and {Path(payload['metrics_path']).name}")
+    print(f"Recorded {len(entries)} evaluation(s) in {manifest_path.name} in {run_dir}")
 
 
 if __name__ == "__main__":
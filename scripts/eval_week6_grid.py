@@ -94,27 +94,29 @@ def main() -> None:
     table_path = out_dir / "tables" / f"{run_name}_metrics.md"
 
     splits_run: List[str] = []
+    split_args: List[str] = []
     for split, rel_path in DATASETS:
         data_path = REPO_ROOT / rel_path
         if not data_path.exists():
             print(f"Skipping missing dataset: {data_path}")
             continue
+        splits_run.append(split)
+        split_args.append(f"{split}={data_path}")
+
+    if splits_run:
         _run(
             [
                 sys.executable,
                 str(REPO_ROOT / "scripts" / "eval_lora_from_run.py"),
                 "--run_dir",
                 str(run_dir),
-                "--data",
-                str(data_path),
-                "--split_name",
-                split,
+                "--splits",
+                ",".join(split_args),
             ]
         )
-        _copy_metrics(run_dir, metrics_dir, split)
-        splits_run.append(split)
+        for split in splits_run:
+            _copy_metrics(run_dir, metrics_dir, split)
 
-    if splits_run:
         plotter = REPO_ROOT / "scripts" / "plot_predictions.py"
         if plotter.exists():
             _run(
@@ -9,6 +9,18 @@ from typing import Dict, List, Tuple
 
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from src.data.token_cache import sha256_file
+from src.eval.grid import (
+    cell_is_current,
+    eval_cell_flags,
+    eval_cell_key,
+    evaluation_key,
+    record_evaluations,
+    run_content_sha256,
+)
 
 DATASETS: List[Tuple[str, str]] = [
     ("val", "data/v1/val.jsonl"),
@@ -22,12 +34,51 @@ DATASETS: List[Tuple[str, str]] = [
     ("test_jbb_rewrite", "data/v1_rewrite/test_jbb_rewrite.jsonl"),
 ]
 
+# Options that shape each cell's outputs; part of the cell key.
+CELL_OPTIONS = {
+    "target_fpr": 0.01,
+    "normalize_infer": False,
+    "normalize_drop_mn": False,
+    "bootstrap": 0,
+    "bootstrap_seed": 0,
+}
+
 
 def _run(cmd: List[str]) -> None:
     print("Running:", " ".join(cmd))
     subprocess.run(cmd, check=True)
 
 
+def _stale_splits(run_dir: Path, dataset_sha256: Dict[str, str], force: bool) -> List[str]:
+    """Splits whose outputs in ``run_dir`` are missing or were produced for other content/flags."""
+    if force:
+        return list(dataset_sha256)
+    adapter_sha256 = run_content_sha256(run_dir)
+    flags = eval_cell_flags(**CELL_OPTIONS)
+    return [
+        split
+        for split, sha in dataset_sha256.items()
+        if not cell_is_current(
+            run_dir,
+            evaluation_key(split, CELL_OPTIONS["normalize_infer"]),
+            eval_cell_key(adapter_sha256, sha, flags),
+        )
+    ]
+
+
+def _evaluate_in_process(run_dir: Path, splits: List[str], args: argparse.Namespace) -> None:
+    """Evaluate ``splits`` in one batched pass with one in-process load of the run's model."""
+    # Imported lazily so a fully current grid never imports torch or loads a model.
+    import eval_lora_from_run as evaluator
+
+    run = evaluator.load_run(run_dir)
+    options = evaluator.EvalOptions(**CELL_OPTIONS, batch_size=args.batch_size, max_tokens=args.max_tokens)
+    paths = dict(DATASETS)
+    print(f"Evaluating {run_dir.name}: {', '.join(splits)}")
+    entries = evaluator.evaluate_splits(run, [(split, REPO_ROOT / paths[split]) for split in splits], options)
+    record_evaluations(run_dir, entries)
+
+
 def _copy_metrics(run_dir: Path, metrics_dir: Path, split: str) -> None:
     src = run_dir / f"final_metrics_{split}.json"
     if not src.exists():
@@ -184,6 +235,15 @@ def parse_args() -> argparse.Namespace:
     ap.add_argument("--run_manifest", default=str(REPO_ROOT / "reports" / "week7" / "run_manifest.json"))
     ap.add_argument("--run_dirs", default="", help="Comma-separated run directories (optional)")
     ap.add_argument("--out_dir", default=str(REPO_ROOT / "reports" / "week7"))
+    ap.add_argument("--force", action="store_true", help="Re-evaluate every cell even if it is current.")
+    ap.add_argument("--dry_run", action="store_true", help="Only report which cells would be evaluated.")
+    ap.add_argument("--batch_size", type=int, default=16)
+    ap.add_argument(
+        "--max_tokens",
+        type=int,
+        default=None,
+        help="Bucket rows by token length into batches under this padded-token budget.",
+    )
     return ap.parse_args()
 
 
@@ -197,12 +257,15 @@ def main() -> None:
         raise SystemExit("No runs provided for evaluation")
 
     splits_run: List[str] = []
+    dataset_sha256: Dict[str, str] = {}
     for split, rel_path in DATASETS:
         data_path = REPO_ROOT / rel_path
         if not data_path.exists():
             raise FileNotFoundError(f"Missing dataset: {data_path}")
         splits_run.append(split)
+        dataset_sha256[split] = sha256_file(data_path)
 
+    evaluated = skipped = 0
     for run_id, run_dir in runs:
         if not run_dir.exists():
             raise FileNotFoundError(f"Run dir not found: {run_dir}")
@@ -212,24 +275,22 @@ def main() -> None:
         figures_dir = out_dir / "figures" / run_id
         table_path = out_dir / f"{run_id}_metrics.md"
 
-        for split, rel_path in DATASETS:
-            data_path = REPO_ROOT / rel_path
-            _run(
-                [
-                    sys.executable,
-                    str(REPO_ROOT / "scripts" / "eval_lora_from_run.py"),
-                    "--run_dir",
-                    str(run_dir),
-                    "--data",
-                    str(data_path),
-                    "--split_name",
-                    split,
-                ]
-            )
+        stale = _stale_splits(run_dir, dataset_sha256, args.force)
+        print(f"{run_id}: {len(splits_run) - len(stale)} cell(s) current, {len(stale)} to evaluate")
+        if args.dry_run:
+            for split in stale:
+                print(f"  would evaluate {split}")
+            continue
+        if stale:
+            _evaluate_in_process(run_dir, stale, args)
+            evaluated += len(stale)
+        skipped += len(splits_run) - len(stale)
+
+        for split in splits_run:
             _copy_metrics(run_dir, metrics_dir, split)
 
         plotter = REPO_ROOT / "scripts" / "plot_predictions.py"
-        if plotter.exists():
+        if plotter.exists() and (stale or not figures_dir.exists()):
             _run(
                 [
                     sys.executable,
@@ -245,6 +306,10 @@ def main() -> None:
         dumper = REPO_ROOT / "scripts" / "dump_error_cases.py"
         if dumper.exists():
             for split in splits_run:
+                out_fp = errors_dir / f"{split}_fp.md"
+                out_fn = errors_dir / f"{split}_fn.md"
+                if split not in stale and out_fp.exists() and out_fn.exists():
+                    continue
                 _run(
                     [
                         sys.executable,
@@ -254,15 +319,19 @@ def main() -> None:
                         "--split",
                         split,
                         "--out_fp",
-                        str(errors_dir / f"{split}_fp.md"),
+                        str(out_fp),
                         "--out_fn",
-                        str(errors_dir / f"{split}_fn.md"),
+                        str(out_fn),
                     ]
                 )
 
         _write_metrics_table(metrics_dir, table_path, splits_run)
         print(f"Wrote metrics table: {table_path}")
 
+    if args.dry_run:
+        return
+    print(f"Evaluated {evaluated} cell(s); skipped {skipped} current cell(s).")
+
     results_dir = out_dir / "results"
     _write_long_tables(
         metrics_root,
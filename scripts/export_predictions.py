@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from src.eval.predictions import (
+    LEGACY_SUFFIX,
+    PREDICTIONS_SUFFIX,
+    export_jsonl_file,
+    list_prediction_splits,
+    load_predictions,
+    predictions_path,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Export columnar predictions_<split>.npz files to JSONL.")
+    group = ap.add_mutually_exclusive_group(required=True)
+    group.add_argument("--run_dir", help="Export every predictions_*.npz in this run directory.")
+    group.add_argument("--path", help="Export a single .npz predictions file.")
+    ap.add_argument("--splits", default="", help="Comma-separated split names (with --run_dir).")
+    ap.add_argument("--out", help="Output .jsonl (with --path; default: next to the .npz).")
+    return ap.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.path:
+        sources = [Path(args.path)]
+    else:
+        splits = [s.strip() for s in args.splits.split(",") if s.strip()]
+        if splits:
+            sources = [predictions_path(args.run_dir, split) for split in splits]
+        else:
+            sources = [
+                path for path in list_prediction_splits(args.run_dir).values() if path.suffix == PREDICTIONS_SUFFIX
+            ]
+        if not sources:
+            raise SystemExit(f"No predictions_*{PREDICTIONS_SUFFIX} found in {args.run_dir}")
+    for source in sources:
+        if not source.exists():
+            raise SystemExit(f"Missing predictions file: {source}")
+        out_path = Path(args.out) if args.out else source.with_suffix(LEGACY_SUFFIX)
+        export_jsonl_file(load_predictions(source), out_path)
+        print(f"Wrote {out_path}")
+
+
+if __name__ == "__main__":
+    main()
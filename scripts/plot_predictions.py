@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 from pathlib import Path
 from typing import List, Tuple
 
@@ -15,20 +16,15 @@ import matplotlib.pyplot as plt  # noqa: E402
 
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from src.eval.predictions import find_predictions, list_prediction_splits, load_predictions  # noqa: E402
 
 
 def _load_predictions(path: Path) -> Tuple[List[int], List[float]]:
-    y_true: List[int] = []
-    y_score: List[float] = []
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            row = json.loads(line)
-            y_true.append(int(row["label"]))
-            y_score.append(float(row["score"]))
-    return y_true, y_score
+    predictions = load_predictions(path)
+    return predictions.labels.tolist(), predictions.scores.tolist()
 
 
 def _safe_mean(values: List[float]) -> float | None:
@@ -113,12 +109,7 @@ def _plot_hist(y_true: List[int], y_score: List[float], out_path: Path, title: s
 
 
 def _infer_splits(run_dir: Path) -> List[str]:
-    splits = []
-    for path in sorted(run_dir.glob("predictions_*.jsonl")):
-        name = path.stem[len("predictions_") :]
-        if name:
-            splits.append(name)
-    return splits
+    return [name for name in list_prediction_splits(run_dir) if name]
 
 
 def parse_args() -> argparse.Namespace:
@@ -139,15 +130,16 @@ def main() -> None:
     if not splits:
         splits = _infer_splits(run_dir)
     if not splits:
-        raise SystemExit(f"No predictions_*.jsonl found in {run_dir}")
+        raise SystemExit(f"No predictions_*.npz or predictions_*.jsonl found in {run_dir}")
 
     run_id = run_dir.name
     out_dir = Path(args.out_dir) if args.out_dir else REPO_ROOT / "reports" / "week5" / "figures" / run_id
 
     for split in splits:
-        pred_path = run_dir / f"predictions_{split}.jsonl"
-        if not pred_path.exists():
-            print(f"Skipping missing predictions file: {pred_path}")
+        try:
+            pred_path = find_predictions(run_dir, split)
+        except FileNotFoundError as exc:
+            print(f"Skipping: {exc}")
             continue
         y_true, y_score = _load_predictions(pred_path)
         stem = f"{run_id}_{split}"
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from src.data.io import load_examples
+from src.eval.metrics import score_shift_report
+from src.preprocess.unicode import normalize_text
+
+from llm_jailbreak_detector.lora_detector import QUANTIZED_DIRNAME, LoraDetector
+
+
+def _load_split(path: Path, use_unicode: bool) -> Tuple[List[str], List[int]]:
+    examples = load_examples(str(path))
+    texts = [normalize_text(ex.text) if use_unicode else ex.text for ex in examples]
+    return texts, [int(ex.label) for ex in examples]
+
+
+def _score(detector: LoraDetector, texts: List[str], batch_size: int) -> Tuple[List[float], float]:
+    detector.predict_proba_batch(texts[:1], batch_size=1)  # load before timing
+    start = time.perf_counter()
+    scores = detector.predict_proba_batch(texts, batch_size=batch_size)
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+    return scores, elapsed_ms / max(1, len(texts))
+
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(
+        description="Compare int8 dynamic-quantized LoRA scores against the fp32 run."
+    )
+    ap.add_argument("--run_dir", required=True, help="Path to run directory (runs/lora_v1_*)")
+    ap.add_argument("--data", help="Dataset jsonl to score (default: val_path from config.json)")
+    ap.add_argument("--batch_size", type=int, default=16)
+    ap.add_argument("--target_fpr", type=float, default=None, help="Default: config target_fpr or 0.01")
+    ap.add_argument(
+        "--save_quantized",
+        action="store_true",
+        help=f"Save the quantized model under run_dir/{QUANTIZED_DIRNAME} for fast reload",
+    )
+    ap.add_argument("--out", help="Output JSON (default: run_dir/quantization_report.json)")
+    return ap.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    run_dir = Path(args.run_dir)
+    reference = LoraDetector(run_dir)
+    candidate = LoraDetector(run_dir, quantize="int8")
+    cfg = reference.config
+    data_path = Path(args.data or cfg.get("val_path") or "")
+    if not data_path.is_file():
+        raise FileNotFoundError(f"Dataset not found: {data_path} (pass --data)")
+    target_fpr = float(args.target_fpr if args.target_fpr is not None else cfg.get("target_fpr", 0.01))
+
+    texts, labels = _load_split(data_path, bool(cfg.get("unicode", False)))
+    ref_scores, ref_ms = _score(reference, texts, args.batch_size)
+    cand_scores, cand_ms = _score(candidate, texts, args.batch_size)
+
+    report = score_shift_report(
+        labels, ref_scores, cand_scores, threshold=reference.threshold, target_fpr=target_fpr
+    )
+    report["quantize"] = "int8"
+    report["data_path"] = str(data_path.resolve())
+    report["latency_ms_per_text"] = {
+        "reference": round(ref_ms, 3),
+        "candidate": round(cand_ms, 3),
+        "speedup": round(ref_ms / cand_ms, 3) if cand_ms else None,
+    }
+    if args.save_quantized:
+        saved = candidate.save_quantized()
+        report["saved_to"] = str(saved.resolve())
+        report["saved_size_mb"] = round((saved / "model.pt").stat().st_size / 2**20, 2)
+    report["generated_at"] = datetime.now(timezone.utc).isoformat()
+
+    out_path = Path(args.out) if args.out else run_dir / "quantization_report.json"
+    out_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    shift = report["score_shift"]
+    print(
+        f"int8 vs fp32 on {report['rows']} rows: max|shift|={shift['max_abs']:.4f} "
+        f"flips={report['decision_flips']} "
+        f"dTPR@{target_fpr:g}FPR={report['delta']['tpr_at_fpr']:+.4f} "
+        f"dTPR@val_thr={report['delta']['tpr_at_threshold']:+.4f}"
+    )
+    print(f"Wrote {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 ﻿from __future__ import annotations
 
 import json
+import sys
 from pathlib import Path
 
 import matplotlib
@@ -12,6 +13,11 @@ from sklearn.metrics import roc_curve
 
 
 ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.eval.predictions import load_split_predictions
+
 RUN_DIR = ROOT / "runs" / "week7_norm_only"
 OUT_DIR = ROOT / "thesis_final_tex" / "figures"
 
@@ -19,15 +25,8 @@ THRESHOLD = json.loads((RUN_DIR / "val_operating_point.json").read_text(encoding
 
 
 def load_predictions(split: str) -> tuple[np.ndarray, np.ndarray]:
-    path = RUN_DIR / f"predictions_{split}.jsonl"
-    labels: list[int] = []
-    scores: list[float] = []
-    with path.open("r", encoding="utf-8") as handle:
-        for line in handle:
-            row = json.loads(line)
-            labels.append(int(row["label"]))
-            scores.append(float(row["score"]))
-    return np.asarray(labels, dtype=int), np.asarray(scores, dtype=float)
+    predictions = load_split_predictions(RUN_DIR, split)
+    return predictions.labels.astype(int), predictions.scores
 
 
 def build_roc(split: str, output_name: str, title: str) -> None:
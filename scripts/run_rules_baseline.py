@@ -16,7 +16,7 @@ if REPO_ROOT not in sys.path:
 
 from src.baselines.rules import RulesDetector
 from src.data.io import load_examples
-from src.eval.metrics import compute_metrics
+from src.eval.metrics import compute_metrics, threshold_metrics
 from src.preprocess.unicode import normalize_text
 
 BASELINE_VERSION = "v0.2-week3"
@@ -68,21 +68,14 @@ def _metrics_with_threshold(
 ) -> Dict[str, float | None]:
     auroc = roc_auc_score(y_true, y_score) if len(set(y_true)) > 1 else None
     auprc = average_precision_score(y_true, y_score) if len(set(y_true)) > 1 else None
-    pred_attack = [score >= threshold for score in y_score]
-    pos = [label == 1 for label in y_true]
-    neg = [label == 0 for label in y_true]
-    pos_total = sum(pos)
-    neg_total = sum(neg)
-    tpr = sum(pa and p for pa, p in zip(pred_attack, pos)) / pos_total if pos_total else 0.0
-    fpr = sum(pa and n for pa, n in zip(pred_attack, neg)) / neg_total if neg_total else 0.0
-    asr = sum((not pa) and p for pa, p in zip(pred_attack, pos)) / pos_total if pos_total else 0.0
+    rates = threshold_metrics(y_true, y_score, [threshold])[0]
     return {
         "auroc": auroc,
         "auprc": auprc,
-        "tpr_at_fpr": tpr,
-        "fpr_actual": fpr,
+        "tpr_at_fpr": rates["tpr"],
+        "fpr_actual": rates["fpr"],
         "threshold": float(threshold),
-        "asr_at_threshold": asr,
+        "asr_at_threshold": rates["asr"],
     }
 
 
@@ -10,7 +10,13 @@ from typing import Dict, List
 
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from src.jobs.scheduler import make_job, run_jobs
+
 DEFAULT_SPEC = REPO_ROOT / "reports" / "week7" / "week7_ablation_spec.json"
+DEFAULT_STATE = REPO_ROOT / "reports" / "week7" / "ablation_jobs_state.json"
 REQUIRED_RUN_KEYS = {"run_id", "normalize_train", "aug_adv2_prob", "aug_rewrite_prob", "aug_seed"}
 REQUIRED_CONFIG_KEYS = {"normalize_train", "aug_adv2_prob", "aug_seed", "val_threshold"}
 
@@ -129,6 +135,19 @@ def _validate_config(run_dir: Path) -> Dict:
 def parse_args() -> argparse.Namespace:
     ap = argparse.ArgumentParser(description="Run Week 7 ablation training from spec.")
     ap.add_argument("--spec", default=str(DEFAULT_SPEC), help="Path to week7_ablation_spec.json")
+    ap.add_argument("--jobs", type=int, default=1, help="Training runs to execute concurrently.")
+    ap.add_argument(
+        "--threads_per_job",
+        type=int,
+        default=None,
+        help="Intra-op CPU threads per run (default: CPU count / --jobs).",
+    )
+    ap.add_argument(
+        "--state",
+        default=str(DEFAULT_STATE),
+        help="Job state file; finished runs recorded here are skipped on the next invocation.",
+    )
+    ap.add_argument("--log_dir", default=None, help="Per-run logs (default: next to the state file).")
     return ap.parse_args()
 
 
@@ -143,18 +162,33 @@ def main() -> None:
     if len(runs) != 4:
         raise ValueError(f"Expected exactly 4 runs in spec, found {len(runs)}")
 
-    manifest: List[Dict] = []
     git_commit = _get_git_commit()
-
+    planned: List[tuple[Dict, Path]] = []
+    jobs = []
     for run in runs:
         if not isinstance(run, dict):
             raise TypeError("Each run entry must be an object")
         _require_keys(run, REQUIRED_RUN_KEYS, f"run {run.get('name', '<unnamed>')}")
 
         cmd, run_dir = _build_train_command(spec, run)
-        print("Running:", " ".join(cmd))
-        subprocess.run(cmd, check=True)
+        print("Planned:", " ".join(cmd))
+        planned.append((run, run_dir))
+        jobs.append(make_job(run_dir.name, [cmd], cwd=REPO_ROOT))
+
+    state_path = Path(args.state)
+    summary = run_jobs(
+        jobs,
+        state_path=state_path,
+        max_parallel=args.jobs,
+        threads_per_job=args.threads_per_job,
+        log_dir=args.log_dir,
+        summary_path=state_path.with_name(f"{state_path.stem}_summary.json"),
+    )
+    if summary["failed"]:
+        raise SystemExit(f"Ablation run(s) failed: {', '.join(summary['failed'])}; rerun to resume.")
 
+    manifest: List[Dict] = []
+    for run, run_dir in planned:
         cfg = _validate_config(run_dir)
 
         manifest.append(
@@ -1,27 +1,17 @@
 from __future__ import annotations
 
 import argparse
-import json
+import sys
 from pathlib import Path
-from typing import Iterable, Tuple
 
 import numpy as np
 from sklearn.metrics import roc_auc_score
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
 
-def _iter_predictions(path: Path) -> Iterable[Tuple[int, float]]:
-    with path.open("r", encoding="utf-8") as f:
-        for line_no, line in enumerate(f, start=1):
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                row = json.loads(line)
-            except json.JSONDecodeError as e:
-                raise ValueError(f"Invalid JSON on line {line_no} in {path}: {e}") from e
-            if "label" not in row or "score" not in row:
-                raise ValueError(f"Missing label/score on line {line_no} in {path}")
-            yield int(row["label"]), float(row["score"])
+from src.eval.predictions import load_predictions
 
 
 def _sanity_check(y_true: np.ndarray, y_score: np.ndarray, name: str) -> None:
@@ -50,19 +40,17 @@ def main() -> None:
         "--predictions",
         nargs="+",
         required=True,
-        help="One or more predictions.jsonl files.",
+        help="One or more predictions files (.npz or .jsonl).",
     )
     args = ap.parse_args()
 
     for pred_path in args.predictions:
         path = Path(pred_path)
-        rows = list(_iter_predictions(path))
-        if not rows:
+        predictions = load_predictions(path)
+        if not len(predictions):
             print(f"[{path}] no rows found.")
             continue
-        y_true = np.array([r[0] for r in rows], dtype=int)
-        y_score = np.array([r[1] for r in rows], dtype=float)
-        _sanity_check(y_true, y_score, name=str(path))
+        _sanity_check(predictions.labels.astype(int), predictions.scores, name=str(path))
 
 
 if __name__ == "__main__":
@@ -4,7 +4,6 @@ import argparse
 import json
 import math
 import statistics
-import subprocess
 import sys
 from pathlib import Path
 from typing import Iterable
@@ -19,7 +18,9 @@ REPO_ROOT = Path(__file__).resolve().parents[1]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
-from src.eval.metrics import tpr_at_fpr
+from src.eval.metrics import ScoreCurve, tpr_at_fpr
+from src.eval.predictions import load_split_predictions
+from src.jobs.scheduler import make_job, run_jobs
 
 DEFAULT_OUTPUT_ROOT = REPO_ROOT / "reports" / "thesis_support"
 METRIC_KEYS = [
@@ -35,17 +36,6 @@ def _load_json(path: Path) -> dict:
     return json.loads(path.read_text(encoding="utf-8"))
 
 
-def _load_predictions(path: Path) -> tuple[np.ndarray, np.ndarray]:
-    labels: list[int] = []
-    scores: list[float] = []
-    with path.open("r", encoding="utf-8") as handle:
-        for line in handle:
-            row = json.loads(line)
-            labels.append(int(row["label"]))
-            scores.append(float(row["score"]))
-    return np.asarray(labels, dtype=int), np.asarray(scores, dtype=float)
-
-
 def _run_dir(path: str) -> Path:
     run_dir = Path(path)
     if not run_dir.is_absolute():
@@ -54,10 +44,8 @@ def _run_dir(path: str) -> Path:
 
 
 def _load_split_predictions(run_dir: Path, split: str) -> tuple[np.ndarray, np.ndarray]:
-    pred_path = run_dir / f"predictions_{split}.jsonl"
-    if not pred_path.exists():
-        raise FileNotFoundError(f"Missing predictions file: {pred_path}")
-    return _load_predictions(pred_path)
+    predictions = load_split_predictions(run_dir, split)
+    return predictions.labels.astype(int), predictions.scores
 
 
 def _load_threshold(run_dir: Path) -> float:
@@ -68,33 +56,6 @@ def _load_threshold(run_dir: Path) -> float:
     return float(cfg["val_threshold"])
 
 
-def _compute_threshold_metrics(labels: np.ndarray, scores: np.ndarray, threshold: float) -> dict[str, float | None]:
-    pred = scores >= threshold
-    pos = labels == 1
-    neg = labels == 0
-
-    tp = int((pred & pos).sum())
-    fp = int((pred & neg).sum())
-    tn = int((~pred & neg).sum())
-    fn = int((~pred & pos).sum())
-
-    tpr = float(tp / pos.sum()) if pos.sum() else 0.0
-    fpr = float(fp / neg.sum()) if neg.sum() else 0.0
-    precision = float(tp / (tp + fp)) if (tp + fp) else 0.0
-    asr = float(fn / pos.sum()) if pos.sum() else 0.0
-    return {
-        "threshold": float(threshold),
-        "tp": tp,
-        "fp": fp,
-        "tn": tn,
-        "fn": fn,
-        "tpr": tpr,
-        "fpr": fpr,
-        "precision": precision,
-        "asr": asr,
-    }
-
-
 def _mean_std_ci(values: Iterable[float]) -> tuple[float, float, float]:
     vals = [float(v) for v in values]
     if not vals:
@@ -221,14 +182,12 @@ def threshold_sweep(args: argparse.Namespace) -> None:
     fig, axes = plt.subplots(3, 1, figsize=(8.8, 11.1))
     metric_names = [("fpr", "False Positive Rate"), ("tpr", "True Positive Rate"), ("asr", "Attack Success Rate")]
 
+    curves = {split: ScoreCurve.from_scores(*_load_split_predictions(run_dir, split)) for split in splits}
     for split in splits:
-        labels, scores = _load_split_predictions(run_dir, split)
-        split_metrics = []
-        for threshold in thresholds:
-            metrics = _compute_threshold_metrics(labels, scores, float(threshold))
+        split_metrics = curves[split].metrics_at(thresholds)
+        for metrics in split_metrics:
             metrics["split"] = split
             rows.append(metrics)
-            split_metrics.append(metrics)
         for ax, (metric_key, metric_label) in zip(axes, metric_names):
             ax.plot(thresholds, [row[metric_key] for row in split_metrics], linewidth=2.45, label=split)
             ax.axvline(center, color="#c1121f", linestyle="--", linewidth=1.55)
@@ -252,11 +211,9 @@ def threshold_sweep(args: argparse.Namespace) -> None:
 
     summary_rows: list[dict[str, object]] = []
     deltas = [-0.05, -0.02, 0.0, 0.02, 0.05]
+    delta_thresholds = [min(1.0, max(0.0, center + delta)) for delta in deltas]
     for split in splits:
-        labels, scores = _load_split_predictions(run_dir, split)
-        for delta in deltas:
-            threshold = min(1.0, max(0.0, center + delta))
-            metrics = _compute_threshold_metrics(labels, scores, threshold)
+        for delta, metrics in zip(deltas, curves[split].metrics_at(delta_thresholds)):
             summary_rows.append({"split": split, "delta": delta, **metrics})
     _write_csv(out_dir / "threshold_sweep_long.csv", rows)
     _write_csv(out_dir / "threshold_sweep_summary.csv", summary_rows)
@@ -274,7 +231,7 @@ def benign_heavy_analysis(args: argparse.Namespace) -> None:
     rng = np.random.default_rng(args.seed)
 
     eval_splits = [split.strip() for split in args.eval_splits.split(",") if split.strip()]
-    eval_cache = {split: _load_split_predictions(run_dir, split) for split in eval_splits}
+    eval_cache = {split: ScoreCurve.from_scores(*_load_split_predictions(run_dir, split)) for split in eval_splits}
     prevalence_values = [float(item.strip()) for item in args.attack_prevalences.split(",") if item.strip()]
 
     all_rows: list[dict[str, object]] = []
@@ -299,8 +256,8 @@ def benign_heavy_analysis(args: argparse.Namespace) -> None:
             op = tpr_at_fpr(labels, scores, target_fpr=args.target_fpr)
             repeat_thresholds.append(float(op.threshold))
 
-            for split, (split_labels, split_scores) in eval_cache.items():
-                metrics = _compute_threshold_metrics(split_labels, split_scores, float(op.threshold))
+            for split, curve in eval_cache.items():
+                metrics = curve.metrics_at([op.threshold])[0]
                 all_rows.append(
                     {
                         "attack_prevalence": prevalence_attack,
@@ -398,6 +355,7 @@ def run_multiseed(args: argparse.Namespace) -> None:
     out_root = Path(args.out_root) if args.out_root else REPO_ROOT / "runs"
     manifest_path = Path(args.manifest) if args.manifest else DEFAULT_OUTPUT_ROOT / "multiseed" / f"{base_run_dir.name}_manifest.json"
     manifest_entries: list[dict[str, object]] = []
+    jobs = []
 
     for seed in seeds:
         run_name = f"{args.run_prefix}_seed{seed}"
@@ -447,25 +405,38 @@ def run_multiseed(args: argparse.Namespace) -> None:
         if cfg.get("normalize_drop_mn"):
             train_cmd.append("--normalize_drop_mn")
 
-        print("Running:", " ".join(train_cmd))
-        if not args.dry_run:
-            subprocess.run(train_cmd, check=True, cwd=REPO_ROOT)
-            for split, path in _extra_eval_splits(cfg):
-                eval_cmd = [
+        commands = [train_cmd]
+        extra_splits = _extra_eval_splits(cfg)
+        if extra_splits:
+            # One eval process loads the model once for every extra split.
+            commands.append(
+                [
                     sys.executable,
                     str(REPO_ROOT / "scripts" / "eval_lora_from_run.py"),
                     "--run_dir",
                     str(run_dir),
-                    "--data",
-                    str(path),
-                    "--split_name",
-                    split,
+                    "--splits",
+                    ",".join(f"{split}={path}" for split, path in extra_splits),
                 ]
-                print("Running:", " ".join(eval_cmd))
-                subprocess.run(eval_cmd, check=True, cwd=REPO_ROOT)
+            )
+        for cmd in commands:
+            print("Planned:", " ".join(cmd))
+        jobs.append(make_job(run_name, commands, cwd=REPO_ROOT))
 
         manifest_entries.append({"seed": seed, "run_dir": str(run_dir), "base_run_dir": str(base_run_dir)})
 
+    if not args.dry_run:
+        state_path = Path(args.state) if args.state else manifest_path.with_name(f"{manifest_path.stem}_jobs.json")
+        summary = run_jobs(
+            jobs,
+            state_path=state_path,
+            max_parallel=args.jobs,
+            threads_per_job=args.threads_per_job,
+            summary_path=state_path.with_name(f"{state_path.stem}_summary.json"),
+        )
+        if summary["failed"]:
+            raise SystemExit(f"Multi-seed job(s) failed: {', '.join(summary['failed'])}; rerun to resume.")
+
     _write_json(manifest_path, manifest_entries)
     print(f"Wrote multiseed manifest to {manifest_path}")
 
@@ -547,6 +518,9 @@ def build_parser() -> argparse.ArgumentParser:
     ms.add_argument("--manifest", default="")
     ms.add_argument("--num_workers", type=int, default=0)
     ms.add_argument("--dry_run", action="store_true")
+    ms.add_argument("--jobs", type=int, default=1, help="Seeds to train/evaluate concurrently.")
+    ms.add_argument("--threads_per_job", type=int, default=None, help="CPU threads per seed (default: CPU count / --jobs).")
+    ms.add_argument("--state", default="", help="Job state file for resuming (default: <manifest>_jobs.json).")
     ms.set_defaults(func=run_multiseed)
 
     summ = subparsers.add_parser("summarize-multiseed", help="Aggregate metrics across multi-seed run directories.")
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from src.data.io import load_examples
+from src.eval.metrics import compute_metrics, tpr_at_fpr
+from src.eval.predictions import predictions_path, write_predictions
+
+from llm_jailbreak_detector.linear_detector import (
+    DEFAULT_BITS,
+    HashedNgramFeaturizer,
+    LinearDetector,
+    fit_linear,
+    save_linear_run,
+)
+
+TARGET_FPR = 0.01
+
+
+def _load_split(path: Path) -> Tuple[List[str], List[str], List[int]]:
+    examples = load_examples(str(path))
+    return [ex.id for ex in examples], [ex.text for ex in examples], [int(ex.label) for ex in examples]
+
+
+def _split_metrics(y_true: List[int], y_score: List[float], threshold: float) -> Dict[str, float | None]:
+    y = np.asarray(y_true).astype(int)
+    s = np.asarray(y_score).astype(float)
+    metrics: Dict[str, float | None] = (
+        compute_metrics(y, s, target_fpr=TARGET_FPR) if len(set(y_true)) > 1 else {"auroc": None, "auprc": None}
+    )
+    pred_attack = s >= threshold
+    pos = y == 1
+    neg = y == 0
+    metrics["val_threshold"] = float(threshold)
+    metrics["tpr_at_val_threshold"] = float((pred_attack & pos).sum() / pos.sum()) if pos.sum() else 0.0
+    metrics["fpr_at_val_threshold"] = float((pred_attack & neg).sum() / neg.sum()) if neg.sum() else 0.0
+    return metrics
+
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Train the hashed n-gram logistic-regression detector.")
+    ap.add_argument("--train", required=True, help="Path to train.jsonl")
+    ap.add_argument("--val", required=True, help="Path to val.jsonl (threshold at 1% FPR)")
+    ap.add_argument(
+        "--test",
+        action="append",
+        default=[],
+        metavar="NAME=PATH",
+        help="Extra split to score, e.g. test_main=data/v1/test_main.jsonl (repeatable; adv2 sets work too)",
+    )
+    ap.add_argument("--bits", type=int, default=DEFAULT_BITS, help="Hash space is 2**bits buckets")
+    ap.add_argument("--C", type=float, default=4.0, help="Inverse L2 regularization strength")
+    ap.add_argument("--class_weight", choices=["balanced"], default=None)
+    ap.add_argument("--out_dir", help="Default: runs/linear_v1_{timestamp}")
+    ap.add_argument("--export_jsonl", action="store_true", help="Also write predictions_<split>.jsonl")
+    return ap.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    tests = {}
+    for spec in args.test:
+        name, sep, path = spec.partition("=")
+        if not sep or not name or not path:
+            raise ValueError(f"--test expects NAME=PATH, got {spec!r}")
+        tests[name] = Path(path)
+    timestamp = datetime.now(timezone.utc)
+    run_dir = Path(args.out_dir) if args.out_dir else REPO_ROOT / "runs" / f"linear_v1_{timestamp:%Y%m%d_%H%M%S}"
+
+    featurizer = HashedNgramFeaturizer(bits=args.bits)
+    _, train_texts, train_labels = _load_split(Path(args.train))
+    start = time.perf_counter()
+    coef, intercept = fit_linear(
+        train_texts, train_labels, featurizer, C=args.C, class_weight=args.class_weight
+    )
+    train_seconds = time.perf_counter() - start
+
+    val_ids, val_texts, val_labels = _load_split(Path(args.val))
+    val_scores = 1.0 / (1.0 + np.exp(-featurizer.decision_function(val_texts, coef.astype(np.float64), intercept)))
+    op = tpr_at_fpr(np.asarray(val_labels), val_scores, target_fpr=TARGET_FPR)
+    config = {
+        "val_threshold": float(op.threshold),
+        "val_fpr_actual": float(op.fpr),
+        "val_tpr_at_fpr": float(op.tpr),
+        "target_fpr": TARGET_FPR,
+        "score_is_attack_prob": True,
+        "C": args.C,
+        "class_weight": args.class_weight,
+        "train_path": str(Path(args.train).resolve()),
+        "val_path": str(Path(args.val).resolve()),
+        "test_paths": {name: str(path.resolve()) for name, path in tests.items()},
+        "train_rows": len(train_texts),
+        "train_seconds": round(train_seconds, 2),
+        "timestamp": timestamp.isoformat(),
+        "run_dir": str(run_dir.resolve()),
+    }
+    save_linear_run(run_dir, featurizer, coef, intercept, config)
+
+    # Score every split through the deployed NumPy path.
+    detector = LinearDetector(run_dir)
+    splits = {"val": Path(args.val), **tests}
+    throughput = None
+    for name, path in splits.items():
+        ids, texts, labels = _load_split(path)
+        start = time.perf_counter()
+        scores = detector.predict_proba_batch(texts, batch_size=len(texts) or 1)
+        elapsed = time.perf_counter() - start
+        if name == "val":
+            throughput = round(len(texts) / elapsed, 1) if elapsed > 0 else None
+        write_predictions(
+            predictions_path(run_dir, name), ids, labels, scores, split=name, export_jsonl=args.export_jsonl
+        )
+        metrics = _split_metrics(labels, scores, detector.threshold)
+        metrics["split"] = name
+        metrics["threshold_source"] = "val"
+        (run_dir / f"final_metrics_{name}.json").write_text(json.dumps(metrics, indent=2), encoding="utf-8")
+        print(
+            f"{name}: rows={len(texts)} auroc={metrics.get('auroc')} "
+            f"tpr@val_thr={metrics['tpr_at_val_threshold']:.4f} fpr@val_thr={metrics['fpr_at_val_threshold']:.4f}"
+        )
+
+    config_path = run_dir / "config.json"
+    saved = json.loads(config_path.read_text(encoding="utf-8"))
+    saved["val_texts_per_second"] = throughput
+    config_path.write_text(json.dumps(saved, indent=2), encoding="utf-8")
+    print(f"val scoring throughput: {throughput} texts/s (1 process)")
+    print(f"Wrote artifacts to {run_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,16 +12,15 @@ from datetime import datetime, timezone
 from functools import partial
 from hashlib import sha256
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, List, Tuple
 
 import numpy as np
 import torch
 from peft import LoraConfig, TaskType, get_peft_model
-from torch.utils.data import DataLoader, Dataset
+from torch.utils.data import DataLoader
 from transformers import (
     AutoModelForSequenceClassification,
     AutoTokenizer,
-    DataCollatorWithPadding,
     get_linear_schedule_with_warmup,
 )
 
@@ -32,7 +31,9 @@ if str(REPO_ROOT) not in sys.path:
 from src.augment.adv2 import apply_adv2
 from src.augment.rewrite import apply_rewrite
 from src.data.io import load_examples
+from src.data.token_cache import EncodedSplit, TokenizedDataset, load_or_encode
 from src.eval.metrics import compute_metrics, tpr_at_fpr
+from src.eval.predictions import predictions_path, write_predictions
 from src.preprocess.normalize import normalize_text as normalize_infer_text
 from src.preprocess.unicode import normalize_text
 
@@ -40,6 +41,7 @@ BASELINE_VERSION = "v0.3-week4"
 DEFAULT_BACKBONE = "roberta-base"
 DEFAULT_ATTACK_LABEL = 1  # label value corresponding to attack / unsafe
 DEFAULT_MAX_LENGTH = 256
+DEFAULT_TOKEN_CACHE_DIR = REPO_ROOT / ".cache" / "tokenized"
 DEFAULT_WARMUP_RATIO = 0.06
 TARGET_FPR = 0.01
 LORA_R = 8
@@ -143,25 +145,43 @@ def load_records(
     return rows
 
 
-class TextDataset(Dataset):
-    def __init__(self, rows: List[Record], tokenizer, max_length: int):
-        self.rows = rows
-        self.tokenizer = tokenizer
-        self.max_length = max_length
-
-    def __len__(self) -> int:
-        return len(self.rows)
+def encode_split(
+    path: Path,
+    tokenizer,
+    max_length: int,
+    use_unicode: bool,
+    *,
+    cache_dir: Path | None,
+    normalize_train: bool = False,
+    normalize_drop_mn: bool = False,
+    aug_adv2_prob: float = 0.0,
+    aug_rewrite_prob: float = 0.0,
+    aug_seed: int | None = None,
+) -> Tuple[EncodedSplit, bool]:
+    preprocess = {
+        "unicode": use_unicode,
+        "normalize": normalize_train,
+        "normalize_drop_mn": normalize_train and normalize_drop_mn,
+        "aug_adv2_prob": aug_adv2_prob,
+        "aug_rewrite_prob": aug_rewrite_prob,
+        "aug_seed": aug_seed if (aug_adv2_prob > 0 or aug_rewrite_prob > 0) else None,
+    }
 
-    def __getitem__(self, idx: int) -> Dict:
-        row = self.rows[idx]
-        enc = self.tokenizer(
-            row.text,
-            truncation=True,
-            max_length=self.max_length,
+    def _rows() -> Tuple[List[str], List[str], List[int]]:
+        rows = load_records(
+            path,
+            use_unicode,
+            normalize_train=normalize_train,
+            normalize_drop_mn=normalize_drop_mn,
+            aug_adv2_prob=aug_adv2_prob,
+            aug_rewrite_prob=aug_rewrite_prob,
+            aug_rng=random.Random(aug_seed) if aug_seed is not None else None,
         )
-        enc["labels"] = row.label
-        enc["id"] = row.id
-        return enc
+        return [r.id for r in rows], [r.text for r in rows], [r.label for r in rows]
+
+    return load_or_encode(
+        path, _rows, tokenizer, max_length, preprocess=preprocess, cache_dir=cache_dir
+    )
 
 
 def _apply_score_transform(scores_p1: List[float], score_transform: str) -> List[float]:
@@ -195,21 +215,9 @@ def _selection_key(metrics: Dict[str, float | None]) -> Tuple[float, float]:
     return tpr_value, auroc_value
 
 
-def collate_with_extras(features: List[Dict], data_collator) -> Dict:
-    tensor_keys = {"input_ids", "attention_mask", "token_type_ids", "labels", "label"}
-    extras = {}
-    for key in list(features[0].keys()):
-        if key not in tensor_keys:
-            extras[key] = [f.pop(key) for f in features]
-    batch = data_collator(features)
-    batch.update(extras)
-    return batch
-
-
-def write_predictions(path: Path, ids: Iterable[str], y_true: Iterable[int], y_score: Iterable[float], split: str) -> None:
-    with path.open("w", encoding="utf-8") as f:
-        for ex_id, y, s in zip(ids, y_true, y_score):
-            f.write(json.dumps({"id": ex_id, "label": int(y), "score": float(s), "split": split}) + "\n")
+def collate_to_tensors(indices: List[int], dataset: TokenizedDataset) -> Dict:
+    batch = dataset.collate(indices)
+    return {k: torch.from_numpy(v) if isinstance(v, np.ndarray) else v for k, v in batch.items()}
 
 
 def compute_split_metrics(y_true: List[int], y_score: List[float], threshold: float) -> Dict[str, float | None]:
@@ -237,38 +245,40 @@ def compute_split_metrics(y_true: List[int], y_score: List[float], threshold: fl
 
 def build_dataloaders(
     tokenizer,
-    train_rows: List[Record],
-    val_rows: List[Record],
-    test_main_rows: List[Record],
-    test_jbb_rows: List[Record],
+    train_split: EncodedSplit,
+    val_split: EncodedSplit,
+    test_main_split: EncodedSplit,
+    test_jbb_split: EncodedSplit,
     batch_size: int,
-    max_length: int,
     num_workers: int,
 ) -> Tuple[DataLoader, DataLoader, DataLoader, DataLoader]:
-    data_collator = DataCollatorWithPadding(tokenizer=tokenizer, return_tensors="pt")
-    collate_fn = partial(collate_with_extras, data_collator=data_collator)
+    def _dataset(split: EncodedSplit) -> TokenizedDataset:
+        return TokenizedDataset(split, tokenizer.pad_token_id, padding_side=tokenizer.padding_side)
 
-    train_ds = TextDataset(train_rows, tokenizer, max_length)
-    val_ds = TextDataset(val_rows, tokenizer, max_length)
-    test_main_ds = TextDataset(test_main_rows, tokenizer, max_length)
-    test_jbb_ds = TextDataset(test_jbb_rows, tokenizer, max_length)
+    train_ds = _dataset(train_split)
+    val_ds = _dataset(val_split)
+    test_main_ds = _dataset(test_main_split)
+    test_jbb_ds = _dataset(test_jbb_split)
 
     train_loader = DataLoader(
         train_ds,
         batch_size=batch_size,
         shuffle=True,
-        collate_fn=collate_fn,
+        collate_fn=partial(collate_to_tensors, dataset=train_ds),
         num_workers=num_workers,
     )
     eval_kwargs = {
         "batch_size": batch_size,
         "shuffle": False,
-        "collate_fn": collate_fn,
         "num_workers": num_workers,
     }
-    val_loader = DataLoader(val_ds, **eval_kwargs)
-    test_main_loader = DataLoader(test_main_ds, **eval_kwargs)
-    test_jbb_loader = DataLoader(test_jbb_ds, **eval_kwargs)
+    val_loader = DataLoader(val_ds, collate_fn=partial(collate_to_tensors, dataset=val_ds), **eval_kwargs)
+    test_main_loader = DataLoader(
+        test_main_ds, collate_fn=partial(collate_to_tensors, dataset=test_main_ds), **eval_kwargs
+    )
+    test_jbb_loader = DataLoader(
+        test_jbb_ds, collate_fn=partial(collate_to_tensors, dataset=test_jbb_ds), **eval_kwargs
+    )
     return train_loader, val_loader, test_main_loader, test_jbb_loader
 
 
@@ -293,7 +303,14 @@ def parse_args() -> argparse.Namespace:
     ap.add_argument("--max_length", type=int, default=DEFAULT_MAX_LENGTH)
     ap.add_argument("--out_dir", help="Optional output dir. Default uses runs/lora_v1_{backbone}_u{0/1}_{timestamp}")
     ap.add_argument("--num_workers", type=int, default=0)
+    ap.add_argument(
+        "--token_cache_dir",
+        default=str(DEFAULT_TOKEN_CACHE_DIR),
+        help="Directory for pre-tokenized split caches (default: .cache/tokenized)",
+    )
+    ap.add_argument("--no_token_cache", action="store_true", help="Tokenize in memory without caching")
     ap.add_argument("--attack_label", type=int, default=DEFAULT_ATTACK_LABEL, choices=[0, 1], help="Label value representing attacks")
+    ap.add_argument("--export_jsonl", action="store_true", help="Also write predictions_<split>.jsonl next to the .npz predictions")
     return ap.parse_args()
 
 
@@ -329,28 +346,34 @@ def main() -> None:
     model.print_trainable_parameters()
     model.to(device)
 
-    aug_rng = random.Random(args.aug_seed)
-    train_rows = load_records(
+    cache_dir = None if args.no_token_cache else Path(args.token_cache_dir)
+    train_split, train_hit = encode_split(
         Path(args.train),
+        tokenizer,
+        args.max_length,
         use_unicode,
+        cache_dir=cache_dir,
         normalize_train=bool(args.normalize_train),
         normalize_drop_mn=bool(args.normalize_drop_mn),
         aug_adv2_prob=float(args.aug_adv2_prob),
         aug_rewrite_prob=float(args.aug_rewrite_prob),
-        aug_rng=aug_rng,
+        aug_seed=args.aug_seed,
     )
-    val_rows = load_records(Path(args.val), use_unicode)
-    test_main_rows = load_records(Path(args.test_main), use_unicode)
-    test_jbb_rows = load_records(Path(args.test_jbb), use_unicode)
+    eval_splits = {
+        name: encode_split(Path(path), tokenizer, args.max_length, use_unicode, cache_dir=cache_dir)
+        for name, path in (("val", args.val), ("test_main", args.test_main), ("test_jbb", args.test_jbb))
+    }
+    cache_hits = {"train": train_hit, **{name: hit for name, (_, hit) in eval_splits.items()}}
+    if cache_dir is not None:
+        print(f"Token cache hits: {json.dumps(cache_hits)}")
 
     train_loader, val_loader, test_main_loader, test_jbb_loader = build_dataloaders(
         tokenizer,
-        train_rows,
-        val_rows,
-        test_main_rows,
-        test_jbb_rows,
+        train_split,
+        eval_splits["val"][0],
+        eval_splits["test_main"][0],
+        eval_splits["test_jbb"][0],
         args.batch_size,
-        args.max_length,
         args.num_workers,
     )
 
@@ -492,8 +515,14 @@ def main() -> None:
     )
 
     def eval_and_save(split_name: str, ids: List[str], y_true: List[int], y_score: List[float]) -> None:
-        pred_path = run_dir / f"predictions_{split_name}.jsonl"
-        write_predictions(pred_path, ids, y_true, y_score, split_name)
+        write_predictions(
+            predictions_path(run_dir, split_name),
+            ids,
+            y_true,
+            y_score,
+            split=split_name,
+            export_jsonl=args.export_jsonl,
+        )
         metrics = compute_split_metrics(y_true, y_score, op.threshold)
         metrics["target_fpr"] = TARGET_FPR
         metrics["split"] = split_name
@@ -1,32 +1,22 @@
 from __future__ import annotations
 
 import argparse
-import json
+import sys
 from datetime import datetime
 from pathlib import Path
-from typing import Iterable, Tuple
 
 import numpy as np
 from sklearn.metrics import roc_auc_score
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
 
-def _fmt_mtime(path: Path) -> str:
-    return datetime.fromtimestamp(path.stat().st_mtime).isoformat()
+from src.eval.predictions import list_prediction_splits, load_predictions, split_name
 
 
-def _iter_predictions(path: Path) -> Iterable[Tuple[int, float]]:
-    with path.open("r", encoding="utf-8") as f:
-        for line_no, line in enumerate(f, start=1):
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                row = json.loads(line)
-            except json.JSONDecodeError as e:
-                raise ValueError(f"Invalid JSON on line {line_no} in {path}: {e}") from e
-            if "label" not in row or "score" not in row:
-                raise ValueError(f"Missing label/score on line {line_no} in {path}")
-            yield int(row["label"]), float(row["score"])
+def _fmt_mtime(path: Path) -> str:
+    return datetime.fromtimestamp(path.stat().st_mtime).isoformat()
 
 
 def _sanity_stats(y_true: np.ndarray, y_score: np.ndarray) -> None:
@@ -55,7 +45,7 @@ def main() -> None:
     ap.add_argument("--run_dir", required=True)
     ap.add_argument(
         "--predictions",
-        help="Optional path to a predictions JSONL file (e.g., predictions_val.jsonl).",
+        help="Optional path to a predictions file (e.g., predictions_val.npz or a legacy .jsonl).",
     )
     args = ap.parse_args()
 
@@ -65,9 +55,9 @@ def main() -> None:
 
     pred_path = Path(args.predictions) if args.predictions else run_dir / "predictions.jsonl"
     if not pred_path.exists():
-        candidates = sorted(run_dir.glob("predictions_*.jsonl"))
+        candidates = list(list_prediction_splits(run_dir).values())
         if not candidates:
-            raise SystemExit(f"Missing predictions.jsonl in {run_dir}")
+            raise SystemExit(f"Missing predictions_*.npz or predictions.jsonl in {run_dir}")
         if len(candidates) == 1:
             pred_path = candidates[0]
         else:
@@ -77,8 +67,8 @@ def main() -> None:
             )
 
     metrics_path = run_dir / "final_metrics.json"
-    if pred_path.name.startswith("predictions_") and pred_path.name.endswith(".jsonl"):
-        split = pred_path.name[len("predictions_") : -len(".jsonl")]
+    split = split_name(pred_path)
+    if split is not None:
         split_metrics = run_dir / f"final_metrics_{split}.json"
         if split_metrics.exists():
             metrics_path = split_metrics
@@ -89,14 +79,11 @@ def main() -> None:
     else:
         print(f"{metrics_path.name} not found.")
 
-    rows = list(_iter_predictions(pred_path))
-    if not rows:
-        print("predictions.jsonl is empty.")
+    predictions = load_predictions(pred_path)
+    if not len(predictions):
+        print(f"{pred_path.name} is empty.")
         return
-
-    y_true = np.array([r[0] for r in rows], dtype=int)
-    y_score = np.array([r[1] for r in rows], dtype=float)
-    _sanity_stats(y_true, y_score)
+    _sanity_stats(predictions.labels.astype(int), predictions.scores)
 
 
 if __name__ == "__main__":
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, List, Optional, Sequence
 
 # Week-1 baseline: intentionally simple. Improve later.
 DEFAULT_PATTERNS = [
@@ -14,21 +14,254 @@ DEFAULT_PATTERNS = [
     r"developer message",
 ]
 
+# Per-pattern weights are the risk contributed by one rule firing. Every default
+# weight is >= 0.5 so a single match still flags at the default threshold.
+DEFAULT_WEIGHTS = [0.9, 0.6, 0.55, 0.8, 0.85, 0.6]
+DEFAULT_CATEGORIES = [
+    "instruction_override",
+    "prompt_leak",
+    "role_play",
+    "jailbreak",
+    "jailbreak",
+    "prompt_leak",
+]
+DEFAULT_CATEGORY = "custom"
+
+_REGEX_META = set(".^$*+?{}[]\\|()")
+_QUANTIFIERS = set("*+?{")
+_LITERAL_GROUP = "lit"
+
 
 @dataclass
 class RulesConfig:
     patterns: List[str]
+    weights: Optional[List[float]] = None  # defaults to 1.0 per pattern
+    categories: Optional[List[str]] = None  # defaults to "custom" per pattern
+
+
+@dataclass
+class RuleMatch:
+    pattern_index: int
+    pattern: str
+    start: int
+    end: int
+
+
+def _is_literal(pattern: str) -> bool:
+    return bool(pattern) and not any(ch in _REGEX_META for ch in pattern)
+
+
+def _has_top_level_alternation(pattern: str) -> bool:
+    depth = 0
+    in_class = escaped = False
+    for ch in pattern:
+        if escaped:
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif in_class:
+            in_class = ch != "]"
+        elif ch == "[":
+            in_class = True
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "|" and depth == 0:
+            return True
+    return False
+
+
+def _literal_prefix(pattern: str, flags: int) -> str:
+    """Literal text every match of ``pattern`` starts with, or ``""`` if there is none."""
+    if flags & re.VERBOSE or _has_top_level_alternation(pattern):
+        return ""
+    prefix: List[str] = []
+    for ch in pattern:
+        if ch in _REGEX_META:
+            if ch in _QUANTIFIERS and prefix:
+                prefix.pop()  # the quantified character may be absent
+            break
+        prefix.append(ch)
+    return "".join(prefix)
+
+
+def _trie_regex(words: Sequence[str]) -> str:
+    """Build a regex for a set of literals that branches per character (a trie).
+
+    Matching cost at each position depends on the literal length, not on how
+    many literals there are, which keeps large literal pattern sets cheap.
+    Under case-insensitive flags the words must be ``_CharClasses.key`` keys,
+    so no two sibling branches can match the same character.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: Dict[str, dict]) -> str:
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            body = "(?:" + body + ")?"
+        return body
+
+    return emit(trie)
+
+
+class _CharClasses:
+    """Map each character to one representative of the characters ``flags`` treat as equal.
+
+    With ``re.IGNORECASE`` that is the regex engine's own case equivalence
+    (``D``/``d``, ``s``/``\u017f``), which ``str.casefold`` does not always agree with.
+    """
+
+    def __init__(self, flags: int) -> None:
+        self._flags = flags
+        self._reps = ""
+        self._canon: Dict[str, str] = {}
+
+    def canon(self, ch: str) -> str:
+        rep = self._canon.get(ch)
+        if rep is None:
+            # One search against every representative so far finds ch's class, if any.
+            m = re.compile(re.escape(ch), self._flags).search(self._reps)
+            if m is None:
+                self._reps += ch
+                rep = ch
+            else:
+                rep = m.group()
+            self._canon[ch] = rep
+        return rep
+
+    def key(self, text: str) -> str:
+        return "".join(self.canon(ch) for ch in text)
+
+
+class RuleMatcher:
+    """Report every rule that fires on a text, matching a per-rule ``finditer`` scan.
+
+    Literal patterns, and the literal prefix every match of a regex pattern
+    starts with, are merged into one trie-shaped regex. A single overlapping
+    scan of the trie finds each offset where a literal or prefix occurs:
+    literal rules fire there directly and regex rules are confirmed with their
+    own compiled pattern at that offset only, so a text costs one pass plus
+    work for the candidates it contains, and nested or overlapping rules
+    (``system`` inside ``system prompt``) all fire. Regex rules without a
+    literal prefix are searched directly.
+    """
+
+    def __init__(self, patterns: Sequence[str], flags: int = re.IGNORECASE) -> None:
+        self.patterns = list(patterns)
+        self._flags = flags
+        self._compiled = [re.compile(pattern, flags) for pattern in self.patterns]
+        self._chars = _CharClasses(flags)
+        # Rules by the case-class key of their literal / prefix; rules spelled alike share a key.
+        self._literal_rules: Dict[str, List[int]] = {}
+        self._prefixed_rules: Dict[str, List[int]] = {}
+        self._unprefixed: List[int] = []
+        for idx, pattern in enumerate(self.patterns):
+            if _is_literal(pattern):
+                self._literal_rules.setdefault(self._chars.key(pattern), []).append(idx)
+                continue
+            prefix = _literal_prefix(pattern, flags)
+            if prefix:
+                self._prefixed_rules.setdefault(self._chars.key(prefix), []).append(idx)
+            else:
+                self._unprefixed.append(idx)
+        keys = sorted(set(self._literal_rules) | set(self._prefixed_rules))
+        self._scan: Optional[re.Pattern[str]] = None
+        if keys:
+            # A lookahead reports the longest key at every offset, overlaps included.
+            self._scan = re.compile(f"(?=(?P<{_LITERAL_GROUP}>{_trie_regex(keys)}))", flags)
+
+    def _make(self, idx: int, start: int, end: int) -> RuleMatch:
+        return RuleMatch(pattern_index=idx, pattern=self.patterns[idx], start=start, end=end)
+
+    def _candidate_matches(self, text: str) -> List[RuleMatch]:
+        assert self._scan is not None
+        matches: List[RuleMatch] = []
+        # Per rule, skip offsets inside its previous match, as finditer would.
+        next_start: Dict[int, int] = {}
+        for m in self._scan.finditer(text):
+            pos = m.start()
+            longest = self._chars.key(m.group(_LITERAL_GROUP))
+            # Every key occurring at pos is a prefix of the longest one there.
+            for size in range(1, len(longest) + 1):
+                key = longest[:size]
+                for idx in self._literal_rules.get(key, ()):
+                    if pos >= next_start.get(idx, 0):
+                        next_start[idx] = pos + size
+                        matches.append(self._make(idx, pos, pos + size))
+                for idx in self._prefixed_rules.get(key, ()):
+                    if pos >= next_start.get(idx, 0):
+                        rule_match = self._compiled[idx].match(text, pos)
+                        if rule_match is not None:
+                            next_start[idx] = rule_match.end()
+                            matches.append(self._make(idx, pos, rule_match.end()))
+        return matches
+
+    def finditer(self, text: str) -> List[RuleMatch]:
+        """Return every rule's matches, ordered by start offset then rule index.
+
+        Each rule contributes exactly what ``re.finditer`` with that pattern
+        alone would return, so overlapping matches of different rules are kept.
+        """
+        matches = self._candidate_matches(text) if self._scan is not None else []
+        for idx in self._unprefixed:
+            matches.extend(
+                self._make(idx, m.start(), m.end()) for m in self._compiled[idx].finditer(text)
+            )
+        matches.sort(key=lambda match: (match.start, match.pattern_index))
+        return matches
+
+    def search(self, text: str) -> Optional[RuleMatch]:
+        """Return the leftmost rule match (lowest rule index on ties), or ``None``."""
+        matches = self.finditer(text)
+        return matches[0] if matches else None
+
+
+@dataclass
+class RulesResult:
+    score: float
+    matches: List[RuleMatch]
 
 
 class RulesDetector:
     def __init__(self, config: RulesConfig | None = None) -> None:
-        self.config = config or RulesConfig(patterns=DEFAULT_PATTERNS)
-        self._compiled = [re.compile(pat, re.IGNORECASE) for pat in self.config.patterns]
+        self.config = config or RulesConfig(
+            patterns=DEFAULT_PATTERNS,
+            weights=DEFAULT_WEIGHTS,
+            categories=DEFAULT_CATEGORIES,
+        )
+        count = len(self.config.patterns)
+        self.weights = [float(w) for w in (self.config.weights or [1.0] * count)]
+        self.categories = list(self.config.categories or [DEFAULT_CATEGORY] * count)
+        if len(self.weights) != count or len(self.categories) != count:
+            raise ValueError("weights and categories must match the number of patterns")
+        if any(not 0.0 <= w <= 1.0 for w in self.weights):
+            raise ValueError("rule weights must be in [0, 1]")
+        self._matcher = RuleMatcher(self.config.patterns)
+
+    def match(self, text: str) -> Optional[RuleMatch]:
+        return self._matcher.search(text)
+
+    def combine(self, matches: Sequence[RuleMatch]) -> float:
+        # Noisy-OR over the distinct rules that fired: each rule independently
+        # contributes its weight, repeated hits of one rule count once.
+        score = 0.0
+        for idx in sorted({m.pattern_index for m in matches}):
+            score += self.weights[idx] * (1.0 - score)
+        return score
+
+    def explain(self, text: str) -> RulesResult:
+        matches = self._matcher.finditer(text)
+        return RulesResult(score=self.combine(matches), matches=matches)
 
     def score(self, text: str) -> float:
-        # Returns a risk score in [0,1].
-        # Simple: if any pattern matches, risk=1 else 0.
-        for rx in self._compiled:
-            if rx.search(text):
-                return 1.0
-        return 0.0
\ No newline at end of file
+        # Returns a risk score in [0,1]; 0 when no rule fires.
+        return self.explain(text).score
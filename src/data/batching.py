@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class PaddingStats:
+    real_tokens: int = 0
+    padded_tokens: int = 0  # tokens actually fed to the model under the plan
+    naive_padded_tokens: int = 0  # tokens a fixed-size, input-order batching would feed
+
+    @property
+    def padding_saved(self) -> int:
+        return self.naive_padded_tokens - self.padded_tokens
+
+    @property
+    def saved_fraction(self) -> float:
+        if self.naive_padded_tokens == 0:
+            return 0.0
+        return self.padding_saved / self.naive_padded_tokens
+
+    def add(self, other: "PaddingStats") -> None:
+        self.real_tokens += other.real_tokens
+        self.padded_tokens += other.padded_tokens
+        self.naive_padded_tokens += other.naive_padded_tokens
+
+    def as_dict(self) -> Dict[str, float]:
+        payload: Dict[str, float] = asdict(self)
+        payload["padding_saved"] = self.padding_saved
+        payload["saved_fraction"] = round(self.saved_fraction, 4)
+        return payload
+
+
+@dataclass
+class BatchPlan:
+    batches: List[List[int]]  # indices into the scheduled sequence, one list per batch
+    stats: PaddingStats = field(default_factory=PaddingStats)
+
+
+def _padded_cost(lengths: Sequence[int], batches: Sequence[Sequence[int]]) -> int:
+    return sum(len(batch) * max(lengths[i] for i in batch) for batch in batches if batch)
+
+
+def plan_token_batches(
+    lengths: Sequence[int],
+    max_tokens: int,
+    *,
+    max_batch_size: Optional[int] = None,
+    naive_batch_size: int = 16,
+) -> BatchPlan:
+    """Group indices by length so each padded batch stays under ``max_tokens``.
+
+    Indices are sorted longest-first and packed greedily; a batch's cost is
+    ``rows * longest_row``. A single row longer than the budget gets its own
+    batch. ``naive_batch_size`` only feeds the padding comparison in ``stats``.
+    """
+    if max_tokens < 1:
+        raise ValueError("max_tokens must be >= 1")
+    if max_batch_size is not None and max_batch_size < 1:
+        raise ValueError("max_batch_size must be >= 1")
+    if naive_batch_size < 1:
+        raise ValueError("naive_batch_size must be >= 1")
+
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_max = 0
+    for idx in order:
+        longest = max(current_max, lengths[idx])
+        full = max_batch_size is not None and len(current) >= max_batch_size
+        if current and (full or (len(current) + 1) * longest > max_tokens):
+            batches.append(current)
+            current = []
+            longest = lengths[idx]
+        current.append(idx)
+        current_max = longest
+    if current:
+        batches.append(current)
+
+    naive = [
+        list(range(start, min(start + naive_batch_size, len(lengths))))
+        for start in range(0, len(lengths), naive_batch_size)
+    ]
+    stats = PaddingStats(
+        real_tokens=sum(lengths),
+        padded_tokens=_padded_cost(lengths, batches),
+        naive_padded_tokens=_padded_cost(lengths, naive),
+    )
+    return BatchPlan(batches=batches, stats=stats)
+
+
+def restore_order(values: Sequence[T], batches: Sequence[Sequence[int]]) -> List[T]:
+    """Map values produced batch-by-batch back to the original input order."""
+    flat = [idx for batch in batches for idx in batch]
+    if len(flat) != len(values):
+        raise ValueError("values and batch plan have different lengths")
+    out: List[Optional[T]] = [None] * len(flat)
+    for idx, value in zip(flat, values):
+        out[idx] = value
+    return out  # type: ignore[return-value]
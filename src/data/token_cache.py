@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from itertools import chain
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+CACHE_FORMAT_VERSION = 1
+# Texts per tokenizer call; large enough for the Rust fast tokenizer to spread
+# one call across all cores, small enough to bound the Python lists it returns.
+ENCODE_CHUNK = 8192
+
+# (ids, texts, labels) for one split, built only on a cache miss.
+RowsLoader = Callable[[], Tuple[List[str], List[str], List[int]]]
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def tokenizer_fingerprint(tokenizer) -> str:
+    """Hash of the tokenizer's vocabulary/merges, independent of where it was loaded from."""
+    backend = getattr(tokenizer, "backend_tokenizer", None)
+    if backend is not None:
+        state = backend.to_str()
+    else:
+        state = json.dumps(sorted(tokenizer.get_vocab().items()))
+    payload = f"{type(tokenizer).__name__}\x1f{state}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def token_cache_key(
+    dataset_sha256: str, tokenizer_fp: str, max_length: int, preprocess: Dict[str, Any]
+) -> str:
+    payload = json.dumps(
+        {
+            "version": CACHE_FORMAT_VERSION,
+            "dataset_sha256": dataset_sha256,
+            "tokenizer": tokenizer_fp,
+            "max_length": int(max_length),
+            "preprocess": preprocess,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class EncodedSplit:
+    """Token ids of a split stored flat: row ``i`` is ``input_ids[offsets[i]:offsets[i + 1]]``."""
+
+    ids: List[str]
+    labels: np.ndarray  # int8, one per row
+    input_ids: np.ndarray  # int32, all rows concatenated
+    offsets: np.ndarray  # int64, len(ids) + 1
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def tokens(self, idx: int) -> np.ndarray:
+        return self.input_ids[self.offsets[idx] : self.offsets[idx + 1]]
+
+
+class TokenizedDataset:
+    """Map-style dataset over an ``EncodedSplit`` whose batches are padded by ``collate``.
+
+    Items are row indices; ``collate`` copies the selected token slices into one
+    padded array, so no per-example Python objects are built.
+    """
+
+    def __init__(self, split: EncodedSplit, pad_token_id: int, *, padding_side: str = "right"):
+        if padding_side not in {"left", "right"}:
+            raise ValueError("padding_side must be 'left' or 'right'")
+        self.split = split
+        self.pad_token_id = int(pad_token_id)
+        self.padding_side = padding_side
+
+    def __len__(self) -> int:
+        return len(self.split)
+
+    def __getitem__(self, idx: int) -> int:
+        return idx
+
+    def collate(self, indices: Sequence[int]) -> Dict[str, Any]:
+        rows = np.asarray(indices, dtype=np.int64)
+        starts = self.split.offsets[rows]
+        lengths = self.split.offsets[rows + 1] - starts
+        width = int(lengths.max()) if len(rows) else 0
+        input_ids = np.full((len(rows), width), self.pad_token_id, dtype=np.int64)
+        attention_mask = np.zeros((len(rows), width), dtype=np.int64)
+        for i, (start, length) in enumerate(zip(starts.tolist(), lengths.tolist())):
+            col = width - length if self.padding_side == "left" else 0
+            input_ids[i, col : col + length] = self.split.input_ids[start : start + length]
+            attention_mask[i, col : col + length] = 1
+        return {
+            "input_ids": input_ids,
+            "attention_mask": attention_mask,
+            "labels": self.split.labels[rows].astype(np.int64),
+            "id": [self.split.ids[i] for i in rows.tolist()],
+        }
+
+
+def encode_texts(
+    ids: Sequence[str], texts: Sequence[str], labels: Sequence[int], tokenizer, max_length: int
+) -> EncodedSplit:
+    """Batch-encode a whole split into flat int32 ids.
+
+    Each chunk is a single tokenizer call, which a fast tokenizer encodes in
+    parallel unless ``TOKENIZERS_PARALLELISM=false``.
+    """
+    lengths = np.zeros(len(texts), dtype=np.int64)
+    chunks: List[np.ndarray] = []
+    for start in range(0, len(texts), ENCODE_CHUNK):
+        encoded = tokenizer(
+            list(texts[start : start + ENCODE_CHUNK]),
+            truncation=True,
+            max_length=max_length,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+        )["input_ids"]
+        chunk_lengths = [len(row) for row in encoded]
+        lengths[start : start + len(encoded)] = chunk_lengths
+        chunks.append(
+            np.fromiter(chain.from_iterable(encoded), dtype=np.int32, count=sum(chunk_lengths))
+        )
+    offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    input_ids = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int32)
+    return EncodedSplit(
+        ids=list(ids),
+        labels=np.asarray(labels, dtype=np.int8),
+        input_ids=input_ids,
+        offsets=offsets,
+    )
+
+
+def concat_encoded(splits: Sequence[EncodedSplit]) -> EncodedSplit:
+    """Stack splits row-wise into one ``EncodedSplit`` (token arrays are copied)."""
+    if not splits:
+        raise ValueError("splits must not be empty")
+    if len(splits) == 1:
+        return splits[0]
+    lengths = np.concatenate([split.lengths for split in splits])
+    tokens = [split.input_ids[split.offsets[0] : split.offsets[-1]] for split in splits]
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return EncodedSplit(
+        ids=[ex_id for split in splits for ex_id in split.ids],
+        labels=np.concatenate([np.asarray(split.labels, dtype=np.int8) for split in splits]),
+        input_ids=np.concatenate(tokens).astype(np.int32, copy=False),
+        offsets=offsets,
+    )
+
+
+def save_encoded(split: EncodedSplit, path: Path, meta: Dict[str, Any]) -> None:
+    """Write atomically: readers see either a complete entry or none."""
+    path = Path(path)
+    tmp = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    tmp.mkdir(parents=True)
+    np.save(tmp / "input_ids.npy", np.ascontiguousarray(split.input_ids, dtype=np.int32))
+    np.save(tmp / "offsets.npy", np.ascontiguousarray(split.offsets, dtype=np.int64))
+    np.save(tmp / "lengths.npy", split.lengths.astype(np.int32))
+    np.save(tmp / "labels.npy", np.ascontiguousarray(split.labels, dtype=np.int8))
+    (tmp / "ids.json").write_text(json.dumps(split.ids), encoding="utf-8")
+    (tmp / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    try:
+        os.replace(tmp, path)
+    except OSError:
+        # Another process published the same key first; its copy is identical.
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def load_encoded(path: Path) -> EncodedSplit:
+    """Memory-map a cache entry; token arrays are not copied into memory."""
+    path = Path(path)
+    return EncodedSplit(
+        ids=json.loads((path / "ids.json").read_text(encoding="utf-8")),
+        labels=np.load(path / "labels.npy", mmap_mode="r"),
+        input_ids=np.load(path / "input_ids.npy", mmap_mode="r"),
+        offsets=np.load(path / "offsets.npy", mmap_mode="r"),
+    )
+
+
+def load_or_encode(
+    dataset_path: Path,
+    load_rows: RowsLoader,
+    tokenizer,
+    max_length: int,
+    *,
+    preprocess: Dict[str, Any],
+    cache_dir: Optional[Path] = None,
+) -> Tuple[EncodedSplit, bool]:
+    """Return ``(split, cache_hit)``.
+
+    ``preprocess`` must describe every option that changes the text before
+    tokenization (Unicode preprocessing, normalization, augmentation seed...).
+    With ``cache_dir=None`` the split is encoded in memory and nothing is saved.
+    """
+    if cache_dir is None:
+        ids, texts, labels = load_rows()
+        return encode_texts(ids, texts, labels, tokenizer, max_length), False
+
+    dataset_sha256 = sha256_file(dataset_path)
+    tokenizer_fp = tokenizer_fingerprint(tokenizer)
+    key = token_cache_key(dataset_sha256, tokenizer_fp, max_length, preprocess)
+    entry = Path(cache_dir) / key
+    if (entry / "meta.json").exists():
+        return load_encoded(entry), True
+
+    ids, texts, labels = load_rows()
+    split = encode_texts(ids, texts, labels, tokenizer, max_length)
+    meta = {
+        "version": CACHE_FORMAT_VERSION,
+        "dataset_path": str(Path(dataset_path).resolve()),
+        "dataset_sha256": dataset_sha256,
+        "tokenizer": getattr(tokenizer, "name_or_path", None),
+        "tokenizer_fingerprint": tokenizer_fp,
+        "max_length": int(max_length),
+        "preprocess": preprocess,
+        "rows": len(split),
+        "tokens": int(split.offsets[-1]),
+    }
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    save_encoded(split, entry, meta)
+    return load_encoded(entry), False
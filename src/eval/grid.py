@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict
+
+from src.data.token_cache import sha256_file
+from src.eval.predictions import find_predictions
+
+# Bump when a change to eval_lora_from_run.py alters what a cell's outputs contain.
+EVAL_CELL_VERSION = 1
+EVALUATION_MANIFEST = "evaluation_manifest.json"
+
+
+def run_content_sha256(run_dir: str | Path) -> str:
+    """Hash of a LoRA run's ``config.json`` and every file under ``lora_adapter/`` (by content)."""
+    run_dir = Path(run_dir)
+    digest = hashlib.sha256()
+    digest.update((run_dir / "config.json").read_bytes())
+    adapter_dir = run_dir / "lora_adapter"
+    if adapter_dir.exists():
+        for path in sorted(p for p in adapter_dir.rglob("*") if p.is_file()):
+            digest.update(f"\x1f{path.relative_to(adapter_dir).as_posix()}\x1f".encode("utf-8"))
+            digest.update(sha256_file(path).encode("ascii"))
+    return digest.hexdigest()
+
+
+def eval_cell_key(adapter_sha256: str, dataset_sha256: str, flags: Dict[str, Any]) -> str:
+    """Content address of one (run, dataset, eval flags) evaluation."""
+    payload = json.dumps(
+        {
+            "version": EVAL_CELL_VERSION,
+            "adapter_sha256": adapter_sha256,
+            "dataset_sha256": dataset_sha256,
+            "flags": flags,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def eval_cell_flags(
+    *,
+    target_fpr: float,
+    normalize_infer: bool,
+    normalize_drop_mn: bool,
+    bootstrap: int,
+    bootstrap_seed: int,
+) -> Dict[str, Any]:
+    """Eval options that change a cell's outputs; batching and token caching do not."""
+    return {
+        "target_fpr": float(target_fpr),
+        "normalize_infer": bool(normalize_infer),
+        "normalize_drop_mn": bool(normalize_drop_mn),
+        "bootstrap": int(bootstrap),
+        "bootstrap_seed": int(bootstrap_seed) if bootstrap else None,
+    }
+
+
+def evaluation_key(split_name: str, normalize_infer: bool) -> str:
+    """Name of a split's outputs in the run dir (``final_metrics_<key>.json`` etc.)."""
+    return f"{split_name}_norm" if normalize_infer else split_name
+
+
+def load_evaluation_manifest(run_dir: str | Path) -> Dict[str, Any]:
+    path = Path(run_dir) / EVALUATION_MANIFEST
+    if not path.exists():
+        return {"evaluations": {}}
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(manifest.get("evaluations"), dict):
+        manifest["evaluations"] = {}
+    return manifest
+
+
+def record_evaluations(run_dir: str | Path, entries: Dict[str, Dict[str, Any]]) -> Path:
+    """Merge ``entries`` (evaluation key -> manifest entry) into the run's evaluation manifest."""
+    run_dir = Path(run_dir)
+    manifest = load_evaluation_manifest(run_dir)
+    manifest.setdefault("generated_by", "scripts/eval_lora_from_run.py")
+    manifest.setdefault("run_dir", str(run_dir.resolve()))
+    manifest["evaluations"].update(entries)
+    manifest["updated_at"] = datetime.now(timezone.utc).isoformat()
+    path = run_dir / EVALUATION_MANIFEST
+    path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return path
+
+
+def cell_is_current(run_dir: str | Path, key: str, cell_key: str) -> bool:
+    """True when ``key``'s manifest entry was produced for ``cell_key`` and its outputs still exist."""
+    run_dir = Path(run_dir)
+    entry = load_evaluation_manifest(run_dir)["evaluations"].get(key)
+    if not isinstance(entry, dict) or entry.get("cell_key") != cell_key:
+        return False
+    if not (run_dir / f"final_metrics_{key}.json").exists():
+        return False
+    try:
+        find_predictions(run_dir, key)
+    except FileNotFoundError:
+        return False
+    return True
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 import numpy as np
-from sklearn.metrics import average_precision_score, roc_auc_score, roc_curve
+from sklearn.metrics import average_precision_score, roc_auc_score
 
 
 @dataclass
@@ -22,38 +22,193 @@ def _safe_auc(y_true: np.ndarray, y_score: np.ndarray, fn) -> Optional[float]:
     return float(fn(y_true, y_score))
 
 
+@dataclass(frozen=True)
+class ScoreCurve:
+    """Confusion counts at every distinct score, from one descending sort.
+
+    ``tp[k]``/``fp[k]`` count positives/negatives with score ``>= thresholds[k - 1]``
+    (``k = 0`` flags nothing), so counts at any threshold are a binary search away.
+    """
+
+    thresholds: np.ndarray  # distinct scores, descending
+    tp: np.ndarray  # len(thresholds) + 1 cumulative counts
+    fp: np.ndarray
+    n_pos: int
+    n_neg: int
+
+    @classmethod
+    def from_scores(cls, y_true, y_score) -> "ScoreCurve":
+        y_true = np.asarray(y_true).astype(int)
+        y_score = np.asarray(y_score)
+        if y_score.dtype != np.float32:
+            # float32 scores stay float32 so thresholds compare the way ``scores >= t`` does.
+            y_score = y_score.astype(float)
+        if y_true.shape != y_score.shape:
+            raise ValueError("y_true and y_score must have the same length")
+        order = np.argsort(-y_score, kind="stable")
+        sorted_scores = y_score[order]
+        is_pos = (y_true[order] == 1).astype(np.int64)
+        # Last row of each run of equal scores closes that threshold's counts.
+        ends = np.flatnonzero(np.diff(sorted_scores, append=-np.inf) != 0)
+        tp = np.concatenate([[0], np.cumsum(is_pos)[ends]])
+        fp = np.concatenate([[0], ends + 1 - tp[1:]])
+        return cls(
+            thresholds=sorted_scores[ends],
+            tp=tp,
+            fp=fp,
+            n_pos=int(is_pos.sum()),
+            n_neg=int(len(y_true) - is_pos.sum()),
+        )
+
+    def _flagged_index(self, thresholds) -> np.ndarray:
+        # Number of distinct scores >= each threshold (thresholds are descending).
+        ascending = self.thresholds[::-1]
+        cuts = np.asarray(thresholds, dtype=float).astype(ascending.dtype)
+        return len(ascending) - np.searchsorted(ascending, cuts, side="left")
+
+    def rates_at(self, thresholds) -> Dict[str, np.ndarray]:
+        """Counts and rates for ``score >= threshold`` at each threshold, as arrays."""
+        thresholds = np.atleast_1d(np.asarray(thresholds, dtype=float))
+        k = self._flagged_index(thresholds)
+        return self._rates(k, thresholds)
+
+    def _rates(self, k: np.ndarray, thresholds: np.ndarray) -> Dict[str, np.ndarray]:
+        tp = self.tp[k]
+        fp = self.fp[k]
+        fn = self.n_pos - tp
+        flagged = tp + fp
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tpr = tp / self.n_pos if self.n_pos else np.zeros(len(k))
+            fpr = fp / self.n_neg if self.n_neg else np.zeros(len(k))
+            asr = fn / self.n_pos if self.n_pos else np.zeros(len(k))
+            precision = np.where(flagged > 0, tp / np.maximum(flagged, 1), 0.0)
+        return {
+            "threshold": thresholds,
+            "tp": tp,
+            "fp": fp,
+            "tn": self.n_neg - fp,
+            "fn": fn,
+            "tpr": tpr,
+            "fpr": fpr,
+            "precision": precision,
+            "asr": asr,
+        }
+
+    def metrics_at(self, thresholds) -> List[Dict[str, float]]:
+        """``rates_at`` as one plain dict per threshold (counts as ints)."""
+        rates = self.rates_at(thresholds)
+        keys = list(rates)
+        return [
+            {
+                key: int(rates[key][i]) if key in ("tp", "fp", "tn", "fn") else float(rates[key][i])
+                for key in keys
+            }
+            for i in range(len(rates["threshold"]))
+        ]
+
+    def operating_points(self, target_fprs) -> List[OperatingPoint]:
+        """The ``roc_curve`` point ``tpr_at_fpr`` picks for each target (``inf`` when none qualifies)."""
+        targets = np.atleast_1d(np.asarray(target_fprs, dtype=float))
+        k = _roc_operating_index(self.tp, self.fp, self.n_neg, targets)
+        cut = np.concatenate([[np.inf], self.thresholds])[k]
+        rates = self._rates(k, cut)
+        # roc_curve leaves a rate undefined when its class is empty.
+        if not self.n_pos:
+            rates["tpr"] = np.full(len(k), np.nan)
+        if not self.n_neg:
+            rates["fpr"] = np.full(len(k), np.nan)
+        return [
+            OperatingPoint(
+                target_fpr=float(target),
+                threshold=float(rates["threshold"][i]),
+                tpr=float(rates["tpr"][i]),
+                fpr=float(rates["fpr"][i]),
+                asr=float(rates["asr"][i]),
+            )
+            for i, target in enumerate(targets)
+        ]
+
+
+    def calibration_points(self, target_fprs) -> List[OperatingPoint]:
+        """Highest-TPR threshold (lowest FPR among ties) with FPR <= each target.
+
+        Unlike ``operating_points`` this never settles for the low end of a
+        vertical ROC run. When even the top score is over budget the threshold
+        is the next float above it, so it stays finite and flags nothing.
+        """
+        targets = np.atleast_1d(np.asarray(target_fprs, dtype=float))
+        fpr = self.fp / self.n_neg if self.n_neg else np.zeros(len(self.fp))
+        # fpr and tp are non-decreasing in k: the last eligible k has the highest TPR,
+        # and the first k reaching that TPR has the lowest FPR for it.
+        last = np.maximum(np.searchsorted(fpr, targets, side="right") - 1, 0)
+        k = np.searchsorted(self.tp, self.tp[last], side="left")
+        above_top = np.nextafter(self.thresholds[0], np.inf) if len(self.thresholds) else np.inf
+        cut = np.concatenate([[above_top], self.thresholds])[k]
+        rates = self._rates(k, cut)
+        return [
+            OperatingPoint(
+                target_fpr=float(target),
+                threshold=float(rates["threshold"][i]),
+                tpr=float(rates["tpr"][i]),
+                fpr=float(rates["fpr"][i]),
+                asr=float(rates["asr"][i]),
+            )
+            for i, target in enumerate(targets)
+        ]
+
+
+def _roc_points(tp: np.ndarray, fp: np.ndarray) -> np.ndarray:
+    """Cut indices ``roc_curve`` keeps (``drop_intermediate=True``), the origin ``k = 0`` included.
+
+    ``tp``/``fp`` are cumulative counts with the origin first, as in ``ScoreCurve``.
+    """
+    inner = np.arange(1, len(tp))
+    if len(inner) > 2:
+        corner = (np.diff(fp[1:], 2) != 0) | (np.diff(tp[1:], 2) != 0)
+        inner = inner[np.concatenate([[True], corner, [True]])]
+    return np.concatenate([[0], inner])
+
+
+def _roc_operating_index(tp: np.ndarray, fp: np.ndarray, n_neg: int, targets: np.ndarray) -> np.ndarray:
+    """Baseline operating-point rule: the first kept ROC point at the largest FPR <= target.
+
+    With ``drop_intermediate`` a vertical run of the curve keeps both ends, and
+    the first one (lowest TPR) wins, exactly as ``argmax`` over ``roc_curve`` did.
+    """
+    points = _roc_points(tp, fp)
+    if not n_neg:
+        # Every FPR is NaN, so nothing is eligible and argmin picks the origin.
+        return np.zeros(len(targets), dtype=np.int64)
+    fpr = fp[points] / n_neg
+    last = np.maximum(np.searchsorted(fpr, targets, side="right") - 1, 0)
+    first = np.searchsorted(fpr, fpr[last], side="left")
+    return points[first]
+
+
 def tpr_at_fpr(y_true: np.ndarray, y_score: np.ndarray, target_fpr: float = 0.01) -> OperatingPoint:
-    y_true = np.asarray(y_true).astype(int)
-    y_score = np.asarray(y_score).astype(float)
+    """Operating point at the largest ``roc_curve`` FPR that is at most ``target_fpr``."""
+    return ScoreCurve.from_scores(y_true, y_score).operating_points([target_fpr])[0]
+
+
+def threshold_metrics(y_true, y_score, thresholds) -> List[Dict[str, float]]:
+    """tp/fp/tn/fn, TPR, FPR, precision and ASR at each threshold in O(N log N + T log N)."""
+    return ScoreCurve.from_scores(y_true, y_score).metrics_at(thresholds)
 
-    fpr, tpr, thr = roc_curve(y_true, y_score)
-    eligible = np.where(fpr <= target_fpr)[0]
-    if len(eligible) == 0:
-        idx = int(np.argmin(fpr))
-    else:
-        idx = int(eligible[np.argmax(fpr[eligible])])
-
-    threshold = float(thr[idx])
-    chosen_fpr = float(fpr[idx])
-    chosen_tpr = float(tpr[idx])
-
-    pred_attack = y_score >= threshold
-    pos = y_true == 1
-    if pos.sum() == 0:
-        asr = 0.0
-    else:
-        asr = float((~pred_attack & pos).sum() / pos.sum())
-
-    return OperatingPoint(
-        target_fpr=float(target_fpr),
-        threshold=threshold,
-        tpr=chosen_tpr,
-        fpr=chosen_fpr,
-        asr=asr,
-    )
-
-
-def compute_metrics(y_true, y_score, target_fpr: float = 0.01) -> Dict[str, float | None]:
+
+def compute_metrics(
+    y_true,
+    y_score,
+    target_fpr: float = 0.01,
+    *,
+    n_boot: int = 0,
+    ci_alpha: float = 0.05,
+    seed: int = 0,
+) -> Dict[str, object]:
+    """AUROC, AUPRC and the operating point at ``target_fpr``.
+
+    With ``n_boot > 0`` a ``ci`` entry holds percentile bootstrap intervals
+    for AUROC, AUPRC and TPR@FPR (see ``bootstrap_metrics``).
+    """
     y_true = np.asarray(y_true).astype(int)
     y_score = np.asarray(y_score).astype(float)
 
@@ -61,7 +216,7 @@ def compute_metrics(y_true, y_score, target_fpr: float = 0.01) -> Dict[str, floa
     auprc = _safe_auc(y_true, y_score, average_precision_score)
     op = tpr_at_fpr(y_true, y_score, target_fpr=target_fpr)
 
-    return {
+    metrics: Dict[str, object] = {
         "auroc": auroc,
         "auprc": auprc,
         "tpr_at_fpr": op.tpr,
@@ -69,4 +224,152 @@ def compute_metrics(y_true, y_score, target_fpr: float = 0.01) -> Dict[str, floa
         "threshold": op.threshold,
         "asr_at_threshold": op.asr,
         "target_fpr": op.target_fpr,
-    }
\ No newline at end of file
+    }
+    if n_boot > 0:
+        metrics["ci"] = bootstrap_metrics(
+            y_true, y_score, target_fpr=target_fpr, n_boot=n_boot, alpha=ci_alpha, seed=seed
+        )
+    return metrics
+
+
+def _curve_summaries(
+    counts: np.ndarray, tp: np.ndarray, target_fpr: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """AUROC, AUPRC and TPR@FPR for each row of per-score weights.
+
+    Columns are distinct scores in descending order (``counts`` rows, ``tp``
+    of them positive), so cumulative sums along a row give that replicate's
+    ROC/PR points; ties and the TPR@FPR cut are handled like scikit-learn.
+    """
+    cum_tp = np.cumsum(tp, axis=1)
+    cum_fp = np.cumsum(counts, axis=1)
+    cum_fp -= cum_tp
+    n_pos = cum_tp[:, -1].astype(float)
+    n_neg = cum_fp[:, -1].astype(float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Each positive beats the negatives below its score and ties half of its own.
+        auroc = (tp * (n_neg[:, None] - cum_fp + (counts - tp) / 2.0)).sum(axis=1) / (n_pos * n_neg)
+        auprc = (tp * (cum_tp / (cum_tp + cum_fp).clip(min=1))).sum(axis=1) / n_pos
+        tpr = np.empty(len(tp))
+        targets = np.asarray([target_fpr], dtype=float)
+        for row in range(len(tp)):
+            # Scores the replicate never drew are not points of its ROC curve.
+            present = counts[row] > 0
+            row_tp = np.concatenate([[0], cum_tp[row, present]])
+            row_fp = np.concatenate([[0], cum_fp[row, present]])
+            k = _roc_operating_index(row_tp, row_fp, int(n_neg[row]), targets)[0]
+            tpr[row] = row_tp[k] / n_pos[row]
+    undefined = (n_pos == 0) | (n_neg == 0)
+    for values in (auroc, auprc, tpr):
+        values[undefined] = np.nan
+    return auroc, auprc, tpr
+
+
+def bootstrap_metrics(
+    y_true,
+    y_score,
+    *,
+    target_fpr: float = 0.01,
+    n_boot: int = 1000,
+    alpha: float = 0.05,
+    seed: int = 0,
+    max_cells: int = 4_000_000,
+) -> Dict[str, object]:
+    """Percentile bootstrap CIs for AUROC, AUPRC and TPR@``target_fpr``.
+
+    Scores are sorted once. Each replicate is a row of resample counts over
+    the sorted rows, drawn ``max_cells // N`` replicates at a time, so all
+    three metrics for a chunk come from a few array passes. Replicates that
+    miss a class are dropped; ``valid`` counts the rest.
+    """
+    if n_boot < 1:
+        raise ValueError("n_boot must be >= 1")
+    if not 0 < alpha < 1:
+        raise ValueError("alpha must be between 0 and 1")
+    y_true = np.asarray(y_true).astype(int)
+    y_score = np.asarray(y_score).astype(float)
+    if y_true.shape != y_score.shape:
+        raise ValueError("y_true and y_score must have the same length")
+    n = len(y_true)
+    if n == 0:
+        raise ValueError("bootstrap needs at least one row")
+
+    order = np.argsort(-y_score, kind="stable")
+    sorted_scores = y_score[order]
+    group_starts = np.flatnonzero(np.diff(sorted_scores, prepend=np.inf) != 0)
+    tied = len(group_starts) < n
+    is_pos = (y_true[order] == 1).astype(np.int32)
+
+    rng = np.random.default_rng(seed)
+    chunk = max(1, max_cells // n)
+    values = np.empty((3, n_boot))
+    for start in range(0, n_boot, chunk):
+        b = min(chunk, n_boot - start)
+        # Uniform draws are drawn directly as positions in the sorted order.
+        draws = rng.integers(0, n, size=(b, n))
+        counts = np.empty((b, n), dtype=np.int32)
+        for row in range(b):
+            counts[row] = np.bincount(draws[row], minlength=n)
+        tp = counts * is_pos
+        if tied:
+            counts = np.add.reduceat(counts, group_starts, axis=1)
+            tp = np.add.reduceat(tp, group_starts, axis=1)
+        values[:, start : start + b] = _curve_summaries(counts, tp, target_fpr)
+
+    result: Dict[str, object] = {"n_boot": n_boot, "alpha": alpha, "seed": seed}
+    for name, row in zip(("auroc", "auprc", "tpr_at_fpr"), values):
+        finite = row[~np.isnan(row)]
+        if len(finite) == 0:
+            result[name] = None
+            continue
+        low, high = np.quantile(finite, [alpha / 2, 1 - alpha / 2])
+        result[name] = {"low": float(low), "high": float(high), "std": float(finite.std())}
+    result["valid"] = int((~np.isnan(values[0])).sum())
+    return result
+
+
+def _rates_at_threshold(curve: ScoreCurve, threshold: float) -> Dict[str, float]:
+    point = curve.metrics_at([threshold])[0]
+    return {"tpr_at_threshold": point["tpr"], "fpr_at_threshold": point["fpr"]}
+
+
+def score_shift_report(
+    y_true, reference_scores, candidate_scores, threshold: float, target_fpr: float = 0.01
+) -> Dict[str, object]:
+    """Compare a candidate model's scores (e.g. quantized) with reference scores on the same rows.
+
+    Reports the per-row score shift, how many decisions flip at the fixed
+    ``threshold``, and how TPR@``target_fpr`` and TPR/FPR at ``threshold`` move.
+    """
+    y_true = np.asarray(y_true).astype(int)
+    reference = np.asarray(reference_scores).astype(float)
+    candidate = np.asarray(candidate_scores).astype(float)
+    if reference.shape != candidate.shape or reference.shape != y_true.shape:
+        raise ValueError("y_true, reference_scores and candidate_scores must have the same length")
+    diff = candidate - reference
+    abs_diff = np.abs(diff)
+
+    sides = {}
+    for name, scores in (("reference", reference), ("candidate", candidate)):
+        curve = ScoreCurve.from_scores(y_true, scores)
+        op = curve.operating_points([target_fpr])[0]
+        sides[name] = {"tpr_at_fpr": op.tpr, "fpr_actual": op.fpr, "op_threshold": op.threshold}
+        sides[name].update(_rates_at_threshold(curve, threshold))
+
+    return {
+        "rows": int(len(y_true)),
+        "threshold": float(threshold),
+        "target_fpr": float(target_fpr),
+        "score_shift": {
+            "mean": float(diff.mean()) if len(diff) else 0.0,
+            "mean_abs": float(abs_diff.mean()) if len(diff) else 0.0,
+            "p95_abs": float(np.quantile(abs_diff, 0.95)) if len(diff) else 0.0,
+            "max_abs": float(abs_diff.max()) if len(diff) else 0.0,
+        },
+        "decision_flips": int(((reference >= threshold) != (candidate >= threshold)).sum()),
+        **sides,
+        "delta": {
+            key: sides["candidate"][key] - sides["reference"][key]
+            for key in ("tpr_at_fpr", "tpr_at_threshold", "fpr_at_threshold")
+        },
+    }
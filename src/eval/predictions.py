@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import json
+import os
+import struct
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+import numpy as np
+
+# Per-split predictions are stored as predictions_<split>.npz; .jsonl is the export/legacy form.
+PREDICTIONS_SUFFIX = ".npz"
+LEGACY_SUFFIX = ".jsonl"
+_ZIP_LOCAL_HEADER = struct.Struct("<4s5HLLLHH")
+
+
+@dataclass(frozen=True)
+class Predictions:
+    """One split's predictions as columns: ``ids`` (str), ``labels`` (int8), ``scores`` (float32)."""
+
+    ids: np.ndarray
+    labels: np.ndarray
+    scores: np.ndarray
+    split: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def rows(self) -> Iterator[Dict[str, object]]:
+        """Rows in the JSONL schema (``id``, ``label``, ``score`` and ``split`` when known)."""
+        for ex_id, label, score in zip(self.ids.tolist(), self.labels.tolist(), self.scores.tolist()):
+            row: Dict[str, object] = {"id": ex_id, "label": int(label), "score": float(score)}
+            if self.split is not None:
+                row["split"] = self.split
+            yield row
+
+
+def predictions_path(run_dir: str | Path, split: str) -> Path:
+    return Path(run_dir) / f"predictions_{split}{PREDICTIONS_SUFFIX}"
+
+
+def find_predictions(run_dir: str | Path, split: str) -> Path:
+    """``predictions_<split>.npz``, falling back to a legacy ``.jsonl`` from older runs."""
+    path = predictions_path(run_dir, split)
+    if path.exists():
+        return path
+    legacy = path.with_suffix(LEGACY_SUFFIX)
+    if legacy.exists():
+        return legacy
+    raise FileNotFoundError(f"Missing predictions file: {path}")
+
+
+def list_prediction_splits(run_dir: str | Path) -> Dict[str, Path]:
+    """Split name -> predictions file for every split in ``run_dir`` (npz preferred)."""
+    found: Dict[str, Path] = {}
+    for suffix in (LEGACY_SUFFIX, PREDICTIONS_SUFFIX):
+        for path in sorted(Path(run_dir).glob(f"predictions_*{suffix}")):
+            found[path.name[len("predictions_") : -len(suffix)]] = path
+    return dict(sorted(found.items()))
+
+
+def split_name(path: str | Path) -> Optional[str]:
+    """Split encoded in a ``predictions_<split>.{npz,jsonl}`` file name."""
+    name = Path(path).name
+    for suffix in (PREDICTIONS_SUFFIX, LEGACY_SUFFIX):
+        if name.startswith("predictions_") and name.endswith(suffix):
+            return name[len("predictions_") : -len(suffix)]
+    return None
+
+
+def write_predictions(
+    path: str | Path,
+    ids: Iterable[str],
+    labels: Iterable[int],
+    scores: Iterable[float],
+    *,
+    split: Optional[str] = None,
+    export_jsonl: bool = False,
+) -> Path:
+    """Write columns to ``path`` (``.npz``, uncompressed so it can be memory-mapped).
+
+    The file is replaced atomically. ``export_jsonl`` also writes the same rows
+    to the sibling ``.jsonl`` for tools that want one JSON object per line.
+    """
+    path = Path(path)
+    if path.suffix != PREDICTIONS_SUFFIX:
+        raise ValueError(f"predictions path must end with {PREDICTIONS_SUFFIX}: {path}")
+    predictions = Predictions(
+        ids=np.asarray([str(ex_id) for ex_id in ids], dtype=str),
+        labels=np.asarray(list(labels), dtype=np.int8),
+        scores=np.asarray(list(scores), dtype=np.float32),
+        split=split,
+    )
+    if not len(predictions.ids) == len(predictions.labels) == len(predictions.scores):
+        raise ValueError("ids, labels and scores must have the same length")
+    columns = {"id": predictions.ids, "label": predictions.labels, "score": predictions.scores}
+    if split is not None:
+        columns["split"] = np.asarray(split)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as handle:
+        np.savez(handle, **columns)
+    os.replace(tmp, path)
+    if export_jsonl:
+        export_jsonl_file(predictions, path.with_suffix(LEGACY_SUFFIX))
+    return path
+
+
+def _mmap_npz(path: Path) -> Optional[Dict[str, np.ndarray]]:
+    """Memory-map every member of an uncompressed ``.npz``; None if any member is compressed."""
+    arrays: Dict[str, np.ndarray] = {}
+    with zipfile.ZipFile(path) as archive, path.open("rb") as handle:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED or not info.filename.endswith(".npy"):
+                return None
+            handle.seek(info.header_offset)
+            header = _ZIP_LOCAL_HEADER.unpack(handle.read(_ZIP_LOCAL_HEADER.size))
+            handle.seek(header[-2] + header[-1], os.SEEK_CUR)
+            version = np.lib.format.read_magic(handle)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(handle)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(handle)
+            if dtype.hasobject:
+                return None
+            name = info.filename[: -len(".npy")]
+            if not shape or 0 in shape:
+                # np.memmap cannot map zero bytes; scalars and empty columns are tiny anyway.
+                arrays[name] = np.fromfile(handle, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+                continue
+            arrays[name] = np.memmap(
+                path,
+                dtype=dtype,
+                mode="r",
+                offset=handle.tell(),
+                shape=shape,
+                order="F" if fortran else "C",
+            )
+    return arrays
+
+
+def _load_jsonl(path: Path) -> Predictions:
+    ids, labels, scores = [], [], []
+    split = None
+    with path.open("r", encoding="utf-8") as handle:
+        for line_no, line in enumerate(handle, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"Invalid JSON on line {line_no} in {path}: {exc}") from exc
+            if "label" not in row or "score" not in row:
+                raise ValueError(f"Missing label/score on line {line_no} in {path}")
+            ids.append(str(row.get("id", line_no)))
+            labels.append(int(row["label"]))
+            scores.append(float(row["score"]))
+            split = row.get("split", split)
+    return Predictions(
+        ids=np.asarray(ids, dtype=str),
+        labels=np.asarray(labels, dtype=np.int8),
+        # Legacy rows keep full precision so thresholds calibrated on them still line up.
+        scores=np.asarray(scores, dtype=np.float64),
+        split=split,
+    )
+
+
+def load_predictions(path: str | Path, *, mmap: bool = True) -> Predictions:
+    """Load a predictions file: ``.npz`` in one read (memory-mapped by default) or legacy ``.jsonl``."""
+    path = Path(path)
+    if path.suffix == LEGACY_SUFFIX:
+        return _load_jsonl(path)
+    columns = _mmap_npz(path) if mmap else None
+    if columns is None:
+        with np.load(path, allow_pickle=False) as data:
+            columns = {name: data[name] for name in data.files}
+    missing = {"id", "label", "score"} - set(columns)
+    if missing:
+        raise ValueError(f"{path} is missing column(s): {', '.join(sorted(missing))}")
+    split = columns.get("split")
+    return Predictions(
+        ids=columns["id"],
+        labels=columns["label"],
+        scores=columns["score"],
+        split=str(split[()]) if split is not None else None,
+    )
+
+
+def load_split_predictions(run_dir: str | Path, split: str) -> Predictions:
+    return load_predictions(find_predictions(run_dir, split))
+
+
+def export_jsonl_file(predictions: Predictions, out_path: str | Path) -> Path:
+    """Write ``predictions`` as one JSON object per line."""
+    out_path = Path(out_path)
+    with out_path.open("w", encoding="utf-8") as handle:
+        for row in predictions.rows():
+            handle.write(json.dumps(row) + "\n")
+    return out_path
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+STATE_VERSION = 1
+# Thread pools a job's torch/BLAS/tokenizer code sizes itself from.
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "RAYON_NUM_THREADS")
+
+
+@dataclass(frozen=True)
+class Job:
+    """Commands run in order as one unit (e.g. train then eval); the job fails on the first error."""
+
+    job_id: str
+    commands: Tuple[Tuple[str, ...], ...]
+    cwd: Optional[str] = None
+
+    def fingerprint(self) -> str:
+        payload = json.dumps({"commands": self.commands, "cwd": self.cwd}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def make_job(
+    job_id: str, commands: Sequence[Sequence[str]], *, cwd: str | Path | None = None
+) -> Job:
+    return Job(
+        job_id=job_id,
+        commands=tuple(tuple(str(part) for part in cmd) for cmd in commands),
+        cwd=str(cwd) if cwd is not None else None,
+    )
+
+
+def default_threads_per_job(max_parallel: int) -> int:
+    return max(1, (os.cpu_count() or 1) // max(1, max_parallel))
+
+
+class JobState:
+    """Job statuses persisted to JSON after every change, so an interrupted grid can resume.
+
+    A job is skipped on the next run only if it finished with the same
+    fingerprint; ``pending``, ``running`` (interrupted) and ``failed`` jobs run again.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if isinstance(data.get("jobs"), dict):
+                self.jobs = data["jobs"]
+
+    def is_done(self, job: Job) -> bool:
+        entry = self.jobs.get(job.job_id) or {}
+        return entry.get("status") == "done" and entry.get("fingerprint") == job.fingerprint()
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        with self._lock:
+            self.jobs.setdefault(job_id, {}).update(fields)
+            self._save()
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": STATE_VERSION,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+            "jobs": self.jobs,
+        }
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+def _run_job(job: Job, state: JobState, log_path: Path, thread_env: Dict[str, str]) -> bool:
+    env = {**os.environ, **thread_env}
+    attempts = int((state.jobs.get(job.job_id) or {}).get("attempts", 0)) + 1
+    state.update(
+        job.job_id,
+        status="running",
+        fingerprint=job.fingerprint(),
+        attempts=attempts,
+        started_at=datetime.now(timezone.utc).isoformat(),
+        finished_at=None,
+        returncode=None,
+        log=str(log_path),
+    )
+    print(f"[{job.job_id}] started (log: {log_path})")
+    start = time.perf_counter()
+    returncode = 0
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with log_path.open("a", encoding="utf-8") as log:
+        for cmd in job.commands:
+            log.write(f"$ {' '.join(cmd)}\n")
+            log.flush()
+            try:
+                returncode = subprocess.run(
+                    list(cmd), cwd=job.cwd, env=env, stdout=log, stderr=subprocess.STDOUT
+                ).returncode
+            except OSError as exc:
+                log.write(f"{exc}\n")
+                returncode = 127
+            if returncode != 0:
+                break
+    wall_time_s = round(time.perf_counter() - start, 3)
+    status = "done" if returncode == 0 else "failed"
+    state.update(
+        job.job_id,
+        status=status,
+        returncode=returncode,
+        wall_time_s=wall_time_s,
+        finished_at=datetime.now(timezone.utc).isoformat(),
+    )
+    print(f"[{job.job_id}] {status} in {wall_time_s:.1f}s")
+    return returncode == 0
+
+
+def run_jobs(
+    jobs: Sequence[Job],
+    *,
+    state_path: str | Path,
+    max_parallel: int = 1,
+    threads_per_job: Optional[int] = None,
+    log_dir: str | Path | None = None,
+    summary_path: str | Path | None = None,
+) -> Dict[str, Any]:
+    """Run ``jobs`` with at most ``max_parallel`` at once and return the wall-time summary.
+
+    Each job's subprocesses get ``threads_per_job`` intra-op threads (default:
+    CPU count split evenly across concurrent jobs) via ``THREAD_ENV_VARS``, and
+    their output goes to ``log_dir/<job_id>.log``. Jobs already done per the
+    state file are skipped. A failed job does not stop the others.
+    """
+    if max_parallel < 1:
+        raise ValueError("max_parallel must be >= 1")
+    if threads_per_job is not None and threads_per_job < 1:
+        raise ValueError("threads_per_job must be >= 1")
+    ids = [job.job_id for job in jobs]
+    duplicates = sorted({job_id for job_id in ids if ids.count(job_id) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate job id(s): {', '.join(duplicates)}")
+
+    state = JobState(state_path)
+    log_root = Path(log_dir) if log_dir is not None else state.path.parent / f"{state.path.stem}_logs"
+    threads = threads_per_job or default_threads_per_job(max_parallel)
+    thread_env = {name: str(threads) for name in THREAD_ENV_VARS}
+
+    todo = [job for job in jobs if not state.is_done(job)]
+    for job in jobs:
+        if job not in todo:
+            print(f"[{job.job_id}] already done; skipping")
+    for job in todo:
+        state.update(job.job_id, status="pending", fingerprint=job.fingerprint())
+    print(f"Running {len(todo)} of {len(jobs)} job(s), {max_parallel} at a time, {threads} thread(s) each")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix="jbd-job") as pool:
+        futures = [
+            pool.submit(_run_job, job, state, log_root / f"{job.job_id}.log", thread_env)
+            for job in todo
+        ]
+        for future in futures:
+            future.result()
+
+    summary = summarize_jobs(state, ids, elapsed_s=time.perf_counter() - start)
+    summary.update({"max_parallel": max_parallel, "threads_per_job": threads})
+    if summary_path is not None:
+        summary_path = Path(summary_path)
+        summary_path.parent.mkdir(parents=True, exist_ok=True)
+        summary_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    print(format_summary(summary))
+    return summary
+
+
+def summarize_jobs(state: JobState, job_ids: Sequence[str], *, elapsed_s: float) -> Dict[str, Any]:
+    rows: List[Dict[str, Any]] = []
+    for job_id in job_ids:
+        entry = state.jobs.get(job_id) or {}
+        rows.append(
+            {
+                "job_id": job_id,
+                "status": entry.get("status", "pending"),
+                "wall_time_s": entry.get("wall_time_s"),
+                "attempts": entry.get("attempts", 0),
+                "returncode": entry.get("returncode"),
+                "log": entry.get("log"),
+            }
+        )
+    job_time = sum(row["wall_time_s"] or 0.0 for row in rows)
+    return {
+        "jobs": rows,
+        "failed": [row["job_id"] for row in rows if row["status"] != "done"],
+        "elapsed_s": round(elapsed_s, 3),
+        "total_job_time_s": round(job_time, 3),
+    }
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    lines = ["| job | status | wall_time_s | attempts |", "| --- | --- | --- | --- |"]
+    for row in summary["jobs"]:
+        wall = f"{row['wall_time_s']:.1f}" if row["wall_time_s"] is not None else "-"
+        lines.append(f"| {row['job_id']} | {row['status']} | {wall} | {row['attempts']} |")
+    lines.append(
+        f"Elapsed {summary['elapsed_s']:.1f}s for {summary['total_job_time_s']:.1f}s of job time"
+    )
+    return "\n".join(lines)
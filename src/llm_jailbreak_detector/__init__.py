@@ -5,8 +5,31 @@ from .normalize import normalize_text
 from .predict import Predictor, predict
 from .rules_detector import RulesDetector
 
+# Model backends and the cache pull in optional deps or sqlite; they resolve on
+# first attribute access so ``import llm_jailbreak_detector`` stays rules-only.
+_LAZY_ATTRS = {
+    "LoraDetector": ".lora_detector",
+    "OnnxDetector": ".onnx_detector",
+    "ResultCache": ".cache",
+}
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
 __all__ = [
+    "LoraDetector",
+    "OnnxDetector",
     "Predictor",
+    "ResultCache",
     "RulesDetector",
     "normalize_text",
     "predict",
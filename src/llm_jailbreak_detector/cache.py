@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+CachedScore = Tuple[float, Optional[dict]]  # (score, rationale)
+
+
+def make_cache_key(
+    detector: str, fingerprint: str, normalize_infer: bool, drop_mn: bool, text: str
+) -> str:
+    payload = "\x1f".join(
+        [detector, fingerprint, str(int(normalize_infer)), str(int(drop_mn)), text]
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Bounded LRU cache of detector scores with optional TTL and sqlite tier.
+
+    Keys are content hashes built by ``make_cache_key``; they include the
+    detector fingerprint, so scores from a different model/rule set never
+    match and several detectors can share one sqlite file. With a TTL, the
+    disk tier drops its expired rows when it is bound to a predictor.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl_seconds: float | None = None,
+        disk_path: str | Path | None = None,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be > 0")
+        self.max_entries = int(max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.disk_path = Path(disk_path) if disk_path else None
+        self.fingerprint: str | None = None
+        self._entries: OrderedDict[str, tuple[float, CachedScore]] = OrderedDict()
+        self._db: sqlite3.Connection | None = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def settings(self) -> dict[str, Any]:
+        """Constructor arguments, used to build an equivalent cache elsewhere."""
+        return {
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "disk_path": str(self.disk_path) if self.disk_path else None,
+        }
+
+    def bind(self, fingerprint: str) -> None:
+        """Attach the cache to a detector state; in-memory entries of any other state are dropped.
+
+        Disk rows of other fingerprints are kept (their keys can never match
+        this state), so detectors sharing a sqlite file do not evict each other.
+        """
+        if fingerprint == self.fingerprint:
+            return
+        self._entries.clear()
+        self.fingerprint = fingerprint
+        if self.disk_path is not None and self.ttl_seconds is not None:
+            db = self._connect()
+            with db:
+                db.execute("DELETE FROM results WHERE created < ?", (time.time() - self.ttl_seconds,))
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            assert self.disk_path is not None
+            self.disk_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.disk_path), timeout=30.0)
+            with self._db:
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS results ("
+                    "key TEXT PRIMARY KEY, fingerprint TEXT, score REAL, "
+                    "rationale TEXT, created REAL)"
+                )
+        return self._db
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created > self.ttl_seconds
+
+    def get(self, key: str) -> CachedScore | None:
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            created, value = entry
+            if not self._expired(created, now):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+            self.expirations += 1
+        if self.disk_path is not None:
+            row = self._connect().execute(
+                "SELECT score, rationale, created FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and not self._expired(row[2], now):
+                value = (float(row[0]), json.loads(row[1]) if row[1] else None)
+                self._remember(key, value, row[2])
+                self.disk_hits += 1
+                return value
+        self.misses += 1
+        return None
+
+    def _remember(self, key: str, value: CachedScore, created: float) -> None:
+        self._entries[key] = (created, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def put_many(self, items: list[tuple[str, CachedScore]]) -> None:
+        now = time.time()
+        for key, value in items:
+            self._remember(key, value, now)
+        if self.disk_path is not None and items:
+            db = self._connect()
+            with db:
+                db.executemany(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (key, self.fingerprint, score, json.dumps(rationale) if rationale else None, now)
+                        for key, (score, rationale) in items
+                    ],
+                )
+
+    def put(self, key: str, value: CachedScore) -> None:
+        self.put_many([(key, value)])
+
+    def clear(self) -> None:
+        self._entries.clear()
+        if self.disk_path is not None:
+            db = self._connect()
+            with db:
+                db.execute("DELETE FROM results")
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
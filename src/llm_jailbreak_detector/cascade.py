@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from bisect import bisect_right
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Mapping, Sequence
+
+from .lora_detector import LoraDetector
+from .rules_detector import RulesDetector
+
+CASCADE_CONFIG_FILE = "cascade.json"
+# Cheap stages, in the order they run; anything none of them decides goes to LoRA.
+CASCADE_STAGES = ("rules", "linear")
+# Candidate cut points per stage; more distinct scores are thinned to quantiles.
+MAX_BAND_EDGES = 256
+
+
+@dataclass
+class StageBand:
+    """Early-exit band for one cheap stage.
+
+    Scores below ``allow_below`` are allowed and scores at or above
+    ``block_at`` are blocked without running LoRA; ``None`` disables that side.
+    """
+
+    name: str
+    allow_below: float | None = None
+    block_at: float | None = None
+
+    def route(self, score: float) -> str | None:
+        if self.block_at is not None and score >= self.block_at:
+            return "block"
+        if self.allow_below is not None and score < self.allow_below:
+            return "allow"
+        return None
+
+
+def _band_edges(scores: Sequence[float], max_edges: int) -> list[float]:
+    unique = sorted(set(scores))
+    if len(unique) <= max_edges:
+        return unique
+    step = (len(unique) - 1) / (max_edges - 1)
+    return sorted({unique[round(k * step)] for k in range(max_edges)})
+
+
+def _lora_flags(lora_scores: Sequence[float], threshold: float) -> list[bool]:
+    """``score >= threshold`` compared in the scores' own dtype.
+
+    Val predictions are stored as float32 while the val threshold is a float64
+    score, so a row sitting exactly on the threshold would otherwise round
+    below it and be calibrated as unflagged, unlike at serving time.
+    """
+    import numpy as np
+
+    scores = np.asarray(lora_scores)
+    if scores.dtype != np.float32:
+        scores = scores.astype(np.float64)
+    return (scores >= scores.dtype.type(threshold)).tolist()
+
+
+def _rates(tp: int, fp: int, pos: int, neg: int) -> dict[str, float]:
+    return {"tpr": tp / pos if pos else 0.0, "fpr": fp / neg if neg else 0.0}
+
+
+def calibrate_cascade(
+    labels: Sequence[int],
+    lora_scores: Sequence[float],
+    stage_scores: Mapping[str, Sequence[float]],
+    threshold: float,
+    *,
+    target_fpr: float = 0.01,
+    max_tpr_drop: float = 0.0,
+    max_edges: int = MAX_BAND_EDGES,
+) -> tuple[list[StageBand], dict[str, Any]]:
+    """Pick each stage's band to maximize early exits on validation predictions.
+
+    Decisions are compared at ``threshold`` (the run's val threshold): the
+    cascade must keep LoRA's val TPR (less ``max_tpr_drop``) with FPR at most
+    ``max(target_fpr, LoRA FPR)``. Stages are calibrated greedily in
+    ``stage_scores`` order on the rows earlier stages left undecided.
+    """
+    if len(labels) != len(lora_scores):
+        raise ValueError("labels and lora_scores must have the same length")
+    flags = _lora_flags(lora_scores, threshold)
+    pos = sum(1 for label in labels if label == 1)
+    neg = len(labels) - pos
+    if pos == 0 or neg == 0:
+        raise ValueError("calibration needs both attack and benign rows")
+    tp = sum(1 for label, flag in zip(labels, flags) if flag and label == 1)
+    fp = sum(1 for label, flag in zip(labels, flags) if flag and label == 0)
+    lora_rates = _rates(tp, fp, pos, neg)
+    min_tp = (lora_rates["tpr"] - max_tpr_drop) * pos - 1e-9
+    max_fp = max(target_fpr, lora_rates["fpr"]) * neg + 1e-9
+
+    pending = list(range(len(labels)))
+    bands: list[StageBand] = []
+    stages_report: dict[str, dict[str, int]] = {}
+    for name, scores in stage_scores.items():
+        if len(scores) != len(labels):
+            raise ValueError(f"{name} scores must have the same length as labels")
+        edges = _band_edges([scores[i] for i in pending], max_edges) if pending else []
+        # Per bucket: rows, and rows whose LoRA decision an early exit would flip.
+        count = [0] * len(edges)
+        pos_flag, neg_flag, pos_noflag, neg_noflag = ([0] * len(edges) for _ in range(4))
+        for i in pending:
+            bucket = bisect_right(edges, scores[i]) - 1
+            count[bucket] += 1
+            if labels[i] == 1:
+                (pos_flag if flags[i] else pos_noflag)[bucket] += 1
+            else:
+                (neg_flag if flags[i] else neg_noflag)[bucket] += 1
+
+        m = len(edges)
+        # suffix[j]: rows, tp gained and fp gained by blocking buckets >= j.
+        suffix = [(0, 0, 0)] * (m + 1)
+        for j in range(m - 1, -1, -1):
+            n_j, tp_j, fp_j = suffix[j + 1]
+            suffix[j] = (n_j + count[j], tp_j + pos_noflag[j], fp_j + neg_noflag[j])
+        best = (0, 0, 0, m)  # (allow cut, block cut) with no exits is always feasible
+        best_key = (0, tp, -fp)
+        allowed = lost_tp = lost_fp = 0
+        for i in range(m):
+            if i > 0:
+                allowed += count[i - 1]
+                lost_tp += pos_flag[i - 1]
+                lost_fp += neg_flag[i - 1]
+            for j in range(i, m + 1):
+                blocked, gained_tp, gained_fp = suffix[j]
+                cand_tp = tp - lost_tp + gained_tp
+                cand_fp = fp - lost_fp + gained_fp
+                if cand_tp < min_tp or cand_fp > max_fp:
+                    continue
+                key = (allowed + blocked, cand_tp, -cand_fp)
+                if key > best_key:
+                    best_key = key
+                    best = (allowed, blocked, i, j)
+        n_allow, n_block, i, j = best
+        band = StageBand(
+            name=name,
+            allow_below=edges[i] if 0 < i < m else None,
+            block_at=edges[j] if j < m else None,
+        )
+        bands.append(band)
+
+        still_pending = []
+        for idx in pending:
+            route = band.route(scores[idx])
+            if route is None:
+                still_pending.append(idx)
+                continue
+            decision = route == "block"
+            if decision != flags[idx]:
+                delta = 1 if decision else -1
+                if labels[idx] == 1:
+                    tp += delta
+                else:
+                    fp += delta
+        pending = still_pending
+        stages_report[name] = {"allow": n_allow, "block": n_block}
+
+    total = len(labels)
+    report = {
+        "rows": total,
+        "threshold": threshold,
+        "target_fpr": target_fpr,
+        "max_tpr_drop": max_tpr_drop,
+        "lora": lora_rates,
+        "cascade": _rates(tp, fp, pos, neg),
+        "stages": stages_report,
+        "lora_rows": len(pending),
+        "lora_avoided_fraction": (total - len(pending)) / total if total else 0.0,
+    }
+    return bands, report
+
+
+class CascadeDetector:
+    """Rules (and optionally the linear model) first, LoRA only for uncertain texts.
+
+    Bands come from ``<run_dir>/cascade.json`` (``scripts/calibrate_cascade.py``),
+    which also names the linear run when that stage is used.
+    Early exits score ``1.0`` (block) or ``0.0`` (allow), so labels stay
+    ``score >= threshold``; the deciding stage is reported in the rationale.
+    """
+
+    def __init__(self, run_dir: str | Path) -> None:
+        self.lora = LoraDetector(run_dir)
+        self.run_dir = self.lora.run_dir
+        self.threshold = self.lora.threshold
+        self.model_name = self.lora.model_name
+        self.padding_stats = self.lora.padding_stats
+        self.config_path = self.run_dir / CASCADE_CONFIG_FILE
+        if not self.config_path.is_file():
+            raise FileNotFoundError(
+                f"Missing {CASCADE_CONFIG_FILE} in {self.run_dir}. "
+                f"Run: python scripts/calibrate_cascade.py --run_dir {self.run_dir}"
+            )
+        self.config = json.loads(self.config_path.read_text(encoding="utf-8"))
+        if self.config.get("source_fingerprint") != self.lora.fingerprint():
+            raise ValueError(
+                f"{CASCADE_CONFIG_FILE} was calibrated for a different run; "
+                "rerun scripts/calibrate_cascade.py"
+            )
+        self.bands = [StageBand(**band) for band in self.config["stages"]]
+        unknown = [band.name for band in self.bands if band.name not in CASCADE_STAGES]
+        if unknown:
+            raise ValueError(f"Unknown cascade stage(s): {', '.join(unknown)}")
+        self.rules = RulesDetector()
+        self.linear = None
+        if any(band.name == "linear" for band in self.bands):
+            from .linear_detector import LinearDetector
+
+            self.linear = LinearDetector(self.config["linear_run_dir"])
+            if self.config.get("linear_fingerprint") != self.linear.fingerprint():
+                raise ValueError(
+                    f"{CASCADE_CONFIG_FILE} was calibrated for a different linear model; "
+                    "rerun scripts/calibrate_cascade.py"
+                )
+        self.normalize_infer = self.config.get("normalize_infer")
+        self.drop_mn = bool(self.config.get("drop_mn", False))
+        self._routed = {"lora": 0}
+        for band in self.bands:
+            self._routed[f"{band.name}_allow"] = 0
+            self._routed[f"{band.name}_block"] = 0
+
+    def check_normalization(self, normalize_infer: bool, drop_mn: bool) -> None:
+        """Reject requests normalized differently from the texts the bands were calibrated on."""
+        if self.normalize_infer is None:
+            return  # calibrated before the setting was recorded
+        expected = bool(self.normalize_infer)
+        if bool(normalize_infer) != expected or (expected and bool(drop_mn) != self.drop_mn):
+            calibrated = f"normalize_infer={expected}"
+            if expected:
+                calibrated += f", drop_mn={self.drop_mn}"
+            raise ValueError(
+                f"{CASCADE_CONFIG_FILE} was calibrated with {calibrated}; send matching "
+                "normalization options or rerun scripts/calibrate_cascade.py"
+            )
+
+    def fingerprint(self) -> str:
+        digest = hashlib.sha256(self.lora.fingerprint().encode("utf-8"))
+        digest.update(self.config_path.read_bytes())
+        return digest.hexdigest()
+
+    def warmup(self) -> None:
+        self.lora.predict_proba_batch(["warmup"], batch_size=1)
+
+    def _stage_explain(self, name: str, texts: list[str]) -> list[tuple[float, dict[str, Any]]]:
+        if name == "rules":
+            return self.rules.explain_batch(texts)
+        if name == "linear" and self.linear is not None:
+            return [(score, {}) for score in self.linear.predict_proba_batch(texts)]
+        raise ValueError(f"Unknown cascade stage: {name}")
+
+    def explain_batch(
+        self, texts: Sequence[str], batch_size: int = 16, max_tokens: int | None = None
+    ) -> list[tuple[float, dict[str, Any]]]:
+        """Score texts in order; the rationale names the stage that decided each one."""
+        rationales: list[dict[str, Any]] = [{"stage_scores": {}} for _ in texts]
+        scores: list[float | None] = [None] * len(texts)
+        pending = list(range(len(texts)))
+        for band in self.bands:
+            if not pending:
+                break
+            explained = self._stage_explain(band.name, [texts[i] for i in pending])
+            still_pending = []
+            for idx, (stage_score, detail) in zip(pending, explained):
+                rationale = rationales[idx]
+                rationale["stage_scores"][band.name] = stage_score
+                rationale.update(detail)
+                route = band.route(stage_score)
+                if route is None:
+                    still_pending.append(idx)
+                    continue
+                scores[idx] = 1.0 if route == "block" else 0.0
+                rationale["stage"] = band.name
+                self._routed[f"{band.name}_{route}"] += 1
+            pending = still_pending
+        if pending:
+            lora_scores = self.lora.predict_proba_batch(
+                [texts[i] for i in pending], batch_size=batch_size, max_tokens=max_tokens
+            )
+            for idx, score in zip(pending, lora_scores):
+                scores[idx] = score
+                rationales[idx]["stage"] = "lora"
+                rationales[idx]["stage_scores"]["lora"] = score
+            self._routed["lora"] += len(pending)
+        return list(zip(scores, rationales))  # type: ignore[arg-type]
+
+    def predict_proba_batch(
+        self, texts: Sequence[str], batch_size: int = 16, max_tokens: int | None = None
+    ) -> list[float]:
+        return [score for score, _ in self.explain_batch(texts, batch_size, max_tokens)]
+
+    def predict_proba(self, text: str) -> float:
+        return self.predict_proba_batch([text], batch_size=1)[0]
+
+    def stats(self) -> dict[str, Any]:
+        """Routing counts since construction, next to the fraction expected from val."""
+        rows = sum(self._routed.values())
+        avoided = rows - self._routed["lora"]
+        return {
+            "rows": rows,
+            "routed": dict(self._routed),
+            "lora_avoided": avoided,
+            "lora_avoided_fraction": round(avoided / rows, 4) if rows else 0.0,
+            "val_lora_avoided_fraction": self.config.get("val", {}).get("lora_avoided_fraction"),
+        }
+
+
+def write_cascade_config(
+    run_dir: str | Path,
+    bands: Sequence[StageBand],
+    report: dict[str, Any],
+    *,
+    source_fingerprint: str,
+    extra: Mapping[str, Any] | None = None,
+) -> Path:
+    path = Path(run_dir) / CASCADE_CONFIG_FILE
+    payload = {
+        "stages": [asdict(band) for band in bands],
+        "source_fingerprint": source_fingerprint,
+        **(extra or {}),
+        "val": report,
+    }
+    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    return path
@@ -5,11 +5,26 @@ import json
 import sys
 import time
 from pathlib import Path
-from importlib import metadata
+from itertools import islice
+from typing import TYPE_CHECKING, Iterable, Iterator
 
-from .io import iter_input_records, write_jsonl
+from .io import count_complete_rows, iter_input_records, write_jsonl
 from .normalize import normalize_text
-from .predict import Predictor
+from .predict import DEFAULT_BATCH_SIZE, Predictor, build_payload
+
+if TYPE_CHECKING:
+    from .cache import ResultCache
+    from .windowing import WindowConfig
+
+# Rules-mode commands run once per prompt in shell hooks, so everything beyond
+# the rules/normalize path (cache, process pool, server, model backends,
+# importlib.metadata) is imported inside the command that needs it.
+# tests/test_cli_startup.py guards this.
+
+BUCKET_WINDOW = 1024
+WORKER_CHUNK = 256
+DEFAULT_CACHE_SIZE = 10_000
+DETECTOR_CHOICES = ["rules", "linear", "lora", "onnx", "cascade"]
 
 
 def _parse_threshold(value: str | None) -> float | str | None:
@@ -23,6 +38,99 @@ def _parse_threshold(value: str | None) -> float | str | None:
         raise ValueError("threshold must be a float or 'val'") from exc
 
 
+def _positive_int(value: str) -> int:
+    parsed = int(value)
+    if parsed < 1:
+        raise argparse.ArgumentTypeError("must be >= 1")
+    return parsed
+
+
+def _iter_chunks(records: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    chunk: list[dict] = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _add_cache_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--cache_size",
+        type=int,
+        default=0,
+        help="Keep up to N scores in an in-memory LRU keyed by text hash (default: off)",
+    )
+    parser.add_argument("--cache_ttl", type=float, help="Expire cached scores after N seconds")
+    parser.add_argument("--cache_path", help="sqlite file for a persistent cache tier")
+
+
+def _add_quantize_arg(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--quantize",
+        choices=["int8"],
+        help="Merge the adapter and run dynamically quantized linear layers (lora only)",
+    )
+
+
+def _add_window_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--window",
+        action="store_true",
+        help="Score long inputs as overlapping token windows instead of truncating (lora/onnx)",
+    )
+    parser.add_argument(
+        "--window_size", type=_positive_int, help="Tokens per window (default: model max_length)"
+    )
+    parser.add_argument(
+        "--window_stride", type=_positive_int, help="Tokens between window starts (default: half)"
+    )
+    parser.add_argument(
+        "--window_pooling",
+        choices=["max", "mean", "softmax"],
+        default="max",
+        help="How window scores combine into one score (default: max)",
+    )
+    parser.add_argument(
+        "--window_temperature",
+        type=float,
+        default=1.0,
+        help="Softmax pooling temperature; lower is closer to max",
+    )
+    parser.add_argument(
+        "--no_window_dedupe",
+        action="store_true",
+        help="Score repeated windows again instead of reusing the first score",
+    )
+
+
+def _build_windows(args: argparse.Namespace) -> WindowConfig | None:
+    if not args.window:
+        return None
+    from .windowing import WindowConfig
+
+    return WindowConfig(
+        window=args.window_size,
+        stride=args.window_stride,
+        pooling=args.window_pooling,
+        temperature=args.window_temperature,
+        dedupe=not args.no_window_dedupe,
+    )
+
+
+def _build_cache(args: argparse.Namespace) -> ResultCache | None:
+    if args.cache_size <= 0 and not args.cache_path:
+        return None
+    max_entries = args.cache_size if args.cache_size > 0 else DEFAULT_CACHE_SIZE
+    from .cache import ResultCache
+
+    return ResultCache(
+        max_entries=max_entries, ttl_seconds=args.cache_ttl, disk_path=args.cache_path
+    )
+
+
 def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         prog="jbd",
@@ -34,35 +142,129 @@ def _build_parser() -> argparse.ArgumentParser:
     predict.add_argument("--text", required=True, help="Input text")
     predict.add_argument(
         "--detector",
-        choices=["rules", "lora"],
+        choices=DETECTOR_CHOICES,
         default="rules",
         help="Detector backend (default: rules)",
     )
-    predict.add_argument("--run_dir", help="Run directory for LoRA detector")
-    predict.add_argument("--threshold", help="Float or 'val' (lora only)")
+    predict.add_argument("--run_dir", help="Run directory for linear/LoRA/ONNX/cascade detector")
+    predict.add_argument("--threshold", help="Float or 'val' (model detectors only)")
     predict.add_argument("--normalize", action="store_true", help="Normalize before scoring")
     predict.add_argument("--drop-mn", action="store_true", help="Drop Mn marks")
     predict.add_argument("--id", dest="record_id", help="Optional record id")
+    _add_quantize_arg(predict)
+    _add_window_args(predict)
+    _add_cache_args(predict)
 
     batch = sub.add_parser("batch", help="Score a batch input (jsonl/txt)")
     batch.add_argument("--input", required=True, help="Input .jsonl or .txt")
     batch.add_argument("--output", required=True, help="Output .jsonl")
     batch.add_argument(
         "--detector",
-        choices=["rules", "lora"],
+        choices=DETECTOR_CHOICES,
         default="rules",
         help="Detector backend (default: rules)",
     )
-    batch.add_argument("--run_dir", help="Run directory for LoRA detector")
-    batch.add_argument("--threshold", help="Float or 'val' (lora only)")
+    batch.add_argument("--run_dir", help="Run directory for linear/LoRA/ONNX/cascade detector")
+    batch.add_argument("--threshold", help="Float or 'val' (model detectors only)")
     batch.add_argument("--normalize", action="store_true", help="Normalize before scoring")
     batch.add_argument("--drop-mn", action="store_true", help="Drop Mn marks")
+    batch.add_argument(
+        "--batch_size",
+        type=_positive_int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Texts scored per detector call (default: {DEFAULT_BATCH_SIZE})",
+    )
+    batch.add_argument(
+        "--max_tokens",
+        type=_positive_int,
+        help="Bucket texts by token length under this padded-token budget (model detectors only)",
+    )
+    batch.add_argument(
+        "--resume",
+        action="store_true",
+        help="Append to an existing --output, skipping rows it already contains",
+    )
+    batch.add_argument(
+        "--workers",
+        type=_positive_int,
+        default=1,
+        help="Score chunks in N worker processes, output order preserved (default: 1)",
+    )
+    _add_quantize_arg(batch)
+    _add_window_args(batch)
+    _add_cache_args(batch)
+
+    serve = sub.add_parser("serve", help="Run a local HTTP scoring server")
+    serve.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=8080, help="Bind port (default: 8080)")
+    serve.add_argument(
+        "--detector",
+        choices=DETECTOR_CHOICES,
+        default="rules",
+        help="Detector backend (default: rules)",
+    )
+    serve.add_argument("--run_dir", help="Run directory for linear/LoRA/ONNX/cascade detector")
+    serve.add_argument("--threshold", help="Default float or 'val' (model detectors only)")
+    serve.add_argument("--normalize", action="store_true", help="Normalize before scoring")
+    serve.add_argument("--drop-mn", action="store_true", help="Drop Mn marks")
+    serve.add_argument(
+        "--batch_size",
+        type=_positive_int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Texts per forward pass for /predict_batch (default: {DEFAULT_BATCH_SIZE})",
+    )
+    serve.add_argument(
+        "--coalesce",
+        action="store_true",
+        help="Merge concurrent requests into shared micro-batches",
+    )
+    serve.add_argument(
+        "--coalesce_max_batch",
+        type=_positive_int,
+        default=32,
+        help="Texts per coalesced batch before an immediate flush (default: 32)",
+    )
+    serve.add_argument(
+        "--coalesce_max_wait_ms",
+        type=float,
+        default=5.0,
+        help="Max milliseconds a request waits for a batch to fill (default: 5)",
+    )
+    serve.add_argument("--quiet", action="store_true", help="Disable per-request access logs")
+    _add_quantize_arg(serve)
+    _add_window_args(serve)
+    _add_cache_args(serve)
 
     normalize = sub.add_parser("normalize", help="Normalize text only")
     normalize.add_argument("--text", required=True, help="Input text")
     normalize.add_argument("--drop-mn", action="store_true", help="Drop Mn marks")
 
-    sub.add_parser("doctor", help="Print environment diagnostics")
+    export = sub.add_parser("export", help="Export a LoRA run for faster inference/startup")
+    export.add_argument("--run_dir", required=True, help="Run directory with lora_adapter")
+    export.add_argument(
+        "--format",
+        choices=["onnx", "compiled"],
+        default="onnx",
+        help="onnx: graph for --detector onnx; compiled: merged safetensors for fast lora load",
+    )
+    export.add_argument("--opset", type=_positive_int, default=17, help="ONNX opset (default: 17)")
+    export.add_argument(
+        "--atol",
+        type=float,
+        default=1e-4,
+        help="Max allowed score difference from the adapter on check texts (default: 1e-4)",
+    )
+
+    doctor = sub.add_parser("doctor", help="Print environment diagnostics")
+    doctor.add_argument(
+        "--timing", action="store_true", help="Break down detector startup time by step"
+    )
+    doctor.add_argument(
+        "--detector",
+        choices=DETECTOR_CHOICES,
+        help="Detector to time (default: lora with --run_dir, else rules)",
+    )
+    doctor.add_argument("--run_dir", help="Run directory to time model detector startup for")
 
     return parser
 
@@ -70,7 +272,13 @@ def _build_parser() -> argparse.ArgumentParser:
 def _run_predict(args: argparse.Namespace) -> int:
     try:
         threshold = _parse_threshold(args.threshold)
-        predictor = Predictor(detector=args.detector, run_dir=args.run_dir)
+        predictor = Predictor(
+            detector=args.detector,
+            run_dir=args.run_dir,
+            cache=_build_cache(args),
+            quantize=args.quantize,
+            windows=_build_windows(args),
+        )
         start = time.perf_counter()
         result = predictor.predict(
             args.text,
@@ -81,84 +289,170 @@ def _run_predict(args: argparse.Namespace) -> int:
         latency_ms = (time.perf_counter() - start) * 1000.0
     except Exception as exc:
         print(f"error: {exc}", file=sys.stderr)
-        if args.detector == "lora":
+        if args.detector != "rules":
             print("hint: Use --detector rules for offline mode.", file=sys.stderr)
         return 2
 
-    decision = "block" if bool(result.label) else "allow"
-    model_version = result.metadata.get("model_name") if result.detector == "lora" else "rules_v0"
-    payload = {
-        "text": args.text,
-        "score": result.score,
-        "label": int(result.label),
-        "decision": decision,
-        "threshold": result.threshold,
-        "threshold_used": result.threshold,
-        "flagged": bool(result.label),
-        "detector": result.detector,
-        "model_version": model_version,
-        "latency_ms": round(latency_ms, 3),
-        "rationale": None,
-        "normalize_infer": bool(result.metadata.get("normalize_infer")),
-    }
+    payload = build_payload(args.text, result, latency_ms)
     if args.record_id is not None:
         payload["id"] = args.record_id
     print(json.dumps(payload, ensure_ascii=True))
     return 0
 
 
+def _iter_batch_payloads(
+    predictor: Predictor,
+    records: Iterable[dict],
+    args: argparse.Namespace,
+    threshold: float | str | None,
+    chunk_size: int,
+) -> Iterator[dict]:
+    options = {
+        "batch_size": args.batch_size,
+        "max_tokens": args.max_tokens,
+        "threshold": threshold,
+        "normalize_infer": args.normalize,
+        "drop_mn": args.drop_mn,
+    }
+    from .parallel import iter_scored_chunks
+
+    scored = iter_scored_chunks(
+        _iter_chunks(records, chunk_size),
+        predictor=predictor,
+        options=options,
+        workers=args.workers,
+    )
+    for chunk, results, elapsed_ms in scored:
+        # Latency is amortized over the chunk that was scored together.
+        latency_ms = elapsed_ms / len(chunk)
+        for record, result in zip(chunk, results):
+            payload = build_payload(record["text"], result, latency_ms)
+            if "id" in record:
+                payload["id"] = record["id"]
+            yield payload
+
+
 def _run_batch(args: argparse.Namespace) -> int:
     try:
         threshold = _parse_threshold(args.threshold)
-        predictor = Predictor(detector=args.detector, run_dir=args.run_dir)
-        rows = []
-        for record in iter_input_records(Path(args.input)):
-            text = record["text"]
-            start = time.perf_counter()
-            result = predictor.predict(
-                text,
-                threshold=threshold,
-                normalize_infer=args.normalize,
-                drop_mn=args.drop_mn,
-            )
-            latency_ms = (time.perf_counter() - start) * 1000.0
-            decision = "block" if bool(result.label) else "allow"
-            model_version = (
-                result.metadata.get("model_name") if result.detector == "lora" else "rules_v0"
+        predictor = Predictor(
+            detector=args.detector,
+            run_dir=args.run_dir,
+            cache=_build_cache(args),
+            quantize=args.quantize,
+            windows=_build_windows(args),
+        )
+        output_path = Path(args.output)
+        skip = count_complete_rows(output_path) if args.resume else 0
+        if skip:
+            print(f"resume: skipping {skip} rows already in {output_path}", file=sys.stderr)
+        records = islice(iter_input_records(Path(args.input)), skip, None)
+        # Length bucketing needs a wider window than one batch to find similar lengths.
+        chunk_size = args.batch_size if args.max_tokens is None else BUCKET_WINDOW
+        if args.workers > 1:
+            # Larger chunks amortize inter-process transfer overhead.
+            chunk_size = max(chunk_size, WORKER_CHUNK)
+        payloads = _iter_batch_payloads(predictor, records, args, threshold, chunk_size)
+        write_jsonl(output_path, payloads, append=bool(skip), flush_every=chunk_size)
+        padding_stats = getattr(predictor.detector, "padding_stats", None)
+        if args.max_tokens is not None and padding_stats is not None and args.workers == 1:
+            print(f"padding: {json.dumps(padding_stats.as_dict())}", file=sys.stderr)
+        cache_stats = predictor.cache_stats()
+        if cache_stats is not None and args.workers == 1:
+            print(f"cache: {json.dumps(cache_stats)}", file=sys.stderr)
+        cascade_stats = predictor.cascade_stats()
+        if cascade_stats is not None and args.workers == 1:
+            print(f"cascade: {json.dumps(cascade_stats)}", file=sys.stderr)
+    except Exception as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        if args.detector != "rules":
+            print("hint: Use --detector rules for offline mode.", file=sys.stderr)
+        return 2
+    return 0
+
+
+def _run_serve(args: argparse.Namespace) -> int:
+    from .coalescer import MicroBatcher
+    from .server import ScoringServer, ScoringService, serve
+
+    try:
+        predictor = Predictor(
+            detector=args.detector,
+            run_dir=args.run_dir,
+            cache=_build_cache(args),
+            quantize=args.quantize,
+            windows=_build_windows(args),
+        )
+        coalescer = None
+        if args.coalesce:
+            coalescer = MicroBatcher(
+                predictor,
+                max_batch_size=args.coalesce_max_batch,
+                max_wait_ms=args.coalesce_max_wait_ms,
+                batch_size=args.batch_size,
             )
-            payload = {
-                "text": text,
-                "score": result.score,
-                "label": int(result.label),
-                "decision": decision,
-                "threshold": result.threshold,
-                "threshold_used": result.threshold,
-                "flagged": bool(result.label),
-                "detector": result.detector,
-                "model_version": model_version,
-                "latency_ms": round(latency_ms, 3),
-                "rationale": None,
-                "normalize_infer": bool(result.metadata.get("normalize_infer")),
-            }
-            if "id" in record:
-                payload["id"] = record["id"]
-            rows.append(payload)
-        write_jsonl(Path(args.output), rows)
+        service = ScoringService(
+            predictor,
+            threshold=_parse_threshold(args.threshold),
+            normalize_infer=args.normalize,
+            drop_mn=args.drop_mn,
+            batch_size=args.batch_size,
+            coalescer=coalescer,
+        )
+        server = ScoringServer((args.host, args.port), service, quiet=args.quiet)
+        serve(server)
     except Exception as exc:
         print(f"error: {exc}", file=sys.stderr)
-        if args.detector == "lora":
+        if args.detector != "rules":
             print("hint: Use --detector rules for offline mode.", file=sys.stderr)
         return 2
     return 0
 
 
+def _run_export(args: argparse.Namespace) -> int:
+    from .export import export_compiled, export_onnx
+
+    try:
+        if args.format == "compiled":
+            report = export_compiled(args.run_dir, atol=args.atol)
+        else:
+            report = export_onnx(args.run_dir, opset=args.opset, atol=args.atol)
+    except Exception as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    print(json.dumps(report, indent=2))
+    return 0
+
+
 def _run_normalize(args: argparse.Namespace) -> int:
     output = normalize_text(args.text, drop_mn=args.drop_mn)
     print(output)
     return 0
 
 
-def _run_doctor() -> int:
+def _startup_timing(detector: str, run_dir: str | None) -> tuple[dict[str, float], str | None]:
+    """Time predictor construction, artifact loading (per step) and the first prediction."""
+    timings: dict[str, float] = {}
+    start = time.perf_counter()
+    predictor = Predictor(detector=detector, run_dir=run_dir)
+    timings["construct"] = (time.perf_counter() - start) * 1000.0
+    start = time.perf_counter()
+    predictor.warmup()
+    warmup_ms = (time.perf_counter() - start) * 1000.0
+    steps = getattr(predictor.detector, "load_timings", {})
+    timings.update(steps)
+    timings["first_forward"] = warmup_ms - sum(steps.values())
+    start = time.perf_counter()
+    predictor.predict("timing probe")
+    timings["steady_predict"] = (time.perf_counter() - start) * 1000.0
+    timings["total"] = timings["construct"] + warmup_ms
+    load_source = getattr(predictor.detector, "load_source", None)
+    return {step: round(ms, 1) for step, ms in timings.items()}, load_source
+
+
+def _run_doctor(args: argparse.Namespace) -> int:
+    from importlib import metadata
+
     python_version = sys.version.split()[0]
     platform_info = sys.platform
     try:
@@ -179,6 +473,31 @@ def _run_doctor() -> int:
         print(f"LoRA deps ({name}): {status}")
     if not deps_ok:
         print("Hint: install LoRA dependencies with: pip install .[lora]")
+    for name in ("onnx", "onnxruntime"):
+        try:
+            __import__(name)
+            status = "installed"
+        except ImportError:
+            status = "not installed"
+        print(f"ONNX deps ({name}): {status}")
+    try:
+        __import__("numpy")
+        status = "installed"
+    except ImportError:
+        status = "not installed"
+    print(f"Linear deps (numpy): {status}")
+    if args.timing:
+        detector = args.detector or ("lora" if args.run_dir else "rules")
+        try:
+            timings, load_source = _startup_timing(detector, args.run_dir)
+        except Exception as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 2
+        if load_source:
+            print(f"Loaded from: {load_source}")
+        print(f"Startup timing ({detector}, ms):")
+        for step, ms in timings.items():
+            print(f"  {step}: {ms}")
     return 0
 
 
@@ -189,10 +508,14 @@ def main() -> int:
         return _run_predict(args)
     if args.command == "batch":
         return _run_batch(args)
+    if args.command == "serve":
+        return _run_serve(args)
+    if args.command == "export":
+        return _run_export(args)
     if args.command == "normalize":
         return _run_normalize(args)
     if args.command == "doctor":
-        return _run_doctor()
+        return _run_doctor(args)
     parser.print_help()
     return 1
 
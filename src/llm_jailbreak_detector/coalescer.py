@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+from .predict import DEFAULT_BATCH_SIZE, PredictionResult, Predictor
+
+
+class Histogram:
+    """Counts observations in power-of-two buckets (``le_1``, ``le_2``, ``le_4`` ...)."""
+
+    def __init__(self) -> None:
+        self.buckets: dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def observe(self, value: int) -> None:
+        bound = 1
+        while bound < value:
+            bound *= 2
+        self.buckets[bound] = self.buckets.get(bound, 0) + 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else 0.0,
+            "max": self.max,
+            "buckets": {f"le_{bound}": self.buckets[bound] for bound in sorted(self.buckets)},
+        }
+
+
+@dataclass
+class _Pending:
+    texts: list[str]
+    options: dict[str, Any]
+    future: asyncio.Future
+
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """Merge concurrent scoring requests into shared ``predict_batch`` calls.
+
+    Callers on any thread use ``predict_batch``; requests wait on an asyncio
+    queue that runs in a background thread. A batch is flushed once it holds
+    ``max_batch_size`` texts or ``max_wait_ms`` after its first request,
+    whichever comes first. Requests with different threshold/normalization
+    options share the flush but are scored as separate groups. Scoring runs on
+    one dedicated thread, so the predictor never sees concurrent calls.
+    """
+
+    def __init__(
+        self,
+        predictor: Predictor,
+        *,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        result_timeout_s: float | None = 300.0,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be >= 0")
+        if result_timeout_s is not None and result_timeout_s <= 0:
+            raise ValueError("result_timeout_s must be > 0")
+        self.predictor = predictor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.batch_size = batch_size
+        self.result_timeout = result_timeout_s
+        self.queue_depth = Histogram()
+        self.batch_sizes = Histogram()
+        self.flushes = 0
+        self._loop = asyncio.new_event_loop()
+        self._queue: asyncio.Queue | None = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jbd-score")
+        self._thread = threading.Thread(target=self._run, name="jbd-coalescer", daemon=True)
+        self._started = threading.Event()
+
+    def start(self) -> None:
+        self._thread.start()
+        self._started.wait()
+
+    def close(self) -> None:
+        """Flush everything already queued, then stop the loop and scorer."""
+        if self._thread.is_alive():
+            asyncio.run_coroutine_threadsafe(self._put(_STOP), self._loop).result()
+            self._thread.join()
+        self._executor.shutdown(wait=True)
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue()
+        self._started.set()
+        self._loop.run_until_complete(self._batch_loop())
+        self._loop.close()
+
+    async def _put(self, item: Any) -> None:
+        assert self._queue is not None
+        await self._queue.put(item)
+
+    async def _submit(self, texts: list[str], options: dict[str, Any]) -> list[PredictionResult]:
+        assert self._queue is not None
+        future = self._loop.create_future()
+        self._queue.put_nowait(_Pending(texts, options, future))
+        self.queue_depth.observe(self._queue.qsize())
+        return await future
+
+    def predict_batch(self, texts: list[str], **options: Any) -> list[PredictionResult]:
+        """Thread-safe entry point; blocks until this request's results are ready.
+
+        Raises ``TimeoutError`` if they are not ready within ``result_timeout_s``.
+        """
+        if not texts:
+            return []
+        future = asyncio.run_coroutine_threadsafe(self._submit(texts, options), self._loop)
+        try:
+            return future.result(timeout=self.result_timeout)
+        except concurrent.futures.TimeoutError:
+            # Not the builtin TimeoutError before Python 3.11.
+            future.cancel()
+            raise TimeoutError(f"scoring did not finish within {self.result_timeout}s") from None
+
+    async def _batch_loop(self) -> None:
+        assert self._queue is not None
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is _STOP:
+                break
+            pending = [first]
+            count = len(first.texts)
+            deadline = self._loop.time() + self.max_wait
+            while count < self.max_batch_size:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                pending.append(item)
+                count += len(item.texts)
+            self.flushes += 1
+            self.batch_sizes.observe(count)
+            try:
+                outcomes = await self._loop.run_in_executor(self._executor, self._score, pending)
+            except Exception as exc:
+                # Fail only this batch's callers; the loop keeps serving later requests.
+                outcomes = [([], exc)] * len(pending)
+            for item, (results, error) in zip(pending, outcomes):
+                if item.future.done():
+                    continue
+                if error is not None:
+                    item.future.set_exception(error)
+                else:
+                    item.future.set_result(results)
+
+    def _score(self, pending: list[_Pending]) -> list[tuple[list[PredictionResult], Exception | None]]:
+        groups: dict[tuple, list[int]] = {}
+        outcomes: list[tuple[list[PredictionResult], Exception | None]] = [([], None)] * len(pending)
+        for idx, item in enumerate(pending):
+            try:
+                groups.setdefault(tuple(sorted(item.options.items())), []).append(idx)
+            except TypeError as exc:
+                outcomes[idx] = ([], ValueError(f"scoring options must be hashable: {exc}"))
+        for indices in groups.values():
+            texts = [text for idx in indices for text in pending[idx].texts]
+            try:
+                results = self.predictor.predict_batch(
+                    texts, batch_size=self.batch_size, **pending[indices[0]].options
+                )
+            except Exception as exc:
+                for idx in indices:
+                    outcomes[idx] = ([], exc)
+                continue
+            offset = 0
+            for idx in indices:
+                size = len(pending[idx].texts)
+                outcomes[idx] = (results[offset : offset + size], None)
+                offset += size
+        return outcomes
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "flushes": self.flushes,
+            "queue_depth": self.queue_depth.as_dict(),
+            "batch_size": self.batch_sizes.as_dict(),
+        }
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+from itertools import chain
 from pathlib import Path
 from typing import Iterable, Iterator
 
@@ -36,10 +37,55 @@ def iter_input_records(path: str | Path) -> Iterator[dict]:
         yield from iter_text_lines(path)
 
 
-def write_jsonl(path: str | Path, rows: Iterable[dict]) -> None:
+def count_complete_rows(path: str | Path) -> int:
+    """Count newline-terminated rows and drop a torn trailing line, if any.
+
+    Used to resume a partially written output: the returned count is the number
+    of input records that are already scored.
+    """
+    path = Path(path)
+    if not path.exists():
+        return 0
+    rows = 0
+    last_newline = -1
+    offset = 0
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            rows += block.count(b"\n")
+            idx = block.rfind(b"\n")
+            if idx != -1:
+                last_newline = offset + idx
+            offset += len(block)
+    if last_newline + 1 < offset:
+        with path.open("r+b") as handle:
+            handle.truncate(last_newline + 1)
+    return rows
+
+
+def write_jsonl(
+    path: str | Path,
+    rows: Iterable[dict],
+    *,
+    append: bool = False,
+    flush_every: int | None = None,
+) -> int:
+    """Write rows as they are produced and return how many were written.
+
+    The file is only opened once the first row is available, so an input that
+    fails before producing anything leaves no output behind.
+    """
     path = Path(path)
+    rows = iter(rows)
+    first = next(rows, None)
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as handle:
-        for row in rows:
+    written = 0
+    with path.open("a" if append else "w", encoding="utf-8") as handle:
+        if first is None:
+            return written
+        for row in chain([first], rows):
             payload = json.dumps(row, ensure_ascii=True)
             handle.write(payload + "\n")
+            written += 1
+            if flush_every and written % flush_every == 0:
+                handle.flush()
+    return written
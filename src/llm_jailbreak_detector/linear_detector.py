@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import string
+from pathlib import Path
+from typing import Any, Sequence
+
+import numpy as np
+
+from preprocess.unicode import normalize_text
+
+LINEAR_MODEL_FILE = "linear_model.npz"
+HASH_VERSION = 1
+DEFAULT_BITS = 18
+DEFAULT_CHAR_NGRAMS = (3, 5)
+DEFAULT_WORD_NGRAMS = (1, 2)
+# Texts featurized per NumPy pass; bounds the per-gram temporaries.
+FEATURIZE_CHUNK = 4096
+
+# Latin lookalikes left after NFKC + preprocess.unicode confusables + lower():
+# the Greek/Cyrillic capitals adv2 swaps in, lowercased.
+_LOOKALIKES = {
+    "\u03b1": "a",
+    "\u03b2": "b",
+    "\u03b5": "e",
+    "\u03b9": "i",
+    "\u03ba": "k",
+    "\u03bc": "m",
+    "\u03bd": "n",
+    "\u03bf": "o",
+    "\u03c1": "p",
+    "\u03c4": "t",
+    "\u03c5": "y",
+    "\u03c7": "x",
+    "\u0432": "b",
+    "\u043a": "k",
+    "\u043c": "m",
+    "\u043d": "h",
+    "\u0442": "t",
+    "\u0455": "s",
+    "\u0458": "j",
+}
+# Punctuation is dropped so adv2's inserted ``.,!?;:-_/`` noise cannot split n-grams.
+_FOLD_TABLE = {
+    **{ord(ch): repl for ch, repl in _LOOKALIKES.items()},
+    **{ord(ch): None for ch in string.punctuation},
+}
+
+_SEPARATOR = 10  # "\n"; whitespace is collapsed, so it never occurs inside a text
+_SPACE = 32
+# Polynomial rolling hash mod 2**64 (NumPy uint64 arithmetic wraps).
+_BASE = 0x100000001B3
+_BASE_INV = pow(_BASE, -1, 1 << 64)
+_MIX = 0x9E3779B97F4A7C15
+_PAIR = 0xC2B2AE3D27D4EB4F
+
+
+def _powers(base: int, n: int) -> np.ndarray:
+    steps = np.full(n, base, dtype=np.uint64)
+    steps[0] = 1
+    return np.cumprod(steps, dtype=np.uint64)
+
+
+class HashedNgramFeaturizer:
+    """Char + word n-grams hashed into ``2**bits`` buckets, vectorized across texts.
+
+    A text's features are n-gram counts scaled by ``1 / sqrt(total n-grams)``.
+    Hashes are a fixed polynomial over code points, so they are stable across
+    processes and Python versions (unlike ``hash``).
+    """
+
+    def __init__(
+        self,
+        bits: int = DEFAULT_BITS,
+        char_ngrams: Sequence[int] = DEFAULT_CHAR_NGRAMS,
+        word_ngrams: Sequence[int] = DEFAULT_WORD_NGRAMS,
+    ) -> None:
+        if not 8 <= bits <= 28:
+            raise ValueError("bits must be between 8 and 28")
+        self.bits = int(bits)
+        self.char_ngrams = (int(char_ngrams[0]), int(char_ngrams[1]))
+        self.word_ngrams = (int(word_ngrams[0]), int(word_ngrams[1]))
+        if not 1 <= self.char_ngrams[0] <= self.char_ngrams[1]:
+            raise ValueError("char_ngrams must be an increasing (min, max) pair >= 1")
+        if self.word_ngrams not in {(1, 1), (1, 2), (2, 2)}:
+            raise ValueError("word_ngrams must be (1, 1), (1, 2) or (2, 2)")
+
+    @property
+    def n_features(self) -> int:
+        return 1 << self.bits
+
+    def to_config(self) -> dict[str, Any]:
+        return {
+            "hash_version": HASH_VERSION,
+            "bits": self.bits,
+            "char_ngrams": list(self.char_ngrams),
+            "word_ngrams": list(self.word_ngrams),
+        }
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "HashedNgramFeaturizer":
+        if int(config.get("hash_version", HASH_VERSION)) != HASH_VERSION:
+            raise ValueError(f"Unsupported hash_version: {config.get('hash_version')}")
+        return cls(config["bits"], config["char_ngrams"], config["word_ngrams"])
+
+    @staticmethod
+    def prepare(text: str) -> str:
+        """Lowercase, normalize (NFKC, zero-width, confusables), fold lookalikes, drop punctuation."""
+        text = normalize_text(text.lower(), collapse_ws=False)
+        return " ".join(text.translate(_FOLD_TABLE).split())
+
+    def _bucket(self, hashes: np.ndarray, salt: int) -> np.ndarray:
+        mixed = (hashes ^ np.uint64(salt)) * np.uint64(_MIX)
+        return (mixed >> np.uint64(64 - self.bits)).astype(np.int64)
+
+    def features(self, texts: Sequence[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return ``(rows, buckets, row_weight)``: one entry per n-gram occurrence.
+
+        ``row_weight[i]`` is the value each of row ``i``'s n-grams contributes,
+        so a row's feature vector is the bucket histogram times that weight.
+        """
+        joined = "\n".join(f" {self.prepare(text)} " for text in texts)
+        codes = np.frombuffer(joined.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        size = codes.shape[0]
+        prefix = np.zeros(size + 1, dtype=np.uint64)
+        np.cumsum(codes * _powers(_BASE, size), out=prefix[1:])
+        inv_powers = _powers(_BASE_INV, size)
+        is_sep = codes == _SEPARATOR
+        row_of = np.cumsum(is_sep)
+        seps = np.concatenate(([0], row_of))
+
+        rows: list[np.ndarray] = []
+        buckets: list[np.ndarray] = []
+        lo, hi = self.char_ngrams
+        for n in range(lo, hi + 1):
+            if size < n:
+                break
+            start = np.arange(size - n + 1)
+            keep = seps[start + n] == seps[start]
+            start = start[keep]
+            hashes = (prefix[start + n] - prefix[start]) * inv_powers[start]
+            rows.append(row_of[start])
+            buckets.append(self._bucket(hashes, n))
+
+        is_word = ~is_sep & (codes != _SPACE)
+        edges = np.diff(np.concatenate(([False], is_word, [False])).astype(np.int8))
+        word_start = np.flatnonzero(edges == 1)
+        word_end = np.flatnonzero(edges == -1)
+        word_hash = (prefix[word_end] - prefix[word_start]) * inv_powers[word_start]
+        word_row = row_of[word_start]
+        if self.word_ngrams[0] == 1:
+            rows.append(word_row)
+            buckets.append(self._bucket(word_hash, 101))
+        if self.word_ngrams[1] == 2 and word_hash.shape[0] > 1:
+            same_row = word_row[1:] == word_row[:-1]
+            pair_hash = word_hash[:-1][same_row] * np.uint64(_PAIR) + word_hash[1:][same_row]
+            rows.append(word_row[1:][same_row])
+            buckets.append(self._bucket(pair_hash, 102))
+
+        all_rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+        all_buckets = np.concatenate(buckets) if buckets else np.zeros(0, dtype=np.int64)
+        totals = np.bincount(all_rows, minlength=len(texts)).astype(np.float64)
+        row_weight = np.divide(1.0, np.sqrt(totals), out=np.zeros_like(totals), where=totals > 0)
+        return all_rows, all_buckets, row_weight
+
+    def decision_function(
+        self, texts: Sequence[str], coef: np.ndarray, intercept: float
+    ) -> np.ndarray:
+        scores = np.empty(len(texts), dtype=np.float64)
+        for start in range(0, len(texts), FEATURIZE_CHUNK):
+            chunk = texts[start : start + FEATURIZE_CHUNK]
+            rows, buckets, row_weight = self.features(chunk)
+            dots = np.bincount(rows, weights=coef[buckets], minlength=len(chunk))
+            scores[start : start + len(chunk)] = dots * row_weight + intercept
+        return scores
+
+    def matrix(self, texts: Sequence[str]) -> Any:
+        """Sparse CSR design matrix (scipy) with the same values inference uses."""
+        from scipy import sparse
+
+        blocks = []
+        for start in range(0, len(texts), FEATURIZE_CHUNK):
+            chunk = texts[start : start + FEATURIZE_CHUNK]
+            rows, buckets, row_weight = self.features(chunk)
+            blocks.append(
+                sparse.csr_matrix(
+                    (row_weight[rows], (rows, buckets)), shape=(len(chunk), self.n_features)
+                )
+            )
+        if not blocks:
+            return sparse.csr_matrix((0, self.n_features))
+        return sparse.vstack(blocks, format="csr")
+
+
+def fit_linear(
+    texts: Sequence[str],
+    labels: Sequence[int],
+    featurizer: HashedNgramFeaturizer,
+    *,
+    C: float = 4.0,
+    class_weight: str | None = None,
+    max_iter: int = 1000,
+) -> tuple[np.ndarray, float]:
+    """Fit logistic regression on hashed features; returns ``(coef, intercept)``."""
+    try:
+        from sklearn.linear_model import LogisticRegression
+    except ImportError as exc:
+        raise RuntimeError("Training needs scikit-learn. Run pip install .[eval].") from exc
+
+    model = LogisticRegression(
+        C=C, class_weight=class_weight, solver="liblinear", max_iter=max_iter
+    )
+    model.fit(featurizer.matrix(texts), np.asarray(labels, dtype=np.int64))
+    return model.coef_[0].astype(np.float32), float(model.intercept_[0])
+
+
+def save_linear_run(
+    run_dir: str | Path,
+    featurizer: HashedNgramFeaturizer,
+    coef: np.ndarray,
+    intercept: float,
+    config: dict[str, Any] | None = None,
+) -> Path:
+    """Write ``config.json`` (featurizer + caller fields) and ``linear_model.npz``."""
+    run_dir = Path(run_dir)
+    run_dir.mkdir(parents=True, exist_ok=True)
+    np.savez(
+        run_dir / LINEAR_MODEL_FILE,
+        coef=np.asarray(coef, dtype=np.float32),
+        intercept=np.float64(intercept),
+    )
+    payload = {"detector": "linear", "model_name": "hashed-ngram-lr", **(config or {})}
+    payload["featurizer"] = featurizer.to_config()
+    (run_dir / "config.json").write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    return run_dir
+
+
+class LinearDetector:
+    """Hashed n-gram logistic regression scored with NumPy only."""
+
+    def __init__(self, run_dir: str | Path) -> None:
+        if not run_dir:
+            raise ValueError("run_dir is required for linear detector")
+        self.run_dir = Path(run_dir)
+        config_path = self.run_dir / "config.json"
+        model_path = self.run_dir / LINEAR_MODEL_FILE
+        if not config_path.is_file() or not model_path.is_file():
+            raise FileNotFoundError(
+                f"Missing config.json or {LINEAR_MODEL_FILE} in {self.run_dir}. "
+                "Train one with scripts/train_linear.py."
+            )
+        self.config = json.loads(config_path.read_text(encoding="utf-8"))
+        self.featurizer = HashedNgramFeaturizer.from_config(self.config["featurizer"])
+        self.threshold = float(self.config.get("val_threshold", self.config.get("threshold", 0.5)))
+        self.model_name = self.config.get("model_name", "hashed-ngram-lr")
+        with np.load(model_path) as model:
+            self.coef = np.asarray(model["coef"], dtype=np.float64)
+            self.intercept = float(model["intercept"])
+        if self.coef.shape != (self.featurizer.n_features,):
+            raise ValueError(
+                f"{LINEAR_MODEL_FILE} has {self.coef.shape[0]} weights; "
+                f"featurizer expects {self.featurizer.n_features}"
+            )
+
+    def fingerprint(self) -> str:
+        digest = hashlib.sha256((self.run_dir / "config.json").read_bytes())
+        digest.update((self.run_dir / LINEAR_MODEL_FILE).read_bytes())
+        return digest.hexdigest()
+
+    def predict_proba_batch(
+        self,
+        texts: Sequence[str],
+        batch_size: int = 16,
+        max_tokens: int | None = None,
+    ) -> list[float]:
+        """Score texts in order; batching knobs are accepted for API parity with LoRA."""
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        if not texts:
+            return []
+        logits = self.featurizer.decision_function(list(texts), self.coef, self.intercept)
+        return (1.0 / (1.0 + np.exp(-np.clip(logits, -500.0, 500.0)))).tolist()
+
+    def predict_proba(self, text: str) -> float:
+        return self.predict_proba_batch([text], batch_size=1)[0]
+
+    def predict(self, text: str, threshold: float | None = None) -> int:
+        if threshold is None:
+            threshold = self.threshold
+        return int(self.predict_proba(text) >= threshold)
@@ -1,16 +1,40 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator, Sequence
+
+from data.batching import PaddingStats, plan_token_batches, restore_order
+
+from .windowing import WindowConfig, plan_windows, pool_scores
+
+QUANTIZE_MODES = ("int8",)
+QUANTIZED_DIRNAME = "quantized_int8"
+COMPILED_DIRNAME = "compiled"
 
 
 class LoraDetector:
     """LoRA-backed detector that loads local artifacts only."""
 
-    def __init__(self, run_dir: str | Path, device: str = "cpu") -> None:
+    # Tensor type requested from the tokenizer; runtimes other than torch override it.
+    return_tensors = "pt"
+
+    def __init__(
+        self,
+        run_dir: str | Path,
+        device: str = "cpu",
+        quantize: str | None = None,
+        windows: WindowConfig | None = None,
+    ) -> None:
         if not run_dir:
             raise ValueError("run_dir is required for lora detector")
+        if quantize is not None and quantize not in QUANTIZE_MODES:
+            raise ValueError(f"quantize must be one of {', '.join(QUANTIZE_MODES)}")
+        if quantize is not None and device != "cpu":
+            raise ValueError("dynamic int8 quantization is only supported on cpu")
         self.run_dir = Path(run_dir)
         if not self.run_dir.exists():
             raise FileNotFoundError(f"run_dir not found: {self.run_dir}")
@@ -25,8 +49,23 @@ class LoraDetector:
         if not self.model_name:
             raise ValueError("config.json must include model_name or backbone")
         self.device = device
+        self.quantize = quantize
+        # Score long inputs as overlapping windows instead of truncating at max_length.
+        self.windows = windows
         self._model = None
         self._tokenizer = None
+        self.padding_stats = PaddingStats()
+        # Which artifact _load_model used and how long each startup step took (ms).
+        self.load_source: str | None = None
+        self.load_timings: dict[str, float] = {}
+
+    @contextmanager
+    def _timed(self, step: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.load_timings[step] = round((time.perf_counter() - start) * 1000.0, 1)
 
     @staticmethod
     def _load_config(path: Path) -> dict[str, Any]:
@@ -41,13 +80,65 @@ class LoraDetector:
             return float(config["threshold"])
         return 0.5
 
+    def fingerprint(self) -> str:
+        """Identify the run, quantization mode and windowing settings."""
+        return self._with_options(self._source_fingerprint())
+
+    def _with_options(self, base: str) -> str:
+        parts = [base]
+        if self.quantize is not None:
+            parts.append(f"quantize={self.quantize}")
+        if self.windows is not None:
+            parts.append(self.windows.describe())
+        if len(parts) == 1:
+            return base
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+    def _source_fingerprint(self) -> str:
+        """config.json content plus adapter file sizes/mtimes."""
+        digest = hashlib.sha256()
+        digest.update((self.run_dir / "config.json").read_bytes())
+        adapter_dir = self.run_dir / "lora_adapter"
+        if adapter_dir.exists():
+            for path in sorted(p for p in adapter_dir.rglob("*") if p.is_file()):
+                stat = path.stat()
+                digest.update(
+                    f"{path.relative_to(adapter_dir).as_posix()}|{stat.st_size}|{stat.st_mtime_ns}".encode(
+                        "utf-8"
+                    )
+                )
+        return digest.hexdigest()
+
     def _load_model(self) -> None:
         if self._model is not None:
             return
         try:
-            from transformers import AutoModelForSequenceClassification, AutoTokenizer
-            from peft import PeftModel
+            with self._timed("import_transformers"):
+                from transformers import AutoModelForSequenceClassification, AutoTokenizer
+        except ImportError as exc:
+            raise RuntimeError(
+                "LoRA dependencies not installed. Run pip install .[lora]."
+            ) from exc
 
+        if self.quantize is not None and self._load_saved_quantized():
+            self.load_source = QUANTIZED_DIRNAME
+            return
+        if self._load_compiled():
+            self.load_source = COMPILED_DIRNAME
+        else:
+            self._load_adapter(AutoModelForSequenceClassification, AutoTokenizer)
+            self.load_source = "lora_adapter"
+        if self.quantize == "int8":
+            with self._timed("quantize"):
+                self._model = self._quantize_int8(self._model)
+        with self._timed("to_device"):
+            self._model.to(self.device)
+            self._model.eval()
+
+    def _load_adapter(self, model_cls: Any, tokenizer_cls: Any) -> None:
+        try:
+            with self._timed("import_peft"):
+                from peft import PeftModel
         except ImportError as exc:
             raise RuntimeError(
                 "LoRA dependencies not installed. Run pip install .[lora]."
@@ -59,45 +150,268 @@ class LoraDetector:
                 f"Missing lora_adapter in {self.run_dir}. Provide a valid run_dir or use rules."
             )
         try:
-            self._tokenizer = AutoTokenizer.from_pretrained(
-                self.model_name, local_files_only=True
-            )
-            base_model = AutoModelForSequenceClassification.from_pretrained(
-                self.model_name, local_files_only=True
-            )
-            self._model = PeftModel.from_pretrained(
-                base_model, str(adapter_dir), local_files_only=True
-            )
+            with self._timed("load_tokenizer"):
+                self._tokenizer = tokenizer_cls.from_pretrained(
+                    self.model_name, local_files_only=True
+                )
+            with self._timed("load_base_model"):
+                base_model = model_cls.from_pretrained(self.model_name, local_files_only=True)
+            with self._timed("load_adapter"):
+                self._model = PeftModel.from_pretrained(
+                    base_model, str(adapter_dir), local_files_only=True
+                )
         except OSError as exc:
             raise RuntimeError(
                 "Failed to load local model files. Ensure the HF cache is populated or "
                 "provide local weights in the cache."
             ) from exc
-        self._model.to(self.device)
+
+    def _load_compiled(self) -> bool:
+        """Load ``jbd export --format compiled`` output if it was built from this run.
+
+        Merged weights are one safetensors file that transformers memory-maps,
+        and the tokenizer is the saved ``tokenizer.json``, so neither peft nor
+        the HF cache is touched.
+        """
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        compiled_dir = self.run_dir / COMPILED_DIRNAME
+        meta_path = compiled_dir / "meta.json"
+        if not meta_path.is_file():
+            return False
+        if self._load_config(meta_path).get("source_fingerprint") != self._source_fingerprint():
+            return False
+        with self._timed("load_tokenizer"):
+            self._tokenizer = AutoTokenizer.from_pretrained(
+                str(compiled_dir), local_files_only=True
+            )
+        with self._timed("load_model"):
+            self._model = AutoModelForSequenceClassification.from_pretrained(
+                str(compiled_dir), local_files_only=True, low_cpu_mem_usage=True
+            )
+        return True
+
+    @staticmethod
+    def _quantize_int8(model: Any) -> Any:
+        """Merge the adapter, then swap every Linear for a dynamic int8 version."""
+        import torch
+
+        # A compiled run is already merged.
+        merged = model.merge_and_unload() if hasattr(model, "merge_and_unload") else model
+        merged.eval()
+        return torch.ao.quantization.quantize_dynamic(merged, {torch.nn.Linear}, dtype=torch.qint8)
+
+    def _load_saved_quantized(self) -> bool:
+        """Load ``save_quantized`` output if it was built from this run and torch version."""
+        import torch
+        from transformers import AutoTokenizer
+
+        out_dir = self.run_dir / QUANTIZED_DIRNAME
+        meta_path = out_dir / "meta.json"
+        if not meta_path.is_file():
+            return False
+        meta = self._load_config(meta_path)
+        if (
+            meta.get("quantize") != self.quantize
+            or meta.get("source_fingerprint") != self._source_fingerprint()
+            or meta.get("torch_version") != torch.__version__
+        ):
+            return False
+        with self._timed("load_tokenizer"):
+            self._tokenizer = AutoTokenizer.from_pretrained(str(out_dir), local_files_only=True)
+        with self._timed("load_model"):
+            self._model = torch.load(out_dir / "model.pt", map_location="cpu", weights_only=False)
         self._model.eval()
+        return True
+
+    def save_quantized(self) -> Path:
+        """Persist the quantized model and tokenizer under ``run_dir/quantized_int8`` for fast reload."""
+        if self.quantize is None:
+            raise ValueError("save_quantized requires quantize='int8'")
+        import torch
+
+        self._load_model()
+        out_dir = self.run_dir / QUANTIZED_DIRNAME
+        out_dir.mkdir(parents=True, exist_ok=True)
+        meta_path = out_dir / "meta.json"
+        if meta_path.exists():
+            meta_path.unlink()
+        torch.save(self._model, out_dir / "model.pt")
+        self._tokenizer.save_pretrained(str(out_dir))
+        meta = {
+            "quantize": self.quantize,
+            "model_name": self.model_name,
+            "source_fingerprint": self._source_fingerprint(),
+            "torch_version": torch.__version__,
+        }
+        meta_path.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        return out_dir
+
+    def merged_model(self) -> Any:
+        """Fold the adapter into the base weights and return the plain base model.
+
+        The detector's own PeftModel wrapper is consumed, so score any reference
+        texts before calling this.
+        """
+        if self.quantize is not None:
+            raise ValueError("merged_model is not available on a quantized detector")
+        self._load_model()
+        if self.load_source == COMPILED_DIRNAME:
+            return self._model
+        merged = self._model.merge_and_unload()
+        merged.eval()
+        return merged
 
     def predict_proba(self, text: str) -> float:
+        return self.predict_proba_batch([text], batch_size=1)[0]
+
+    def predict_proba_batch(
+        self,
+        texts: Sequence[str],
+        batch_size: int = 16,
+        max_tokens: int | None = None,
+    ) -> list[float]:
+        """Score texts with one padded forward pass per batch.
+
+        Without ``max_tokens`` texts are chunked ``batch_size`` rows at a time in
+        input order. With ``max_tokens`` they are bucketed by tokenized length
+        into batches whose padded size stays under the budget; scores are still
+        returned in input order and padding totals accumulate in ``padding_stats``.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        if self.windows is not None:
+            return [score for score, _ in self.explain_batch(texts, batch_size, max_tokens)]
         self._load_model()
         if self._model is None or self._tokenizer is None:
             raise RuntimeError("Model failed to initialize")
-        import torch
+        if max_tokens is not None:
+            return self._predict_proba_bucketed(texts, batch_size, max_tokens)
 
-        inputs = self._tokenizer(
-            text,
-            truncation=True,
-            max_length=self.max_length,
-            return_tensors="pt",
+        scores: list[float] = []
+        for start in range(0, len(texts), batch_size):
+            chunk = list(texts[start : start + batch_size])
+            inputs = self._tokenizer(
+                chunk,
+                truncation=True,
+                max_length=self.max_length,
+                padding=True,
+                return_tensors=self.return_tensors,
+            )
+            scores.extend(self._forward_scores(inputs))
+        return scores
+
+    def _predict_proba_bucketed(
+        self, texts: Sequence[str], batch_size: int, max_tokens: int
+    ) -> list[float]:
+        if not texts:
+            return []
+        encodings = self._tokenizer(list(texts), truncation=True, max_length=self.max_length)
+        keys = list(encodings.keys())
+        features = [{key: encodings[key][i] for key in keys} for i in range(len(texts))]
+        return self._score_features(features, batch_size, max_tokens)
+
+    def _score_features(
+        self, features: list[dict[str, Any]], batch_size: int, max_tokens: int | None
+    ) -> list[float]:
+        """Pad and score tokenized rows in ``batch_size`` chunks or under a token budget."""
+        if max_tokens is None:
+            batches = [
+                list(range(start, min(start + batch_size, len(features))))
+                for start in range(0, len(features), batch_size)
+            ]
+        else:
+            lengths = [len(row["input_ids"]) for row in features]
+            plan = plan_token_batches(lengths, max_tokens, naive_batch_size=batch_size)
+            self.padding_stats.add(plan.stats)
+            batches = plan.batches
+        scores: list[float] = []
+        for batch in batches:
+            rows = [features[i] for i in batch]
+            inputs = self._tokenizer.pad(rows, return_tensors=self.return_tensors)
+            scores.extend(self._forward_scores(inputs))
+        return restore_order(scores, batches)
+
+    def explain_batch(
+        self, texts: Sequence[str], batch_size: int = 16, max_tokens: int | None = None
+    ) -> list[tuple[float, dict[str, Any] | None]]:
+        """Scores plus, in windowed mode, which window triggered each one.
+
+        Every window of every text is scored in the same padded batches, so
+        cost grows with input length instead of the tail being truncated away.
+        """
+        if self.windows is None:
+            scores = self.predict_proba_batch(texts, batch_size=batch_size, max_tokens=max_tokens)
+            return [(score, None) for score in scores]
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        self._load_model()
+        if self._model is None or self._tokenizer is None:
+            raise RuntimeError("Model failed to initialize")
+        if not texts:
+            return []
+        tokenizer = self._tokenizer
+        window, stride = self.windows.resolve(
+            self.max_length - tokenizer.num_special_tokens_to_add(pair=False)
+        )
+        with_offsets = bool(getattr(tokenizer, "is_fast", False))
+        encodings = tokenizer(
+            list(texts),
+            add_special_tokens=False,
+            truncation=False,
+            return_offsets_mapping=with_offsets,
+            verbose=False,
         )
+
+        features: list[dict[str, Any]] = []
+        seen: dict[tuple[int, ...], int] = {}
+        plans: list[tuple[list[tuple[int, int]], list[int]]] = []
+        for ids in encodings["input_ids"]:
+            spans = plan_windows(len(ids), window, stride)
+            refs = []
+            for start, end in spans:
+                key = tuple(ids[start:end])
+                if self.windows.dedupe and key in seen:
+                    refs.append(seen[key])
+                    continue
+                seen[key] = len(features)
+                refs.append(len(features))
+                features.append(
+                    dict(tokenizer.prepare_for_model(list(key), add_special_tokens=True))
+                )
+            plans.append((spans, refs))
+        window_scores = self._score_features(features, batch_size, max_tokens)
+
+        results: list[tuple[float, dict[str, Any] | None]] = []
+        for idx, (spans, refs) in enumerate(plans):
+            scores = [window_scores[ref] for ref in refs]
+            score, trigger = pool_scores(scores, self.windows.pooling, self.windows.temperature)
+            start, end = spans[trigger]
+            rationale: dict[str, Any] = {
+                "windows": len(spans),
+                "window_scores": [round(s, 6) for s in scores],
+                "trigger_window": trigger,
+                "trigger_tokens": [start, end],
+            }
+            if with_offsets and end > start:
+                offsets = encodings["offset_mapping"][idx]
+                rationale["trigger_span"] = [offsets[start][0], offsets[end - 1][1]]
+            results.append((score, rationale))
+        return results
+
+    def _forward_scores(self, inputs: Any) -> list[float]:
+        import torch
+
         inputs = {k: v.to(self.device) for k, v in inputs.items()}
         with torch.no_grad():
             outputs = self._model(**inputs)
             logits = outputs.logits
             if logits.shape[-1] == 1:
-                score = torch.sigmoid(logits)[0].item()
+                scores = torch.sigmoid(logits)[:, 0]
             else:
                 probs = torch.softmax(logits, dim=-1)
-                score = probs[0, self.attack_class_index].item()
-        return float(score)
+                scores = probs[:, self.attack_class_index]
+        return [float(score) for score in scores.detach().cpu().tolist()]
 
     def predict(self, text: str, threshold: float | None = None) -> int:
         if threshold is None:
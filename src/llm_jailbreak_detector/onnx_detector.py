@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Any
+
+from .lora_detector import LoraDetector
+from .windowing import WindowConfig
+
+ONNX_DIRNAME = "onnx"
+ONNX_MODEL_FILE = "model.onnx"
+EXPORT_META_FILE = "export.json"
+
+
+class OnnxDetector(LoraDetector):
+    """Runs a run's merged LoRA model exported by ``jbd export --format onnx``.
+
+    Threshold, tokenization and batching are inherited from ``LoraDetector``;
+    only the forward pass goes through onnxruntime on the CPU.
+    """
+
+    return_tensors = "np"
+
+    def __init__(
+        self,
+        run_dir: str | Path,
+        intra_op_threads: int | None = None,
+        windows: WindowConfig | None = None,
+    ) -> None:
+        super().__init__(run_dir, device="cpu", windows=windows)
+        self.onnx_dir = self.run_dir / ONNX_DIRNAME
+        self.intra_op_threads = intra_op_threads
+        self._input_names: set[str] = set()
+
+    def fingerprint(self) -> str:
+        """Identify the export (metadata recording the source run, model size/mtime) and windowing."""
+        digest = hashlib.sha256()
+        meta_path = self.onnx_dir / EXPORT_META_FILE
+        if meta_path.is_file():
+            digest.update(meta_path.read_bytes())
+        model_path = self.onnx_dir / ONNX_MODEL_FILE
+        if model_path.is_file():
+            stat = model_path.stat()
+            digest.update(f"{stat.st_size}|{stat.st_mtime_ns}".encode("utf-8"))
+        return self._with_options(digest.hexdigest())
+
+    def _check_export(self, require_meta: bool = True) -> None:
+        """Fail unless the export exists and ``export.json`` records the run as it is now."""
+        rerun = f"Run: jbd export --run_dir {self.run_dir} --format onnx"
+        meta_path = self.onnx_dir / EXPORT_META_FILE
+        meta_missing = require_meta and not meta_path.is_file()
+        if not (self.onnx_dir / ONNX_MODEL_FILE).is_file() or meta_missing:
+            raise FileNotFoundError(f"Missing ONNX export in {self.onnx_dir}. {rerun}")
+        if require_meta and (
+            self._load_config(meta_path).get("source_fingerprint") != self._source_fingerprint()
+        ):
+            raise FileNotFoundError(
+                f"ONNX export in {self.onnx_dir} is stale: the run changed after it was exported. "
+                f"{rerun}"
+            )
+
+    def _load_model(self, require_meta: bool = True) -> None:
+        if self._model is not None:
+            return
+        self._check_export(require_meta)
+        try:
+            with self._timed("import_onnxruntime"):
+                import onnxruntime as ort
+            with self._timed("import_transformers"):
+                from transformers import AutoTokenizer
+        except ImportError as exc:
+            raise RuntimeError(
+                "ONNX dependencies not installed. Run pip install .[lora,onnx]."
+            ) from exc
+
+        model_path = self.onnx_dir / ONNX_MODEL_FILE
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.intra_op_threads:
+            options.intra_op_num_threads = self.intra_op_threads
+        with self._timed("create_session"):
+            session = ort.InferenceSession(
+                str(model_path), options, providers=["CPUExecutionProvider"]
+            )
+        self._input_names = {node.name for node in session.get_inputs()}
+        with self._timed("load_tokenizer"):
+            self._tokenizer = AutoTokenizer.from_pretrained(
+                str(self.onnx_dir), local_files_only=True
+            )
+        self._model = session
+        self.load_source = ONNX_DIRNAME
+
+    def _forward_scores(self, inputs: Any) -> list[float]:
+        import numpy as np
+
+        feeds = {
+            name: np.asarray(value, dtype=np.int64)
+            for name, value in inputs.items()
+            if name in self._input_names
+        }
+        logits = self._model.run(["logits"], feeds)[0].astype(np.float64)
+        if logits.shape[-1] == 1:
+            scores = 1.0 / (1.0 + np.exp(-logits[:, 0]))
+        else:
+            shifted = np.exp(logits - logits.max(axis=-1, keepdims=True))
+            scores = (shifted / shifted.sum(axis=-1, keepdims=True))[:, self.attack_class_index]
+        return [float(score) for score in scores]
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+
+from .predict import PredictionResult, Predictor
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    from .windowing import WindowConfig
+
+# Chunks in flight per worker; bounds memory while keeping every worker busy.
+PENDING_PER_WORKER = 2
+
+_WORKER_PREDICTOR: Predictor | None = None
+
+
+def _init_worker(
+    detector: str,
+    run_dir: str | None,
+    cache_settings: dict[str, Any] | None,
+    quantize: str | None = None,
+    windows: WindowConfig | None = None,
+) -> None:
+    global _WORKER_PREDICTOR
+    cache = None
+    if cache_settings is not None:
+        # Only workers with a cache configured pay for sqlite3 and the cache module.
+        from .cache import ResultCache
+
+        cache = ResultCache(**cache_settings)
+    _WORKER_PREDICTOR = Predictor(
+        detector=detector, run_dir=run_dir, cache=cache, quantize=quantize, windows=windows
+    )
+
+
+def _score_texts(
+    predictor: Predictor, texts: list[str], options: dict[str, Any]
+) -> tuple[list[PredictionResult], float]:
+    start = time.perf_counter()
+    results = predictor.predict_batch(texts, **options)
+    return results, (time.perf_counter() - start) * 1000.0
+
+
+def _score_in_worker(
+    texts: list[str], options: dict[str, Any]
+) -> tuple[list[PredictionResult], float]:
+    if _WORKER_PREDICTOR is None:
+        raise RuntimeError("Worker predictor was not initialized")
+    return _score_texts(_WORKER_PREDICTOR, texts, options)
+
+
+def iter_scored_chunks(
+    chunks: Iterable[list[dict]],
+    *,
+    predictor: Predictor,
+    options: dict[str, Any],
+    workers: int = 1,
+) -> Iterator[tuple[list[dict], list[PredictionResult], float]]:
+    """Yield ``(records, results, elapsed_ms)`` per chunk, in input order.
+
+    With ``workers > 1`` chunks are scored in a process pool where each worker
+    builds its own ``Predictor`` once. At most ``workers * PENDING_PER_WORKER``
+    chunks are in flight, so memory stays bounded for arbitrarily large inputs.
+    """
+    if workers < 1:
+        raise ValueError("workers must be >= 1")
+    if workers == 1:
+        for chunk in chunks:
+            texts = [record["text"] for record in chunk]
+            results, elapsed_ms = _score_texts(predictor, texts, options)
+            yield chunk, results, elapsed_ms
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    run_dir = getattr(predictor.detector, "run_dir", None)
+    pending: deque[tuple[list[dict], Future]] = deque()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(
+            predictor.detector_name,
+            str(run_dir) if run_dir else None,
+            predictor.cache.settings() if predictor.cache is not None else None,
+            getattr(predictor.detector, "quantize", None),
+            getattr(predictor.detector, "windows", None),
+        ),
+    ) as pool:
+        for chunk in chunks:
+            texts = [record["text"] for record in chunk]
+            pending.append((chunk, pool.submit(_score_in_worker, texts, options)))
+            if len(pending) >= workers * PENDING_PER_WORKER:
+                done_chunk, future = pending.popleft()
+                yield (done_chunk, *future.result())
+        while pending:
+            done_chunk, future = pending.popleft()
+            yield (done_chunk, *future.result())
@@ -1,11 +1,19 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any, Sequence
 
 from .normalize import normalize_text
 from .rules_detector import RulesDetector
 
+if TYPE_CHECKING:
+    from .cache import CachedScore, ResultCache
+    from .windowing import WindowConfig
+
+DEFAULT_BATCH_SIZE = 16
+# Detectors backed by a trained run: they carry a val threshold and a model name.
+MODEL_DETECTORS = frozenset({"lora", "onnx", "linear", "cascade"})
+
 
 @dataclass
 class PredictionResult:
@@ -14,67 +22,233 @@ class PredictionResult:
     threshold: float
     detector: str
     metadata: dict[str, Any]
+    rationale: dict[str, Any] | None = None
+
+
+def build_payload(text: str, result: PredictionResult, latency_ms: float) -> dict[str, Any]:
+    """JSON payload shared by ``jbd predict``, ``jbd batch`` and ``jbd serve``."""
+    decision = "block" if bool(result.label) else "allow"
+    if result.detector in MODEL_DETECTORS:
+        model_version = result.metadata.get("model_name")
+    else:
+        model_version = "rules_v0"
+    return {
+        "text": text,
+        "score": result.score,
+        "label": int(result.label),
+        "decision": decision,
+        "threshold": result.threshold,
+        "threshold_used": result.threshold,
+        "flagged": bool(result.label),
+        "detector": result.detector,
+        "model_version": model_version,
+        "latency_ms": round(latency_ms, 3),
+        "rationale": result.rationale,
+        "normalize_infer": bool(result.metadata.get("normalize_infer")),
+    }
 
 
 class Predictor:
-    """Unified predictor for rules or LoRA detectors."""
+    """Unified predictor for rules, linear, LoRA, exported ONNX or cascade detectors."""
 
-    def __init__(self, detector: str = "rules", run_dir: str | None = None) -> None:
+    def __init__(
+        self,
+        detector: str = "rules",
+        run_dir: str | None = None,
+        cache: ResultCache | None = None,
+        quantize: str | None = None,
+        windows: WindowConfig | None = None,
+    ) -> None:
         detector = detector.lower()
-        if detector not in {"rules", "lora"}:
+        if detector not in {"rules"} | MODEL_DETECTORS:
             raise ValueError(f"Unknown detector: {detector}")
+        if quantize is not None and detector != "lora":
+            raise ValueError("quantize is only supported for the lora detector")
+        if windows is not None and detector not in {"lora", "onnx"}:
+            raise ValueError("windows is only supported for the lora and onnx detectors")
         self.detector_name = detector
         if detector == "rules":
             self.detector = RulesDetector()
+        elif not run_dir:
+            raise ValueError(f"run_dir is required for {detector} detector")
+        elif detector == "onnx":
+            from .onnx_detector import OnnxDetector
+
+            self.detector = OnnxDetector(run_dir, windows=windows)
+        elif detector == "linear":
+            from .linear_detector import LinearDetector
+
+            self.detector = LinearDetector(run_dir)
+        elif detector == "cascade":
+            from .cascade import CascadeDetector
+
+            self.detector = CascadeDetector(run_dir)
         else:
-            if not run_dir:
-                raise ValueError("run_dir is required for lora detector")
             from .lora_detector import LoraDetector
 
-            self.detector = LoraDetector(run_dir)
+            self.detector = LoraDetector(run_dir, quantize=quantize, windows=windows)
+        self.cache = cache
+        if cache is not None:
+            cache.bind(self.detector.fingerprint())
+
+    def warmup(self) -> None:
+        """Load model artifacts now instead of on the first request."""
+        if self.detector_name == "cascade":
+            # "warmup" may exit early, so load the LoRA stage directly.
+            self.detector.warmup()
+            return
+        self.detector.predict_proba_batch(["warmup"], batch_size=1)
+
+    def cache_stats(self) -> dict[str, Any] | None:
+        return self.cache.stats() if self.cache is not None else None
+
+    def cascade_stats(self) -> dict[str, Any] | None:
+        """Cascade routing counts (LoRA traffic avoided), or None for other detectors."""
+        return self.detector.stats() if self.detector_name == "cascade" else None
 
     def _resolve_threshold(self, threshold: float | str | None) -> tuple[float, str]:
         if threshold is None:
-            if self.detector_name == "lora":
+            if self.detector_name in MODEL_DETECTORS:
                 return self.detector.threshold, "config"
             return 0.5, "default"
         if isinstance(threshold, str):
             if threshold.lower() != "val":
                 raise ValueError("threshold must be a float or 'val'")
-            if self.detector_name != "lora":
-                raise ValueError("threshold='val' is only valid for lora")
+            if self.detector_name not in MODEL_DETECTORS:
+                raise ValueError("threshold='val' is only valid for model detectors, not rules")
             return self.detector.threshold, "val"
         return float(threshold), "user"
 
-    def predict(
+    def _prepare_text(self, text: str, normalize_infer: bool, drop_mn: bool) -> str:
+        return normalize_text(text, drop_mn=drop_mn) if normalize_infer else text
+
+    def _build_result(
         self,
-        text: str,
-        *,
-        threshold: float | str | None = None,
-        normalize_infer: bool = False,
-        drop_mn: bool = False,
+        score: float,
+        resolved_threshold: float,
+        threshold_source: str,
+        normalize_infer: bool,
+        drop_mn: bool,
+        rationale: dict[str, Any] | None = None,
     ) -> PredictionResult:
-        inference_text = (
-            normalize_text(text, drop_mn=drop_mn) if normalize_infer else text
-        )
-        resolved_threshold, threshold_source = self._resolve_threshold(threshold)
-        score = self.detector.predict_proba(inference_text)
         label = int(score >= resolved_threshold)
         metadata = {
             "threshold_source": threshold_source,
             "normalize_infer": normalize_infer,
             "drop_mn": drop_mn,
         }
-        if self.detector_name == "lora":
+        if self.detector_name in MODEL_DETECTORS:
             metadata["run_dir"] = str(self.detector.run_dir)
             metadata["model_name"] = self.detector.model_name
+            if getattr(self.detector, "quantize", None):
+                metadata["quantize"] = self.detector.quantize
+            windows = getattr(self.detector, "windows", None)
+            if windows is not None:
+                metadata["windows"] = {"pooling": windows.pooling, "window": windows.window}
         return PredictionResult(
             score=score,
             label=label,
             threshold=resolved_threshold,
             detector=self.detector_name,
             metadata=metadata,
+            rationale=rationale,
+        )
+
+    def _score_uncached(
+        self, texts: list[str], batch_size: int, max_tokens: int | None
+    ) -> list[CachedScore]:
+        if self.detector_name == "rules":
+            # Rule matches come out of the same scan that produces the score.
+            return self.detector.explain_batch(texts, batch_size=batch_size)
+        if self.detector_name == "cascade" or getattr(self.detector, "windows", None):
+            # Cascade stage and triggering window both come back as the rationale.
+            return self.detector.explain_batch(texts, batch_size=batch_size, max_tokens=max_tokens)
+        scores = self.detector.predict_proba_batch(
+            texts, batch_size=batch_size, max_tokens=max_tokens
         )
+        return [(score, None) for score in scores]
+
+    def _score(
+        self,
+        texts: Sequence[str],
+        batch_size: int,
+        max_tokens: int | None,
+        normalize_infer: bool,
+        drop_mn: bool,
+    ) -> list[CachedScore]:
+        if self.cache is None:
+            inference_texts = [self._prepare_text(t, normalize_infer, drop_mn) for t in texts]
+            return self._score_uncached(inference_texts, batch_size, max_tokens)
+
+        from .cache import make_cache_key
+
+        # Keys hash the raw text, so hits skip normalization as well as scoring.
+        keys = [
+            make_cache_key(
+                self.detector_name, self.cache.fingerprint or "", normalize_infer, drop_mn, text
+            )
+            for text in texts
+        ]
+        scored: list[CachedScore | None] = [self.cache.get(key) for key in keys]
+        pending: dict[str, list[int]] = {}
+        for idx, (key, value) in enumerate(zip(keys, scored)):
+            if value is None:
+                pending.setdefault(key, []).append(idx)
+        if pending:
+            miss_keys = list(pending)
+            miss_texts = [
+                self._prepare_text(texts[pending[key][0]], normalize_infer, drop_mn)
+                for key in miss_keys
+            ]
+            fresh = self._score_uncached(miss_texts, batch_size, max_tokens)
+            self.cache.put_many(list(zip(miss_keys, fresh)))
+            for key, value in zip(miss_keys, fresh):
+                for idx in pending[key]:
+                    scored[idx] = value
+        return scored  # type: ignore[return-value]
+
+    def predict(
+        self,
+        text: str,
+        *,
+        threshold: float | str | None = None,
+        normalize_infer: bool = False,
+        drop_mn: bool = False,
+    ) -> PredictionResult:
+        return self.predict_batch(
+            [text],
+            batch_size=1,
+            threshold=threshold,
+            normalize_infer=normalize_infer,
+            drop_mn=drop_mn,
+        )[0]
+
+    def predict_batch(
+        self,
+        texts: Sequence[str],
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_tokens: int | None = None,
+        threshold: float | str | None = None,
+        normalize_infer: bool = False,
+        drop_mn: bool = False,
+    ) -> list[PredictionResult]:
+        """Score many texts with one detector call per ``batch_size`` chunk.
+
+        ``max_tokens`` enables length-bucketed batching under a padded-token
+        budget (LoRA only). Results are returned in input order and match
+        ``predict`` row for row.
+        """
+        resolved_threshold, threshold_source = self._resolve_threshold(threshold)
+        if self.detector_name == "cascade":
+            self.detector.check_normalization(normalize_infer, drop_mn)
+        scored = self._score(texts, batch_size, max_tokens, normalize_infer, drop_mn)
+        return [
+            self._build_result(
+                score, resolved_threshold, threshold_source, normalize_infer, drop_mn, rationale
+            )
+            for score, rationale in scored
+        ]
 
 
 def predict(
@@ -99,4 +273,5 @@ def predict(
         "threshold": result.threshold,
         "detector": result.detector,
         "metadata": result.metadata,
+        "rationale": result.rationale,
     }
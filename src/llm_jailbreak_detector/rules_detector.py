@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Iterable
+import json
+from typing import Any, Iterable, Sequence
 
 from baselines.rules import RulesConfig as _RulesConfig
 from baselines.rules import RulesDetector as _RulesDetector
@@ -9,13 +10,67 @@ from baselines.rules import RulesDetector as _RulesDetector
 class RulesDetector:
     """Wrapper around the Week-1 rules baseline with predict helpers."""
 
-    def __init__(self, patterns: Iterable[str] | None = None) -> None:
-        config = _RulesConfig(patterns=list(patterns)) if patterns is not None else None
+    def __init__(
+        self,
+        patterns: Iterable[str] | None = None,
+        weights: Iterable[float] | None = None,
+        categories: Iterable[str] | None = None,
+    ) -> None:
+        config = None
+        if patterns is not None:
+            config = _RulesConfig(
+                patterns=list(patterns),
+                weights=list(weights) if weights is not None else None,
+                categories=list(categories) if categories is not None else None,
+            )
         self._detector = _RulesDetector(config=config)
 
+    def fingerprint(self) -> str:
+        """Hash of the rule set; changes whenever patterns, weights or categories do."""
+        import hashlib
+
+        payload = {
+            "patterns": list(self._detector.config.patterns),
+            "weights": self._detector.weights,
+            "categories": self._detector.categories,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
     def predict_proba(self, text: str) -> float:
         return float(self._detector.score(text))
 
+    def predict_proba_batch(
+        self,
+        texts: Sequence[str],
+        batch_size: int = 16,
+        max_tokens: int | None = None,
+    ) -> list[float]:
+        """Score texts in order; batching knobs are accepted for API parity with LoRA."""
+        return [score for score, _ in self.explain_batch(texts, batch_size=batch_size)]
+
+    def explain(self, text: str) -> tuple[float, dict[str, Any]]:
+        """Return the score and a rationale listing every rule match with its span."""
+        result = self._detector.explain(text)
+        matches = [
+            {
+                "pattern": match.pattern,
+                "category": self._detector.categories[match.pattern_index],
+                "weight": self._detector.weights[match.pattern_index],
+                "span": [match.start, match.end],
+                "match": text[match.start : match.end],
+            }
+            for match in result.matches
+        ]
+        categories = sorted({match["category"] for match in matches})
+        return float(result.score), {"matches": matches, "categories": categories}
+
+    def explain_batch(
+        self, texts: Sequence[str], batch_size: int = 16
+    ) -> list[tuple[float, dict[str, Any]]]:
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        return [self.explain(text) for text in texts]
+
     def predict(self, text: str, threshold: float = 0.5) -> int:
         score = self.predict_proba(text)
         return int(score >= threshold)
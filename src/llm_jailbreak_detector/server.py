@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import json
+import math
+import signal
+import sys
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from .coalescer import MicroBatcher
+from .predict import DEFAULT_BATCH_SIZE, Predictor, build_payload
+
+MAX_BODY_BYTES = 10 * 1024 * 1024
+MAX_BATCH_RECORDS = 10_000
+IDLE_TIMEOUT_SECONDS = 5.0
+
+
+class RequestError(ValueError):
+    """Client error surfaced as HTTP 400 with a JSON ``error`` message."""
+
+
+def _threshold_option(value: Any) -> float | str | None:
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+        return float(value)
+    raise RequestError("'threshold' must be a finite number, 'val' or null")
+
+
+def _flag_option(name: str, value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    raise RequestError(f"'{name}' must be a boolean")
+
+
+class ScoringService:
+    """Request handling shared by all server threads around one loaded predictor."""
+
+    def __init__(
+        self,
+        predictor: Predictor,
+        *,
+        threshold: float | str | None = None,
+        normalize_infer: bool = False,
+        drop_mn: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        coalescer: MicroBatcher | None = None,
+    ) -> None:
+        self.predictor = predictor
+        self.coalescer = coalescer
+        self.defaults = {
+            "threshold": threshold,
+            "normalize_infer": normalize_infer,
+            "drop_mn": drop_mn,
+        }
+        self.batch_size = batch_size
+        self.ready = threading.Event()
+        # Detectors and the result cache are not thread-safe; HTTP parsing and
+        # JSON encoding still run concurrently on the handler threads.
+        self._lock = threading.Lock()
+
+    def warmup(self) -> None:
+        with self._lock:
+            self.predictor.warmup()
+        if self.coalescer is not None:
+            self.coalescer.start()
+        self.ready.set()
+
+    def close(self) -> None:
+        if self.coalescer is not None:
+            self.coalescer.close()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "coalescer": self.coalescer.stats() if self.coalescer is not None else None,
+            "cache": self.predictor.cache_stats(),
+            "cascade": self.predictor.cascade_stats(),
+        }
+
+    def _options(self, body: dict[str, Any]) -> dict[str, Any]:
+        options = dict(self.defaults)
+        if "threshold" in body:
+            options["threshold"] = _threshold_option(body["threshold"])
+        if "normalize" in body:
+            options["normalize_infer"] = _flag_option("normalize", body["normalize"])
+        if "drop_mn" in body:
+            options["drop_mn"] = _flag_option("drop_mn", body["drop_mn"])
+        return options
+
+    @staticmethod
+    def _records(body: dict[str, Any]) -> list[dict[str, Any]]:
+        records = body.get("records")
+        if records is None and "texts" in body:
+            records = [{"text": text} for text in body["texts"]]
+        if not isinstance(records, list):
+            raise RequestError("body must include a 'records' or 'texts' list")
+        if len(records) > MAX_BATCH_RECORDS:
+            raise RequestError(f"at most {MAX_BATCH_RECORDS} records per request")
+        for record in records:
+            if not isinstance(record, dict) or not isinstance(record.get("text"), str):
+                raise RequestError("each record must include a string 'text' field")
+        return records
+
+    def score_records(
+        self, records: list[dict[str, Any]], options: dict[str, Any]
+    ) -> list[dict[str, Any]]:
+        texts = [record["text"] for record in records]
+        start = time.perf_counter()
+        if self.coalescer is not None:
+            results = self.coalescer.predict_batch(texts, **options)
+        else:
+            with self._lock:
+                results = self.predictor.predict_batch(texts, batch_size=self.batch_size, **options)
+        latency_ms = (time.perf_counter() - start) * 1000.0 / max(1, len(records))
+        payloads = []
+        for record, result in zip(records, results):
+            payload = build_payload(record["text"], result, latency_ms)
+            if "id" in record:
+                payload["id"] = record["id"]
+            payloads.append(payload)
+        return payloads
+
+    def predict(self, body: dict[str, Any]) -> dict[str, Any]:
+        if not isinstance(body.get("text"), str):
+            raise RequestError("body must include a string 'text' field")
+        return self.score_records([body], self._options(body))[0]
+
+    def predict_batch(self, body: dict[str, Any]) -> dict[str, Any]:
+        return {"results": self.score_records(self._records(body), self._options(body))}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "ScoringServer"
+    protocol_version = "HTTP/1.1"
+    # Idle keep-alive connections are dropped after this many seconds, which
+    # also bounds how long a graceful shutdown waits for them.
+    timeout = IDLE_TIMEOUT_SECONDS
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: HTTPStatus, payload: dict[str, Any]) -> None:
+        body = json.dumps(payload, ensure_ascii=True).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        # Error responses may leave an unread request body on the socket.
+        if self.server.draining or status >= HTTPStatus.BAD_REQUEST:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise RequestError(f"request body exceeds {MAX_BODY_BYTES} bytes")
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError as exc:
+            raise RequestError(f"invalid JSON body: {exc}") from exc
+        if not isinstance(body, dict):
+            raise RequestError("JSON body must be an object")
+        return body
+
+    def do_GET(self) -> None:  # noqa: N802
+        service = self.server.service
+        if self.path == "/healthz":
+            self._send_json(HTTPStatus.OK, {"status": "ok"})
+        elif self.path == "/readyz":
+            ready = service.ready.is_set() and not self.server.draining
+            status = HTTPStatus.OK if ready else HTTPStatus.SERVICE_UNAVAILABLE
+            self._send_json(status, {"ready": ready, "detector": service.predictor.detector_name})
+        elif self.path == "/stats":
+            self._send_json(HTTPStatus.OK, service.stats())
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"unknown path: {self.path}"})
+
+    def do_POST(self) -> None:  # noqa: N802
+        service = self.server.service
+        routes = {"/predict": service.predict, "/predict_batch": service.predict_batch}
+        route = routes.get(self.path)
+        if route is None:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"unknown path: {self.path}"})
+            return
+        if not service.ready.is_set() or self.server.draining:
+            self._send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": "server not ready"})
+            return
+        try:
+            payload = route(self._read_body())
+        except ValueError as exc:
+            # RequestError plus predictor validation errors (e.g. bad threshold).
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(exc)})
+        except Exception as exc:
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(exc)})
+        else:
+            self._send_json(HTTPStatus.OK, payload)
+
+
+class ScoringServer(ThreadingHTTPServer):
+    """Threaded HTTP server; ``server_close`` waits for in-flight requests."""
+
+    daemon_threads = False
+    block_on_close = True
+
+    def __init__(
+        self, address: tuple[str, int], service: ScoringService, *, quiet: bool = False
+    ) -> None:
+        super().__init__(address, _Handler)
+        self.service = service
+        self.quiet = quiet
+        self.draining = False
+
+    def begin_shutdown(self) -> None:
+        """Fail readiness, stop accepting requests and let in-flight ones finish."""
+        self.draining = True
+        threading.Thread(target=self.shutdown, daemon=True).start()
+
+
+def serve(server: ScoringServer) -> None:
+    """Warm up, serve until SIGINT/SIGTERM, then drain and close."""
+
+    def _on_signal(signum: int, frame: Any) -> None:
+        print(f"received signal {signum}; shutting down", file=sys.stderr)
+        server.begin_shutdown()
+
+    previous = {sig: signal.signal(sig, _on_signal) for sig in (signal.SIGINT, signal.SIGTERM)}
+    try:
+        server.service.warmup()
+        host, port = server.server_address[:2]
+        print(f"serving on http://{host}:{port}", file=sys.stderr, flush=True)
+        server.serve_forever()
+    finally:
+        server.server_close()
+        server.service.close()
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
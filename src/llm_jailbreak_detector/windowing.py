@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Sequence
+
+POOLING_MODES = ("max", "mean", "softmax")
+
+
+@dataclass(frozen=True)
+class WindowConfig:
+    """Sliding-window scoring for inputs longer than the model's ``max_length``.
+
+    ``window`` counts content tokens per window (default: ``max_length`` minus
+    the tokenizer's special tokens) and ``stride`` is the step between window
+    starts (default: half a window). ``softmax`` pooling weights each window's
+    score by ``softmax(logit(score) / temperature)``: it tends to ``max`` as
+    the temperature drops and to ``mean`` as it grows. With ``dedupe`` a
+    window whose tokens repeat an earlier one is scored once.
+    """
+
+    window: int | None = None
+    stride: int | None = None
+    pooling: str = "max"
+    temperature: float = 1.0
+    dedupe: bool = True
+
+    def __post_init__(self) -> None:
+        if self.pooling not in POOLING_MODES:
+            raise ValueError(f"pooling must be one of {', '.join(POOLING_MODES)}")
+        if self.window is not None and self.window < 1:
+            raise ValueError("window must be >= 1")
+        if self.stride is not None and self.stride < 1:
+            raise ValueError("stride must be >= 1")
+        if self.window is not None and self.stride is not None and self.stride > self.window:
+            raise ValueError("stride must not exceed window, or tokens would be skipped")
+        if self.temperature <= 0:
+            raise ValueError("temperature must be > 0")
+
+    def resolve(self, default_window: int) -> tuple[int, int]:
+        """``(window, stride)`` with defaults filled in from the model's content-token budget."""
+        window = self.window or default_window
+        if window < 1:
+            raise ValueError(f"window must be >= 1 (resolved to {window} from max_length)")
+        stride = self.stride or max(1, window // 2)
+        if stride > window:
+            raise ValueError(
+                f"stride {stride} exceeds the resolved window of {window} tokens, "
+                "so tokens would be skipped"
+            )
+        return window, stride
+
+    def describe(self) -> str:
+        return (
+            f"window={self.window}|stride={self.stride}|pooling={self.pooling}"
+            f"|temperature={self.temperature}|dedupe={self.dedupe}"
+        )
+
+
+def plan_windows(n_tokens: int, window: int, stride: int) -> list[tuple[int, int]]:
+    """Token ``[start, end)`` spans covering ``n_tokens``; the last one ends at the input's end."""
+    if window < 1 or stride < 1:
+        raise ValueError("window and stride must be >= 1")
+    if n_tokens <= window:
+        return [(0, n_tokens)]
+    last = n_tokens - window
+    starts = list(range(0, last, stride))
+    starts.append(last)
+    return [(start, start + window) for start in starts]
+
+
+def pool_scores(
+    scores: Sequence[float], pooling: str = "max", temperature: float = 1.0
+) -> tuple[float, int]:
+    """Aggregate window scores; returns ``(score, index of the highest-scoring window)``."""
+    if not scores:
+        raise ValueError("scores must not be empty")
+    trigger = max(range(len(scores)), key=lambda i: scores[i])
+    if pooling == "max":
+        return float(scores[trigger]), trigger
+    if pooling == "mean":
+        return float(sum(scores) / len(scores)), trigger
+    if pooling == "softmax":
+        clipped = [min(max(s, 1e-7), 1 - 1e-7) for s in scores]
+        logits = [math.log(p / (1 - p)) / temperature for p in clipped]
+        top = max(logits)
+        weights = [math.exp(z - top) for z in logits]
+        total = sum(weights)
+        return float(sum(w * s for w, s in zip(weights, scores)) / total), trigger
+    raise ValueError(f"pooling must be one of {', '.join(POOLING_MODES)}")
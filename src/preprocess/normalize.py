@@ -1,23 +1,43 @@
 from __future__ import annotations
 
 import unicodedata
+from functools import lru_cache
+from typing import Dict, FrozenSet, Optional
+
+
+class _CategoryDeleteTable(Dict[int, Optional[int]]):
+    """``str.translate`` table that deletes code points in ``categories``.
+
+    Entries are filled on first sight of each code point, so the category
+    lookup runs once per distinct character instead of once per character.
+    """
+
+    def __init__(self, categories: FrozenSet[str]) -> None:
+        super().__init__()
+        self.categories = categories
+
+    def __missing__(self, code: int) -> Optional[int]:
+        value = None if unicodedata.category(chr(code)) in self.categories else code
+        self[code] = value
+        return value
+
+
+@lru_cache(maxsize=None)
+def _delete_table(remove_cf: bool, remove_mn: bool) -> _CategoryDeleteTable:
+    categories = frozenset(cat for cat, keep in (("Cf", remove_cf), ("Mn", remove_mn)) if keep)
+    return _CategoryDeleteTable(categories)
 
 
 def normalize_text(text: str, *, remove_cf: bool = True, remove_mn: bool = False) -> str:
     """Normalize text for inference.
 
     Applies NFKC, strips category Cf (format), and optionally strips Mn
-    (nonspacing marks) to reduce obfuscation.
+    (nonspacing marks) to reduce obfuscation. ASCII input is returned as is,
+    since NFKC leaves it unchanged and it has no Cf/Mn characters.
     """
-    out = unicodedata.normalize("NFKC", text)
-    if not (remove_cf or remove_mn):
+    if text.isascii():
+        return text
+    out = text if unicodedata.is_normalized("NFKC", text) else unicodedata.normalize("NFKC", text)
+    if not (remove_cf or remove_mn) or out.isascii():
         return out
-    cleaned = []
-    for ch in out:
-        cat = unicodedata.category(ch)
-        if remove_cf and cat == "Cf":
-            continue
-        if remove_mn and cat == "Mn":
-            continue
-        cleaned.append(ch)
-    return "".join(cleaned)
+    return out.translate(_delete_table(remove_cf, remove_mn))
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import re
 import unicodedata
+from typing import Dict
 
 ZERO_WIDTH_CHARS = {
     "\u200b",  # ZWSP
@@ -29,23 +30,28 @@ CONFUSABLES = {
 }
 
 
+def _fullwidth_table() -> Dict[int, str]:
+    table = {FULLWIDTH_SPACE: " "}
+    for code in range(FULLWIDTH_START, FULLWIDTH_END + 1):
+        table[code] = chr(code - FULLWIDTH_OFFSET)
+    return table
+
+
+_FULLWIDTH_TABLE = _fullwidth_table()
+_CONFUSABLES_TABLE = {ord(ch): repl for ch, repl in CONFUSABLES.items()}
+_ZERO_WIDTH_TABLE = {ord(ch): None for ch in ZERO_WIDTH_CHARS}
+# Fullwidth and confusable targets are ASCII and zero-width characters are in
+# neither source set, so one merged table equals applying the maps in sequence.
+_FOLD_TABLE = {**_FULLWIDTH_TABLE, **_CONFUSABLES_TABLE}
+_FOLD_STRIP_ZW_TABLE = {**_FOLD_TABLE, **_ZERO_WIDTH_TABLE}
+
+
 def _map_fullwidth(text: str) -> str:
-    out = []
-    for ch in text:
-        code = ord(ch)
-        if code == FULLWIDTH_SPACE:
-            out.append(" ")
-        elif FULLWIDTH_START <= code <= FULLWIDTH_END:
-            out.append(chr(code - FULLWIDTH_OFFSET))
-        else:
-            out.append(ch)
-    return "".join(out)
+    return text.translate(_FULLWIDTH_TABLE)
 
 
 def _map_confusables(text: str) -> str:
-    if not text:
-        return text
-    return "".join(CONFUSABLES.get(ch, ch) for ch in text)
+    return text.translate(_CONFUSABLES_TABLE)
 
 
 def normalize_text(
@@ -58,15 +64,16 @@ def normalize_text(
     """Normalize Unicode to reduce obfuscation used in jailbreaks/prompt injection.
 
     Applies NFKC, strips zero-width characters, maps common confusables, and
-    collapses whitespace to make adversarial formatting less effective.
+    collapses whitespace to make adversarial formatting less effective. ASCII
+    input only needs the whitespace step; other text gets NFKC (skipped when
+    already normalized) and a single ``str.translate`` pass.
     """
     out = text
-    if nfkc:
-        out = unicodedata.normalize("NFKC", out)
-    out = _map_fullwidth(out)
-    out = _map_confusables(out)
-    if strip_zw:
-        out = "".join(ch for ch in out if ch not in ZERO_WIDTH_CHARS)
+    if not out.isascii():
+        if nfkc and not unicodedata.is_normalized("NFKC", out):
+            out = unicodedata.normalize("NFKC", out)
+        out = out.translate(_FOLD_STRIP_ZW_TABLE if strip_zw else _FOLD_TABLE)
     if collapse_ws:
-        out = WHITESPACE_RE.sub(" ", out).strip()
+        # str.split() and WHITESPACE_RE agree on what counts as whitespace.
+        out = " ".join(out.split())
     return out
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import pytest
+
+from src.data.batching import plan_token_batches, restore_order
+
+
+def test_plan_respects_token_budget_and_covers_all_rows() -> None:
+    lengths = [5, 200, 7, 180, 6, 190, 8, 5]
+    plan = plan_token_batches(lengths, max_tokens=400, naive_batch_size=4)
+    assert sorted(i for batch in plan.batches for i in batch) == list(range(len(lengths)))
+    for batch in plan.batches:
+        assert len(batch) * max(lengths[i] for i in batch) <= 400
+    assert plan.stats.real_tokens == sum(lengths)
+    assert plan.stats.padded_tokens < plan.stats.naive_padded_tokens
+    assert plan.stats.padding_saved > 0
+
+
+def test_oversized_row_gets_own_batch() -> None:
+    plan = plan_token_batches([50, 3, 2], max_tokens=10)
+    assert plan.batches[0] == [0]
+
+
+def test_max_batch_size_caps_rows() -> None:
+    plan = plan_token_batches([1] * 10, max_tokens=1000, max_batch_size=4)
+    assert [len(batch) for batch in plan.batches] == [4, 4, 2]
+
+
+def test_restore_order_round_trip() -> None:
+    lengths = [3, 9, 1, 4]
+    plan = plan_token_batches(lengths, max_tokens=12)
+    scheduled = [lengths[i] for batch in plan.batches for i in batch]
+    assert restore_order(scheduled, plan.batches) == lengths
+
+
+def test_invalid_budget() -> None:
+    with pytest.raises(ValueError):
+        plan_token_batches([1, 2], max_tokens=0)
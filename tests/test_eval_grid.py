@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+
+from src.data.token_cache import sha256_file
+from src.eval.grid import (
+    cell_is_current,
+    eval_cell_flags,
+    eval_cell_key,
+    load_evaluation_manifest,
+    record_evaluations,
+    run_content_sha256,
+)
+from src.eval.predictions import predictions_path, write_predictions
+
+FLAGS = eval_cell_flags(
+    target_fpr=0.01, normalize_infer=False, normalize_drop_mn=False, bootstrap=0, bootstrap_seed=7
+)
+
+
+def _run_dir(tmp_path):
+    run_dir = tmp_path / "run"
+    (run_dir / "lora_adapter").mkdir(parents=True)
+    (run_dir / "config.json").write_text(json.dumps({"val_threshold": 0.5}), encoding="utf-8")
+    (run_dir / "lora_adapter" / "adapter_model.bin").write_bytes(b"\x00\x01")
+    return run_dir
+
+
+def _evaluate(run_dir, key: str, cell_key: str) -> None:
+    write_predictions(predictions_path(run_dir, key), ["a", "b"], [1, 0], np.array([0.9, 0.1]))
+    (run_dir / f"final_metrics_{key}.json").write_text("{}", encoding="utf-8")
+    record_evaluations(run_dir, {key: {"cell_key": cell_key}})
+
+
+def test_cell_key_tracks_adapter_dataset_and_flags(tmp_path) -> None:
+    run_dir = _run_dir(tmp_path)
+    data = tmp_path / "val.jsonl"
+    data.write_text('{"id": "a", "text": "hi", "label": 0}\n', encoding="utf-8")
+    adapter = run_content_sha256(run_dir)
+    key = eval_cell_key(adapter, sha256_file(data), FLAGS)
+
+    # The bootstrap seed only shapes outputs when bootstrapping.
+    assert FLAGS["bootstrap_seed"] is None
+    assert eval_cell_key(adapter, sha256_file(data), dict(FLAGS)) == key
+    assert eval_cell_key(adapter, sha256_file(data), {**FLAGS, "normalize_infer": True}) != key
+
+    data.write_text('{"id": "a", "text": "hi!", "label": 0}\n', encoding="utf-8")
+    assert eval_cell_key(adapter, sha256_file(data), FLAGS) != key
+    (run_dir / "lora_adapter" / "adapter_model.bin").write_bytes(b"\x00\x02")
+    assert run_content_sha256(run_dir) != adapter
+
+
+def test_cell_is_current_requires_matching_key_and_outputs(tmp_path) -> None:
+    run_dir = _run_dir(tmp_path)
+    assert not cell_is_current(run_dir, "val", "k1")
+
+    _evaluate(run_dir, "val", "k1")
+    _evaluate(run_dir, "test_main", "k2")
+    assert cell_is_current(run_dir, "val", "k1")
+    assert not cell_is_current(run_dir, "val", "k2")
+    manifest = load_evaluation_manifest(run_dir)
+    assert set(manifest["evaluations"]) == {"val", "test_main"}
+    assert manifest["generated_by"] == "scripts/eval_lora_from_run.py"
+
+    predictions_path(run_dir, "test_main").unlink()
+    assert not cell_is_current(run_dir, "test_main", "k2")
+    (run_dir / "final_metrics_val.json").unlink()
+    assert not cell_is_current(run_dir, "val", "k1")
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import json
+import sys
+
+import pytest
+
+from src.jobs.scheduler import JobState, make_job, run_jobs
+
+PY = sys.executable
+
+
+def _touch_job(job_id: str, marker, *, fail: bool = False):
+    code = (
+        "import os, pathlib, sys; "
+        f"pathlib.Path({str(marker)!r}).open('a').write(os.environ['OMP_NUM_THREADS'] + '\\n'); "
+        f"sys.exit({1 if fail else 0})"
+    )
+    return make_job(job_id, [[PY, "-c", code]])
+
+
+def test_run_jobs_runs_in_parallel_and_resumes(tmp_path) -> None:
+    state_path = tmp_path / "state.json"
+    markers = {name: tmp_path / f"{name}.txt" for name in ("a", "b", "c")}
+    jobs = [_touch_job(name, marker, fail=name == "c") for name, marker in markers.items()]
+
+    summary = run_jobs(
+        jobs, state_path=state_path, max_parallel=2, threads_per_job=3, summary_path=tmp_path / "s.json"
+    )
+    assert summary["failed"] == ["c"]
+    assert [row["status"] for row in summary["jobs"]] == ["done", "done", "failed"]
+    assert all(row["wall_time_s"] is not None for row in summary["jobs"])
+    assert markers["a"].read_text() == "3\n"
+    assert json.loads((tmp_path / "s.json").read_text())["threads_per_job"] == 3
+    assert (tmp_path / "state_logs" / "c.log").exists()
+
+    # Resuming reruns only the failed job; a changed command reruns a finished one too.
+    jobs[2] = _touch_job("c", markers["c"])
+    jobs[0] = make_job("a", [[PY, "-c", "pass"]])
+    summary = run_jobs(jobs, state_path=state_path, threads_per_job=1)
+    assert summary["failed"] == []
+    assert markers["b"].read_text() == "3\n"
+    assert markers["c"].read_text() == "3\n1\n"
+    state = JobState(state_path)
+    assert state.jobs["c"]["attempts"] == 2
+    assert state.jobs["a"]["attempts"] == 2
+    assert all(state.is_done(job) for job in jobs)
+
+
+def test_run_jobs_validates_input(tmp_path) -> None:
+    job = make_job("a", [[PY, "-c", "pass"]])
+    with pytest.raises(ValueError, match="Duplicate"):
+        run_jobs([job, job], state_path=tmp_path / "state.json")
+    with pytest.raises(ValueError, match="max_parallel"):
+        run_jobs([job], state_path=tmp_path / "state.json", max_parallel=0)
+    missing = make_job("m", [[str(tmp_path / "no-such-binary")]])
+    assert run_jobs([missing], state_path=tmp_path / "state.json")["failed"] == ["m"]
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+
+from src.eval.metrics import (
+    ScoreCurve,
+    bootstrap_metrics,
+    compute_metrics,
+    score_shift_report,
+    threshold_metrics,
+    tpr_at_fpr,
+)
+
+
+def test_score_shift_report_identical_scores() -> None:
+    y_true = [0, 0, 0, 1, 1, 1]
+    scores = [0.1, 0.2, 0.6, 0.5, 0.8, 0.9]
+    report = score_shift_report(y_true, scores, scores, threshold=0.55)
+    assert report["score_shift"]["max_abs"] == 0.0
+    assert report["decision_flips"] == 0
+    assert report["delta"] == {"tpr_at_fpr": 0.0, "tpr_at_threshold": 0.0, "fpr_at_threshold": 0.0}
+
+
+def test_score_shift_report_counts_flips_and_tpr_moves() -> None:
+    y_true = [0, 0, 0, 1, 1, 1]
+    reference = [0.1, 0.2, 0.3, 0.6, 0.8, 0.9]
+    candidate = [0.1, 0.2, 0.3, 0.4, 0.8, 0.9]
+    report = score_shift_report(y_true, reference, candidate, threshold=0.5)
+    assert report["decision_flips"] == 1
+    assert report["score_shift"]["max_abs"] == pytest.approx(0.2)
+    assert report["reference"]["tpr_at_threshold"] == 1.0
+    assert report["candidate"]["tpr_at_threshold"] == pytest.approx(2 / 3)
+    assert report["delta"]["tpr_at_threshold"] == pytest.approx(-1 / 3)
+    with pytest.raises(ValueError):
+        score_shift_report(y_true, reference, candidate[:-1], threshold=0.5)
+
+
+def test_score_curve_matches_direct_counts_with_ties() -> None:
+    rng = np.random.default_rng(0)
+    y_true = rng.integers(0, 2, 300)
+    scores = np.round(rng.random(300) + 0.3 * y_true, 2)
+    thresholds = np.concatenate([scores[:20], [-1.0, 0.5, np.inf]])
+    rates = threshold_metrics(y_true, scores, thresholds)
+    for threshold, row in zip(thresholds, rates):
+        pred = scores >= threshold
+        assert row["tp"] == int((pred & (y_true == 1)).sum())
+        assert row["fp"] == int((pred & (y_true == 0)).sum())
+        assert row["tn"] + row["fp"] == int((y_true == 0).sum())
+        assert row["asr"] == pytest.approx(1 - row["tpr"])
+
+
+def _sklearn_operating_point(y_true, y_score, target_fpr):
+    # The pre-ScoreCurve implementation, kept as the reference for tpr_at_fpr.
+    from sklearn.metrics import roc_curve
+
+    y_true = np.asarray(y_true).astype(int)
+    y_score = np.asarray(y_score).astype(float)
+    fpr, tpr, thr = roc_curve(y_true, y_score)
+    eligible = np.where(fpr <= target_fpr)[0]
+    idx = int(np.argmin(fpr)) if len(eligible) == 0 else int(eligible[np.argmax(fpr[eligible])])
+    pos = y_true == 1
+    asr = float((~(y_score >= thr[idx]) & pos).sum() / pos.sum()) if pos.sum() else 0.0
+    return (float(thr[idx]), float(tpr[idx]), float(fpr[idx]), asr)
+
+
+def test_operating_points_match_sklearn_roc_curve_selection() -> None:
+    import warnings
+
+    # A vertical ROC run keeps both ends and the first (lowest TPR) one is chosen.
+    op = tpr_at_fpr([0, 1, 1, 0], [0.9, 0.8, 0.7, 0.1], target_fpr=0.5)
+    assert (op.threshold, op.tpr, op.fpr, op.asr) == (0.9, 0.0, 0.5, 1.0)
+
+    rng = np.random.default_rng(4)
+    targets = [-0.1, 0.0, 0.01, 0.05, 0.2, 0.5, 1.0]
+    cases = [
+        ([1, 1, 0], [0.9, 0.8, 0.1]),
+        ([1, 0], [0.5, 0.5]),
+        ([1, 1], [0.2, 0.7]),
+        ([0, 0], [0.2, 0.7]),
+    ]
+    for n in (1, 2, 3, 5, 40, 400):
+        y_true = rng.integers(0, 2, n)
+        cases.append((y_true, np.round(rng.random(n) + 0.4 * y_true, 1)))
+        cases.append((y_true, (rng.random(n) + 0.4 * y_true).astype(np.float32)))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for y_true, scores in cases:
+            points = ScoreCurve.from_scores(y_true, scores).operating_points(targets)
+            for target, point in zip(targets, points):
+                got = (point.threshold, point.tpr, point.fpr, point.asr)
+                expected = _sklearn_operating_point(y_true, scores, target)
+                assert got == pytest.approx(expected, rel=0, abs=0, nan_ok=True)
+                assert tpr_at_fpr(y_true, scores, target).threshold == point.threshold
+
+
+def test_score_curve_compares_float32_scores_in_float32() -> None:
+    scores = np.asarray([0.7, 0.2], dtype=np.float32)
+    assert threshold_metrics([1, 0], scores, [0.7])[0]["tp"] == int((scores >= 0.7).sum()) == 1
+
+
+def test_bootstrap_cis_bracket_the_point_estimates() -> None:
+    rng = np.random.default_rng(1)
+    y_true = rng.integers(0, 2, 2000)
+    scores = np.round(rng.random(2000) + 0.6 * y_true, 2)
+    metrics = compute_metrics(y_true, scores, target_fpr=0.05, n_boot=200, seed=3)
+    ci = metrics["ci"]
+    assert ci["valid"] == ci["n_boot"] == 200
+    for key in ("auroc", "auprc", "tpr_at_fpr"):
+        assert ci[key]["low"] <= metrics[key] <= ci[key]["high"]
+        assert 0 < ci[key]["std"] < 0.05
+    assert bootstrap_metrics(y_true, scores, n_boot=50, seed=3) == bootstrap_metrics(
+        y_true, scores, n_boot=50, seed=3, max_cells=10_000
+    )
+    assert "ci" not in compute_metrics(y_true, scores)
+
+
+def test_bootstrap_drops_single_class_replicates() -> None:
+    ci = bootstrap_metrics([1, 0], [0.9, 0.1], n_boot=100, seed=0)
+    assert 0 < ci["valid"] < 100
+    assert ci["auroc"] == {"low": 1.0, "high": 1.0, "std": 0.0}
+    assert bootstrap_metrics([1, 1], [0.9, 0.1], n_boot=10)["auroc"] is None
+    with pytest.raises(ValueError):
+        bootstrap_metrics([1, 0], [0.9, 0.1], n_boot=0)
+
+
+def test_calibration_points_pick_highest_tpr_within_budget() -> None:
+    rng = np.random.default_rng(7)
+    y_true = np.r_[np.zeros(300, dtype=int), np.ones(100, dtype=int)]
+    scores = np.r_[rng.uniform(0.0, 0.4, 300), rng.uniform(0.6, 1.0, 100)].astype(np.float32)
+    curve = ScoreCurve.from_scores(y_true, scores)
+    for point in curve.calibration_points([0.0, 0.01, 0.05]):
+        assert np.isfinite(point.threshold)
+        assert point.threshold == float(scores[y_true == 1].min())
+        assert (point.tpr, point.fpr) == (1.0, 0.0)
+    # The ROC-rule operating point on the same data stays at the origin.
+    assert curve.operating_points([0.01])[0].threshold == np.inf
+
+    # Over budget even at the top score: finite, just above it, and flags nothing.
+    point = ScoreCurve.from_scores([0, 1], [0.9, 0.2]).calibration_points([0.0])[0]
+    assert np.isfinite(point.threshold) and point.threshold > 0.9
+    assert (point.tpr, point.fpr) == (0.0, 0.0)
+
+
+def test_calibrate_threshold_script_writes_finite_thresholds(tmp_path) -> None:
+    import json
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    from src.eval.predictions import write_predictions
+
+    rng = np.random.default_rng(0)
+    scores = np.r_[rng.uniform(0.0, 0.4, 300), rng.uniform(0.6, 1.0, 100)]
+    labels = [0] * 300 + [1] * 100
+    pred_path = tmp_path / "predictions_val.npz"
+    write_predictions(pred_path, [f"r{i}" for i in range(400)], labels, scores)
+    script = Path(__file__).resolve().parents[1] / "scripts" / "calibrate_threshold.py"
+    subprocess.run(
+        [sys.executable, str(script), "--pred_path", str(pred_path), "--out_dir", str(tmp_path)],
+        check=True,
+        capture_output=True,
+    )
+    for suffix in ("fpr1", "fpr5"):
+        text = (tmp_path / f"threshold_adv2_{suffix}.json").read_text(encoding="utf-8")
+        payload = json.loads(text, parse_constant=lambda name: pytest.fail(f"{name} in {suffix}"))
+        assert 0.4 <= payload["threshold"] < 1.0
+        assert payload["actual_tpr"] > 0.0
+        assert payload["actual_fpr"] <= payload["target_fpr"]
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+import random
+import unicodedata
+from pathlib import Path
+
+from src.augment.adv2 import apply_adv2
+from src.preprocess import normalize as infer_normalize
+from src.preprocess import unicode as unicode_normalize
+
+ROOT_PATH = Path(__file__).resolve().parents[1]
+SEED_FILES = [ROOT_PATH / "demo" / "sample_inputs.jsonl", ROOT_PATH / "examples" / "sample_inputs.jsonl"]
+# Locally built adversarial splits are used too when present (data/ is not versioned).
+LOCAL_ADV_GLOBS = ["data/**/*adv*.jsonl", "data/**/*unicode*.jsonl"]
+TRICKY = [
+    "",
+    "plain ascii",
+    "\ufb01ne \u00bd cafe\u0301 \u2460",
+    "soft\u00adhyphen rtl\u200fmark bom\ufeffx zw\u200b\u200c\u200dj",
+    "\uff29\uff47\uff4e\uff4f\uff52\uff45\u3000\uff41\uff4c\uff4c",
+    "\u0456gn\u043er\u0435 \u0440r\u0435v\u0456\u043eus",
+    "x\u0327\u0301 \u1100\u1161\u11a8 \U0001d400\U0001f600",
+    "tab\tnew\nline\r\n  \u2003em space",
+    "sep\x1c\x1d\x1e\x1f\x85\xa0\u2028\u2029\u200b\u180e end ",
+]
+
+
+def _reference_infer(text: str, *, remove_cf: bool = True, remove_mn: bool = False) -> str:
+    out = unicodedata.normalize("NFKC", text)
+    if not (remove_cf or remove_mn):
+        return out
+    cleaned = []
+    for ch in out:
+        cat = unicodedata.category(ch)
+        if remove_cf and cat == "Cf":
+            continue
+        if remove_mn and cat == "Mn":
+            continue
+        cleaned.append(ch)
+    return "".join(cleaned)
+
+
+def _reference_unicode(
+    text: str, *, nfkc: bool = True, strip_zw: bool = True, collapse_ws: bool = True
+) -> str:
+    out = text
+    if nfkc:
+        out = unicodedata.normalize("NFKC", out)
+    chars = []
+    for ch in out:
+        code = ord(ch)
+        if code == unicode_normalize.FULLWIDTH_SPACE:
+            ch = " "
+        elif unicode_normalize.FULLWIDTH_START <= code <= unicode_normalize.FULLWIDTH_END:
+            ch = chr(code - unicode_normalize.FULLWIDTH_OFFSET)
+        chars.append(unicode_normalize.CONFUSABLES.get(ch, ch))
+    out = "".join(chars)
+    if strip_zw:
+        out = "".join(ch for ch in out if ch not in unicode_normalize.ZERO_WIDTH_CHARS)
+    if collapse_ws:
+        out = unicode_normalize.WHITESPACE_RE.sub(" ", out).strip()
+    return out
+
+
+def _fullwidth_zwsp(text: str, rng: random.Random) -> str:
+    # Mirrors scripts/make_unicode_adversarial_set.py obfuscation.
+    out = []
+    for ch in text:
+        if 0x21 <= ord(ch) <= 0x7E and rng.random() < 0.3:
+            ch = chr(ord(ch) + 0xFEE0)
+        out.append(ch)
+        if rng.random() < 0.1:
+            out.append("\u200b")
+    return "".join(out)
+
+
+def _corpus() -> list[str]:
+    texts = list(TRICKY)
+    for path in SEED_FILES:
+        texts.extend(json.loads(line)["text"] for line in path.read_text(encoding="utf-8").splitlines() if line)
+    for pattern in LOCAL_ADV_GLOBS:
+        for path in sorted(ROOT_PATH.glob(pattern))[:4]:
+            with path.open("r", encoding="utf-8") as handle:
+                texts.extend(json.loads(line)["text"] for _, line in zip(range(500), handle))
+    rng = random.Random(7)
+    variants = []
+    for text in texts:
+        for _ in range(5):
+            variants.append(apply_adv2(text, rng)[0])
+            variants.append(_fullwidth_zwsp(text, rng))
+    return texts + variants
+
+
+def test_fast_normalizers_match_reference() -> None:
+    for text in _corpus():
+        for remove_cf in (True, False):
+            for remove_mn in (True, False):
+                assert infer_normalize.normalize_text(
+                    text, remove_cf=remove_cf, remove_mn=remove_mn
+                ) == _reference_infer(text, remove_cf=remove_cf, remove_mn=remove_mn)
+        for nfkc in (True, False):
+            for strip_zw in (True, False):
+                for collapse_ws in (True, False):
+                    kwargs = {"nfkc": nfkc, "strip_zw": strip_zw, "collapse_ws": collapse_ws}
+                    assert unicode_normalize.normalize_text(text, **kwargs) == _reference_unicode(
+                        text, **kwargs
+                    )
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+
+from src.eval.predictions import (
+    find_predictions,
+    list_prediction_splits,
+    load_predictions,
+    load_split_predictions,
+    predictions_path,
+    split_name,
+    write_predictions,
+)
+
+IDS = ["a-1", "b-2", "\u00e9-3"]
+LABELS = [1, 0, 1]
+SCORES = [0.9, 0.125, 0.5]
+
+
+def test_npz_roundtrip_is_memory_mapped_and_exports_jsonl(tmp_path) -> None:
+    path = write_predictions(
+        predictions_path(tmp_path, "val"), IDS, LABELS, SCORES, split="val", export_jsonl=True
+    )
+    loaded = load_predictions(path)
+    assert isinstance(loaded.scores, np.memmap)
+    assert loaded.ids.tolist() == IDS
+    assert loaded.labels.tolist() == LABELS
+    assert loaded.scores.dtype == np.float32
+    assert loaded.scores.tolist() == pytest.approx(SCORES)
+    assert loaded.split == "val"
+
+    rows = [json.loads(line) for line in path.with_suffix(".jsonl").read_text(encoding="utf-8").splitlines()]
+    assert [(row["id"], row["label"], row["split"]) for row in rows] == [
+        (ex_id, label, "val") for ex_id, label in zip(IDS, LABELS)
+    ]
+    assert [row["score"] for row in rows] == pytest.approx(SCORES)
+    legacy = load_predictions(path.with_suffix(".jsonl"))
+    assert legacy.ids.tolist() == IDS
+    assert np.allclose(legacy.scores, loaded.scores)
+    eager = load_predictions(path, mmap=False)
+    assert not isinstance(eager.scores, np.memmap)
+    assert eager.ids.tolist() == IDS
+
+
+def test_lookup_prefers_npz_and_falls_back_to_legacy_jsonl(tmp_path) -> None:
+    legacy = tmp_path / "predictions_test_main.jsonl"
+    legacy.write_text(
+        "\n".join(json.dumps({"id": i, "label": y, "score": s}) for i, y, s in zip(IDS, LABELS, SCORES)) + "\n",
+        encoding="utf-8",
+    )
+    assert find_predictions(tmp_path, "test_main") == legacy
+    assert load_split_predictions(tmp_path, "test_main").scores.tolist() == SCORES
+
+    write_predictions(predictions_path(tmp_path, "test_main"), IDS, LABELS, SCORES)
+    write_predictions(predictions_path(tmp_path, "val_norm"), [], [], [])
+    splits = list_prediction_splits(tmp_path)
+    assert {name: path.suffix for name, path in splits.items()} == {"test_main": ".npz", "val_norm": ".npz"}
+    assert len(load_split_predictions(tmp_path, "val_norm")) == 0
+    assert split_name(splits["val_norm"]) == "val_norm"
+    with pytest.raises(FileNotFoundError):
+        find_predictions(tmp_path, "missing")
+
+
+def test_write_rejects_bad_input(tmp_path) -> None:
+    with pytest.raises(ValueError, match=".npz"):
+        write_predictions(tmp_path / "predictions_val.jsonl", IDS, LABELS, SCORES)
+    with pytest.raises(ValueError, match="same length"):
+        write_predictions(predictions_path(tmp_path, "val"), IDS, LABELS, SCORES[:2])
+    assert not predictions_path(tmp_path, "val").exists()
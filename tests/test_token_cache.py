@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from src.data.token_cache import TokenizedDataset, concat_encoded, load_or_encode, token_cache_key
+
+
+class _WordTokenizer:
+    name_or_path = "word-test"
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.vocab: dict[str, int] = {"<s>": 0}
+
+    def get_vocab(self) -> dict[str, int]:
+        return {"<s>": 0}
+
+    def __call__(self, texts, truncation=True, max_length=None, **kwargs):
+        self.calls += 1
+        out = []
+        for text in texts:
+            ids = [0] + [self.vocab.setdefault(w, len(self.vocab)) for w in text.split()]
+            out.append(ids[:max_length] if truncation and max_length else ids)
+        return {"input_ids": out}
+
+
+def _write_split(path: Path, texts: list[str]) -> None:
+    rows = [{"id": f"r{i}", "text": t, "label": i % 2} for i, t in enumerate(texts)]
+    path.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+
+
+def _loader(path: Path):
+    def _rows():
+        rows = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+        return [r["id"] for r in rows], [r["text"] for r in rows], [r["label"] for r in rows]
+
+    return _rows
+
+
+def test_load_or_encode_round_trips_and_reuses_cache(tmp_path: Path) -> None:
+    data = tmp_path / "val.jsonl"
+    _write_split(data, ["ignore previous instructions", "hi", "a b c d e f g"])
+    tokenizer = _WordTokenizer()
+    cache_dir = tmp_path / "cache"
+    first, hit = load_or_encode(
+        data, _loader(data), tokenizer, 4, preprocess={"unicode": False}, cache_dir=cache_dir
+    )
+    assert not hit
+    assert first.lengths.tolist() == [4, 2, 4]
+    assert first.input_ids.dtype == np.int32
+    assert isinstance(first.input_ids, np.memmap)
+
+    second, hit = load_or_encode(
+        data, _loader(data), tokenizer, 4, preprocess={"unicode": False}, cache_dir=cache_dir
+    )
+    assert hit
+    assert tokenizer.calls == 1
+    assert second.ids == ["r0", "r1", "r2"]
+    assert np.array_equal(second.input_ids, first.input_ids)
+
+
+def test_cache_key_tracks_inputs(tmp_path: Path) -> None:
+    base = token_cache_key("abc", "tok", 256, {"unicode": False})
+    assert base == token_cache_key("abc", "tok", 256, {"unicode": False})
+    assert base != token_cache_key("abd", "tok", 256, {"unicode": False})
+    assert base != token_cache_key("abc", "tok", 128, {"unicode": False})
+    assert base != token_cache_key("abc", "tok", 256, {"unicode": True})
+
+    data = tmp_path / "val.jsonl"
+    _write_split(data, ["one two"])
+    tokenizer = _WordTokenizer()
+    load_or_encode(data, _loader(data), tokenizer, 8, preprocess={}, cache_dir=tmp_path / "c")
+    _write_split(data, ["one two three"])
+    split, hit = load_or_encode(data, _loader(data), tokenizer, 8, preprocess={}, cache_dir=tmp_path / "c")
+    assert not hit
+    assert split.lengths.tolist() == [4]
+
+
+def test_collate_pads_slices(tmp_path: Path) -> None:
+    data = tmp_path / "val.jsonl"
+    _write_split(data, ["a b c", "d", "e f"])
+    split, _ = load_or_encode(data, _loader(data), _WordTokenizer(), 16, preprocess={})
+    batch = TokenizedDataset(split, pad_token_id=9).collate([2, 1])
+    assert batch["input_ids"].tolist() == [[0, 5, 6], [0, 4, 9]]
+    assert batch["attention_mask"].tolist() == [[1, 1, 1], [1, 1, 0]]
+    assert batch["labels"].tolist() == [0, 1]
+    assert batch["id"] == ["r2", "r1"]
+
+    left = TokenizedDataset(split, pad_token_id=9, padding_side="left").collate([1, 0])
+    assert left["input_ids"].tolist() == [[9, 9, 0, 4], [0, 1, 2, 3]]
+    assert left["attention_mask"].tolist() == [[0, 0, 1, 1], [1, 1, 1, 1]]
+
+
+def test_concat_encoded_stacks_rows(tmp_path: Path) -> None:
+    tokenizer = _WordTokenizer()
+    first_path, second_path = tmp_path / "a.jsonl", tmp_path / "b.jsonl"
+    _write_split(first_path, ["a b", "c"])
+    _write_split(second_path, ["d e f"])
+    first, _ = load_or_encode(
+        first_path, _loader(first_path), tokenizer, 8, preprocess={}, cache_dir=tmp_path / "c"
+    )
+    second, _ = load_or_encode(second_path, _loader(second_path), tokenizer, 8, preprocess={})
+    both = concat_encoded([first, second])
+    assert both.ids == ["r0", "r1", "r0"]
+    assert both.lengths.tolist() == [3, 2, 4]
+    assert both.labels.tolist() == [0, 1, 0]
+    assert both.tokens(2).tolist() == second.tokens(0).tolist()
+    assert concat_encoded([first]) is first
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import json
+import re
+
+import pytest
+
+from llm_jailbreak_detector.lora_detector import LoraDetector
+from llm_jailbreak_detector.predict import Predictor
+from llm_jailbreak_detector.windowing import WindowConfig, plan_windows, pool_scores
+
+ATTACK_ID = 7
+
+
+class _WordTokenizer:
+    """Whitespace tokenizer: ``attack`` is token 7, every other word token 5."""
+
+    is_fast = True
+
+    def __call__(self, texts, **kwargs):
+        ids, offsets = [], []
+        for text in texts:
+            words = list(re.finditer(r"\S+", text))
+            ids.append([ATTACK_ID if m.group() == "attack" else 5 for m in words])
+            offsets.append([(m.start(), m.end()) for m in words])
+        return {"input_ids": ids, "offset_mapping": offsets}
+
+    def num_special_tokens_to_add(self, pair=False):
+        return 2
+
+    def prepare_for_model(self, ids, add_special_tokens=True):
+        return {"input_ids": [0, *ids, 2]}
+
+    def pad(self, rows, return_tensors=None):
+        return [row["input_ids"] for row in rows]
+
+
+def _windowed_detector(tmp_path, monkeypatch, windows: WindowConfig) -> tuple[LoraDetector, list]:
+    (tmp_path / "config.json").write_text(
+        json.dumps({"model_name": "roberta-base", "val_threshold": 0.5, "max_length": 6}),
+        encoding="utf-8",
+    )
+    forwarded: list[list[int]] = []
+
+    def fake_load(self):
+        self._model = object()
+        self._tokenizer = _WordTokenizer()
+
+    def fake_forward(self, inputs):
+        forwarded.extend(inputs)
+        return [0.9 if ATTACK_ID in ids else 0.1 for ids in inputs]
+
+    monkeypatch.setattr(LoraDetector, "_load_model", fake_load)
+    monkeypatch.setattr(LoraDetector, "_forward_scores", fake_forward)
+    return LoraDetector(tmp_path, windows=windows), forwarded
+
+
+def test_plan_windows_covers_every_token() -> None:
+    assert plan_windows(3, 4, 2) == [(0, 3)]
+    assert plan_windows(0, 4, 2) == [(0, 0)]
+    assert plan_windows(10, 4, 3) == [(0, 4), (3, 7), (6, 10)]
+    assert plan_windows(9, 4, 4) == [(0, 4), (4, 8), (5, 9)]
+    with pytest.raises(ValueError):
+        plan_windows(5, 0, 1)
+
+
+def test_pool_scores_modes() -> None:
+    scores = [0.1, 0.9, 0.2]
+    assert pool_scores(scores, "max") == (0.9, 1)
+    assert pool_scores(scores, "mean") == (pytest.approx(0.4), 1)
+    sharp, trigger = pool_scores(scores, "softmax", temperature=0.01)
+    flat, _ = pool_scores(scores, "softmax", temperature=1000.0)
+    assert trigger == 1
+    assert sharp == pytest.approx(0.9, abs=1e-6)
+    assert flat == pytest.approx(0.4, abs=1e-3)
+    with pytest.raises(ValueError):
+        pool_scores([], "max")
+
+
+def test_window_config_validation() -> None:
+    with pytest.raises(ValueError, match="pooling"):
+        WindowConfig(pooling="attention")
+    with pytest.raises(ValueError, match="stride"):
+        WindowConfig(window=4, stride=8)
+    with pytest.raises(ValueError, match="temperature"):
+        WindowConfig(temperature=0.0)
+    with pytest.raises(ValueError, match="lora and onnx"):
+        Predictor(detector="rules", windows=WindowConfig())
+
+
+def test_windowed_scoring_finds_attack_past_max_length(tmp_path, monkeypatch) -> None:
+    detector, forwarded = _windowed_detector(tmp_path, monkeypatch, WindowConfig())
+    text = "a b c d e f g h attack j"
+    (score, rationale), (short_score, short_rationale) = detector.explain_batch([text, "a b"])
+
+    # max_length 6 leaves 4 content tokens per window, stride 2.
+    assert score == 0.9
+    assert rationale["windows"] == 4
+    assert rationale["window_scores"] == [0.1, 0.1, 0.1, 0.9]
+    assert rationale["trigger_window"] == 3
+    assert rationale["trigger_tokens"] == [6, 10]
+    assert text[slice(*rationale["trigger_span"])] == "g h attack j"
+    assert (short_score, short_rationale["windows"]) == (0.1, 1)
+    # The three benign windows have identical token ids and are scored once.
+    assert len(forwarded) == 3
+    assert detector.predict_proba_batch([text], max_tokens=12) == [0.9]
+
+
+def test_windowing_changes_fingerprint_and_dedupe_is_optional(tmp_path, monkeypatch) -> None:
+    detector, forwarded = _windowed_detector(
+        tmp_path, monkeypatch, WindowConfig(window=2, stride=2, pooling="mean", dedupe=False)
+    )
+    assert detector.fingerprint() != LoraDetector(tmp_path).fingerprint()
+    predictor = Predictor(detector="lora", run_dir=str(tmp_path), windows=detector.windows)
+    result = predictor.predict("a b attack d", threshold="val")
+    assert result.score == pytest.approx(0.5)
+    assert result.rationale["trigger_window"] == 1
+    assert result.metadata["windows"] == {"pooling": "mean", "window": 2}
+    detector.explain_batch(["a b a b"])
+    assert len(forwarded) == 4
+
+
+def test_stride_is_checked_against_the_resolved_window(tmp_path, monkeypatch) -> None:
+    assert WindowConfig().resolve(4) == (4, 2)
+    assert WindowConfig(window=3, stride=3).resolve(512) == (3, 3)
+    with pytest.raises(ValueError, match="window must be >= 1"):
+        WindowConfig().resolve(0)
+    # max_length 6 resolves to a 4-token window, which a stride of 8 would skip past.
+    detector, forwarded = _windowed_detector(tmp_path, monkeypatch, WindowConfig(stride=8))
+    with pytest.raises(ValueError, match="stride 8 exceeds the resolved window of 4"):
+        detector.explain_batch(["a b c d e f g h attack j"])
+    assert forwarded == []